@@ -0,0 +1,93 @@
+"""
+Bulk sync vs. one request per item.
+
+Syncs --items projects into an empty account twice: once as --items
+sequential POST /api/v1/projects/ calls (the current client path), once
+as a single POST /api/v1/projects/bulk. Then updates and deletes them
+all the same two ways. In-process over the ASGI transport, so the numbers
+are server-side cost plus round trips, not network.
+
+    python -m benchmarks.bulk_sync --items 1000
+    python -m benchmarks.bulk_sync --database-url postgresql+asyncpg://...
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Dict
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+
+async def run(database_url: str, items: int) -> Dict[str, Dict[str, float]]:
+    from src.api.dependencies import get_current_active_user, get_db
+    from src.api.routers import projects
+    from src.core.database import Base
+    from src.models.project import Project
+    from src.models.task import Task
+    from src.models.user import User
+    from src.services.auth_service import UserSnapshot
+
+    engine = create_async_engine(database_url)
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda c: Base.metadata.create_all(c, tables=[User.__table__, Project.__table__, Task.__table__]))
+        await conn.execute(delete(Project))
+        user_id = (await conn.execute(User.__table__.insert().values(
+            email=f"bench-{time.time_ns()}@example.com", hashed_password="x"))).inserted_primary_key[0]
+
+    app = FastAPI()
+    app.include_router(projects.router, prefix="/api/v1/projects")
+
+    async def db():
+        async with AsyncSession(engine) as s:
+            yield s
+
+    app.dependency_overrides[get_db] = db
+    app.dependency_overrides[get_current_active_user] = lambda: UserSnapshot(user_id, "bench@example.com", "", True, False)
+
+    results: Dict[str, Dict[str, float]] = {"per_item": {}, "bulk": {}}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=300) as client:
+        # Per item: the existing endpoints, one request each
+        t0 = time.perf_counter()
+        ids = [(await client.post("/api/v1/projects/", json={"name": f"p{i}"})).json()["id"] for i in range(items)]
+        results["per_item"]["create_seconds"] = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        for i in ids:
+            await client.put(f"/api/v1/projects/{i}", json={"description": "synced"})
+        results["per_item"]["update_seconds"] = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        for i in ids:
+            await client.delete(f"/api/v1/projects/{i}")
+        results["per_item"]["delete_seconds"] = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        r = await client.post("/api/v1/projects/bulk", json={"create": [{"name": f"p{i}"} for i in range(items)]})
+        ids = [p["id"] for p in r.json()["created"]]
+        results["bulk"]["create_seconds"] = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        await client.post("/api/v1/projects/bulk", json={"update": [{"id": i, "description": "synced"} for i in ids]})
+        results["bulk"]["update_seconds"] = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        r = await client.post("/api/v1/projects/bulk", json={"delete": ids})
+        results["bulk"]["delete_seconds"] = time.perf_counter() - t0
+        assert len(r.json()["deleted"]) == items
+
+    await engine.dispose()
+    for mode in results.values():
+        mode["total_seconds"] = sum(mode.values())
+        for k in mode:
+            mode[k] = round(mode[k], 3)
+    results["speedup"] = round(results["per_item"]["total_seconds"] / results["bulk"]["total_seconds"], 1)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--database-url", default="sqlite+aiosqlite:///./bulk_sync_bench.db")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.database_url, args.items)), indent=2))
@@ -0,0 +1,105 @@
+"""
+GPU utilization under load.
+
+Runs the mixed workload at one concurrency level while a background thread
+samples NVML (pynvml) for every visible GPU: SM utilization, memory
+utilization and memory used. Point it at a GPU pod with --base-url to see
+how well real inference keeps the device busy.
+
+With the in-process stub there is no GPU to sample; the report then
+contains each fake backend's occupancy instead (busy seconds / wall
+seconds, i.e. the average number of inferences in flight), which is what
+GPU utilization would track for a single-stream model.
+
+    python -m benchmarks.gpu_utilization --base-url http://whisper:8000 --concurrency 32 --duration 60
+"""
+
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from benchmarks.harness import Target, add_common_args, emit, endpoints, metadata, report, run_load
+
+try:
+    import pynvml
+except Exception:
+    pynvml = None
+
+
+class GpuSampler:
+    def __init__(self, interval: float = 0.2):
+        self.interval = interval
+        self.samples: Dict[int, List[Dict[str, float]]] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.available = False
+
+    def start(self) -> None:
+        if pynvml is None:
+            return
+        try:
+            pynvml.nvmlInit()
+            self.handles = [pynvml.nvmlDeviceGetHandleByIndex(i) for i in range(pynvml.nvmlDeviceGetCount())]
+        except Exception:
+            return
+        self.available = bool(self.handles)
+        self._thread = threading.Thread(target=self._run, name="gpu-sampler", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            for i, h in enumerate(self.handles):
+                util = pynvml.nvmlDeviceGetUtilizationRates(h)
+                mem = pynvml.nvmlDeviceGetMemoryInfo(h)
+                self.samples.setdefault(i, []).append(
+                    {"sm": util.gpu, "mem": util.memory, "mem_used_mb": mem.used / 2 ** 20})
+            self._stop.wait(self.interval)
+
+    def stop(self) -> Dict[str, Any]:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        if pynvml is not None and self.available:
+            pynvml.nvmlShutdown()
+        out = {}
+        for i, rows in self.samples.items():
+            sm = [r["sm"] for r in rows]
+            out[f"gpu{i}"] = {
+                "samples": len(rows),
+                "sm_util_mean": round(statistics.fmean(sm), 1),
+                "sm_util_p95": round(sorted(sm)[int(len(sm) * 0.95) - 1] if len(sm) > 1 else sm[0], 1),
+                "mem_util_mean": round(statistics.fmean(r["mem"] for r in rows), 1),
+                "mem_used_mb_max": round(max(r["mem_used_mb"] for r in rows), 1),
+            }
+        return out
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    mix = list(endpoints(args.cache_hit_ratio).values())
+    target = Target(args)
+    sampler = GpuSampler(args.sample_interval)
+    async with target as client:
+        sampler.start()
+        t0 = time.perf_counter()
+        samples = await run_load(client, mix, args.concurrency, args.duration, args.warmup)
+        wall = time.perf_counter() - t0
+        gpus = sampler.stop()
+    result: Dict[str, Any] = {"load": report(samples, combined=True)["all"], "gpus": gpus or None}
+    if not args.base_url:
+        result["backend_occupancy"] = {
+            b.name: {"calls": b.calls, "busy_seconds": round(b.busy_seconds, 3), "occupancy": round(b.busy_seconds / wall, 3)}
+            for b in (target.backends.whisper, target.backends.motion)
+        }
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_common_args(parser)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--sample-interval", type=float, default=0.2)
+    args = parser.parse_args()
+    emit({"meta": metadata(args), "gpu_utilization": asyncio.run(run(args))}, args.output)
@@ -0,0 +1,406 @@
+"""
+Shared benchmark harness.
+
+Runs the API in-process with the real middleware stack in front of stub
+routes (auth, upload, transcription, motion jobs, WebSocket echo): fixed-latency fake Whisper/motion backends (blocking sleeps in the
+default executor, like real inference), Redis via fakeredis (or a real
+server with --redis-url) and Postgres via in-memory SQLite (or a real DSN
+with --database-url). Pass --base-url instead to drive a deployed API.
+
+Latency and throughput come from closed-loop workers: each of
+`concurrency` workers issues its next request as soon as the previous one
+returns, for `duration` seconds after a warm-up.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import importlib.util
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+from fastapi import Depends, FastAPI, Header, HTTPException, Request, WebSocket, WebSocketDisconnect
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROFILES: Dict[str, List[int]] = {
+    "smoke": [1, 8],
+    "ci": [1, 8, 32],
+    "full": [1, 8, 32, 64, 128, 256],
+}
+
+
+@dataclass
+class FakeBackend:
+    """Stand-in model: blocks an executor thread for latency +/- jitter."""
+    name: str
+    latency: float
+    jitter: float = 0.1
+    calls: int = 0
+    busy_seconds: float = 0.0
+
+    def _infer(self, payload: Any) -> Dict[str, Any]:
+        spent = self.latency * (1 + random.uniform(-self.jitter, self.jitter))
+        time.sleep(spent)
+        self.calls += 1
+        self.busy_seconds += spent
+        return {"backend": self.name, "bytes": len(payload) if payload else 0}
+
+    async def __call__(self, payload: Any) -> Dict[str, Any]:
+        return await asyncio.to_thread(self._infer, payload)
+
+
+@dataclass
+class Backends:
+    whisper: FakeBackend
+    motion: FakeBackend
+
+
+def load_middleware():
+    """
+    src/api/middleware.py without importing the src.api package, whose
+    __init__ loads every router and with them the Whisper/torch stack the
+    benchmarks stub out.
+    """
+    name = "src.api.middleware"
+    module = sys.modules.get(name)
+    if module is None:
+        spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, "src", "api", "middleware.py"))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+    return module
+
+
+async def _make_cache(redis_url: Optional[str]):
+    from src.core.cache import RedisCache
+
+    cache = RedisCache()
+    if redis_url:
+        import redis.asyncio as redis
+        cache.redis_client = redis.from_url(redis_url, decode_responses=False)
+    else:
+        import fakeredis
+        cache.redis_client = fakeredis.FakeAsyncRedis()
+    await cache.redis_client.flushdb()
+    return cache
+
+
+async def _make_db(database_url: Optional[str], projects: int = 200):
+    from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func, insert
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from sqlalchemy.pool import StaticPool
+
+    if database_url:
+        engine = create_async_engine(database_url)
+    else:
+        engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    meta = MetaData()
+    table = Table(
+        "bench_projects", meta,
+        Column("id", Integer, primary_key=True),
+        Column("owner_id", Integer, index=True),
+        Column("name", String(255)),
+        Column("created_at", DateTime, server_default=func.now()),
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(meta.drop_all)
+        await conn.run_sync(meta.create_all)
+        await conn.execute(insert(table), [{"owner_id": i % 10, "name": f"project-{i}"} for i in range(projects)])
+    return engine, table
+
+
+async def build_app(
+    backends: Backends,
+    stack: bool = True,
+    redis_url: Optional[str] = None,
+    database_url: Optional[str] = None,
+) -> Tuple[FastAPI, Callable]:
+    """Stub API with the production middleware stack. Returns (app, async cleanup)."""
+    from sqlalchemy import select
+    from src.core.security import create_access_token, verify_token
+    from src.security.rate_limiter import rate_limiter
+
+    cache = await _make_cache(redis_url)
+    engine, table = await _make_db(database_url)
+    # One client IP drives everything; keep the limiter on the path, never rejecting
+    rate_limiter.cache = cache
+    rate_limiter.default_limit = 10 ** 9
+
+    app = FastAPI()
+    load_middleware().add_middleware_stack(app, enabled=stack)
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    @app.get("/api/v1/projects")
+    @app.get("/api/v1/projects/")
+    async def list_projects(owner_id: int = 1):
+        async with engine.connect() as conn:
+            rows = await conn.execute(
+                select(table.c.id, table.c.name).where(table.c.owner_id == owner_id).order_by(table.c.id.desc()).limit(20)
+            )
+            return [dict(r._mapping) for r in rows]
+
+    async def audio_bytes(request: Request) -> bytes:
+        if request.headers.get("content-type", "").startswith("multipart/"):
+            form = await request.form()
+            return await form["file"].read()
+        return await request.body()
+
+    def current_user(authorization: Optional[str] = Header(None)) -> str:
+        # Real JWT decode, so authenticated flows pay the same per-request cost
+        if not authorization or not authorization.lower().startswith("bearer "):
+            raise HTTPException(status_code=401, detail="Not authenticated")
+        try:
+            return verify_token(authorization[7:])["sub"]
+        except ValueError as e:
+            raise HTTPException(status_code=401, detail=str(e))
+
+    @app.post("/api/v1/auth/register", status_code=201)
+    async def register(user: Dict[str, Any]):
+        return {"email": user.get("email"), "is_active": True}
+
+    @app.post("/api/v1/auth/login")
+    async def login(credentials: Dict[str, Any]):
+        return {"access_token": create_access_token({"sub": credentials.get("email", "anon")}), "token_type": "bearer"}
+
+    @app.get("/api/v1/auth/me")
+    async def me(user: str = Depends(current_user)):
+        return {"email": user, "is_active": True}
+
+    @app.post("/api/v1/upload/audio")
+    async def upload_audio(request: Request, user: str = Depends(current_user)):
+        data = await audio_bytes(request)
+        return {"file_id": hashlib.sha256(data).hexdigest()[:16], "file_size": len(data)}
+
+    @app.post("/api/v1/transcribe/transcribe")
+    async def transcribe(request: Request):
+        body = await audio_bytes(request)
+        key = "whisper:" + hashlib.sha256(body).hexdigest()
+        return await cache.get_or_compute(key, lambda: backends.whisper(body), ttl=300)
+
+    jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    async def run_job(job_id: str, payload: bytes):
+        try:
+            jobs[job_id]["result"] = await backends.motion(payload)
+            jobs[job_id]["status"] = "completed"
+        except Exception:
+            jobs[job_id]["status"] = "failed"
+
+    @app.post("/api/v1/motion/generate")
+    async def generate_motion(request: Request, wait: bool = False):
+        payload = await request.body()
+        if wait:
+            return await backends.motion(payload)
+        job_id = uuid.uuid4().hex
+        jobs[job_id] = {"id": job_id, "status": "pending"}
+        while len(jobs) > 10000:
+            jobs.popitem(last=False)
+        jobs[job_id]["task"] = asyncio.create_task(run_job(job_id, payload))
+        return {"id": job_id, "status": "pending"}
+
+    @app.get("/api/v1/motion/{job_id}")
+    async def motion_status(job_id: str):
+        job = jobs.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Motion not found")
+        return {k: v for k, v in job.items() if k != "task"}
+
+    @app.websocket("/ws/stream")
+    async def ws_stream(ws: WebSocket):
+        await ws.accept()
+        try:
+            while True:
+                await ws.send_text(json.dumps({"type": "echo", "data": json.loads(await ws.receive_text()).get("data")}))
+        except WebSocketDisconnect:
+            pass
+
+    async def cleanup():
+        await cache.redis_client.aclose()
+        await engine.dispose()
+
+    return app, cleanup
+
+
+@dataclass
+class Endpoint:
+    name: str
+    method: str
+    path: str
+    weight: int = 1
+    body: Optional[Callable[[random.Random], bytes]] = None
+
+
+def _audio_body(hot_keys: int, hit_ratio: float) -> Callable[[random.Random], bytes]:
+    # hit_ratio of requests reuse one of hot_keys payloads; the rest are unique
+    def make(rng: random.Random) -> bytes:
+        if rng.random() < hit_ratio:
+            return f"audio-hot-{rng.randrange(hot_keys)}".encode() * 64
+        return f"audio-{rng.getrandbits(64)}".encode() * 64
+    return make
+
+
+def endpoints(cache_hit_ratio: float = 0.5) -> Dict[str, Endpoint]:
+    return {
+        "health": Endpoint("health", "GET", "/health"),
+        "projects": Endpoint("projects", "GET", "/api/v1/projects?owner_id=1", weight=4),
+        "transcribe": Endpoint("transcribe", "POST", "/api/v1/transcribe/transcribe", weight=3, body=_audio_body(16, cache_hit_ratio)),
+        "motion": Endpoint("motion", "POST", "/api/v1/motion/generate?wait=true", weight=2,
+                           body=lambda rng: json.dumps({"text": "wave", "seed": rng.randrange(1000)}).encode()),
+    }
+
+
+@dataclass
+class Samples:
+    latencies: Dict[str, List[float]] = field(default_factory=dict)
+    errors: Dict[str, int] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+
+def summarize(latencies: Sequence[float], errors: int, elapsed: float) -> Dict[str, float]:
+    total = len(latencies) + errors
+    if not latencies:
+        return {"requests": total, "errors": errors, "error_rate": 1.0 if total else 0.0, "rps": 0.0}
+    ordered = sorted(latencies)
+    q = statistics.quantiles(ordered, n=100, method="inclusive") if len(ordered) > 1 else [ordered[0]] * 99
+    return {
+        "requests": total,
+        "errors": errors,
+        "error_rate": round(errors / total, 4),
+        "rps": round(total / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "p50_ms": round(q[49] * 1000, 3),
+        "p95_ms": round(q[94] * 1000, 3),
+        "p99_ms": round(q[98] * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    mix: Sequence[Endpoint],
+    concurrency: int,
+    duration: float,
+    warmup: float = 1.0,
+    seed: int = 1234,
+) -> Samples:
+    samples = Samples()
+    weights = [e.weight for e in mix]
+    recording = False
+
+    async def worker(wid: int, deadline: float):
+        rng = random.Random(seed + wid)
+        while time.perf_counter() < deadline:
+            ep = rng.choices(mix, weights)[0] if len(mix) > 1 else mix[0]
+            content = ep.body(rng) if ep.body else None
+            t0 = time.perf_counter()
+            try:
+                r = await client.request(ep.method, ep.path, content=content)
+                ok = r.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            if not recording:
+                continue
+            if ok:
+                samples.latencies.setdefault(ep.name, []).append(time.perf_counter() - t0)
+            else:
+                samples.errors[ep.name] = samples.errors.get(ep.name, 0) + 1
+
+    if warmup > 0:
+        await asyncio.gather(*(worker(i, time.perf_counter() + warmup) for i in range(concurrency)))
+    recording = True
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(i, start + duration) for i in range(concurrency)))
+    samples.elapsed = time.perf_counter() - start
+    return samples
+
+
+def report(samples: Samples, combined: bool = False) -> Dict[str, Dict[str, float]]:
+    """Per-endpoint summaries, plus an "all" entry when `combined`."""
+    names = sorted(set(samples.latencies) | set(samples.errors))
+    out = {n: summarize(samples.latencies.get(n, []), samples.errors.get(n, 0), samples.elapsed) for n in names}
+    if combined:
+        out["all"] = summarize(
+            [x for v in samples.latencies.values() for x in v], sum(samples.errors.values()), samples.elapsed)
+    return out
+
+
+class Target:
+    """Async context manager yielding an httpx client for the in-process stub or a live URL."""
+
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.backends = Backends(
+            FakeBackend("whisper", args.whisper_latency_ms / 1000),
+            FakeBackend("motion", args.motion_latency_ms / 1000),
+        )
+        self._cleanup = None
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def __aenter__(self) -> httpx.AsyncClient:
+        # httpx logs every request at INFO; that would dominate the measurement
+        logging.getLogger("httpx").setLevel(logging.WARNING)
+        limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+        if self.args.base_url:
+            self._client = httpx.AsyncClient(base_url=self.args.base_url, limits=limits, timeout=60)
+        else:
+            app, self._cleanup = await build_app(
+                self.backends, stack=not self.args.no_middleware,
+                redis_url=self.args.redis_url, database_url=self.args.database_url)
+            self._client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60)
+        return self._client
+
+    async def __aexit__(self, *exc):
+        await self._client.aclose()
+        if self._cleanup is not None:
+            await self._cleanup()
+
+
+def add_common_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--duration", type=float, default=10.0, help="measured seconds per run")
+    parser.add_argument("--warmup", type=float, default=1.0)
+    parser.add_argument("--whisper-latency-ms", type=float, default=50.0)
+    parser.add_argument("--motion-latency-ms", type=float, default=120.0)
+    parser.add_argument("--cache-hit-ratio", type=float, default=0.5)
+    parser.add_argument("--redis-url", default=None, help="real Redis instead of fakeredis")
+    parser.add_argument("--database-url", default=None, help="real database instead of in-memory SQLite")
+    parser.add_argument("--base-url", default=None, help="drive a running API instead of the in-process stub")
+    parser.add_argument("--no-middleware", action="store_true")
+    parser.add_argument("--output", default=None, help="write JSON results here")
+
+
+def metadata(args: argparse.Namespace) -> Dict[str, Any]:
+    try:
+        sha = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5).stdout.strip()
+    except Exception:
+        sha = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "git_sha": sha or None,
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "config": {k: v for k, v in vars(args).items() if k != "func"},
+    }
+
+
+def emit(result: Dict[str, Any], output: Optional[str]) -> None:
+    text = json.dumps(result, indent=2)
+    if output:
+        with open(output, "w") as f:
+            f.write(text + "\n")
+    print(text)
@@ -0,0 +1,38 @@
+"""
+Per-endpoint latency benchmark.
+
+Each endpoint runs on its own at low concurrency so the percentiles reflect
+service time rather than queueing.
+
+    python -m benchmarks.latency_test --concurrency 1 8 --duration 10
+"""
+
+import argparse
+import asyncio
+from typing import Any, Dict
+
+from benchmarks.harness import Target, add_common_args, emit, endpoints, metadata, report, run_load
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Dict[str, Any]]:
+    eps = endpoints(args.cache_hit_ratio)
+    results: Dict[str, Dict[str, Any]] = {}
+    async with Target(args) as client:
+        for name in args.endpoints:
+            for c in args.concurrency:
+                samples = await run_load(client, [eps[name]], c, args.duration, args.warmup)
+                results[f"{name}@c{c}"] = report(samples)[name]
+    return results
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_common_args(parser)
+    parser.add_argument("--endpoints", nargs="+", default=list(endpoints()), choices=list(endpoints()))
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8])
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    emit({"meta": metadata(args), "latency": asyncio.run(run(args))}, args.output)
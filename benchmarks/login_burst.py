@@ -0,0 +1,105 @@
+"""
+Login burst vs. /health latency.
+
+Fires --burst concurrent logins (bcrypt verify at PASSWORD_HASH_ROUNDS)
+while a probe requests /health every --probe-interval-ms. Compares bcrypt
+called inline in the async route (the old behaviour) with the bounded
+bcrypt pool, in-process over the ASGI transport.
+
+    python -m benchmarks.login_burst --burst 50 --rounds 12
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Dict, List
+
+import httpx
+from fastapi import FastAPI, HTTPException
+
+PASSWORD = "correct horse battery staple"
+
+
+def build_app(mode: str, hashed: str) -> FastAPI:
+    from src.core.exceptions import ServiceOverloadedError
+    from src.core.security import verify_password, verify_password_async
+
+    app = FastAPI()
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    @app.post("/login")
+    async def login():
+        try:
+            ok = verify_password(PASSWORD, hashed) if mode == "inline" else await verify_password_async(PASSWORD, hashed)
+        except ServiceOverloadedError:
+            raise HTTPException(status_code=503)
+        return {"ok": ok}
+
+    return app
+
+
+async def run(mode: str, hashed: str, burst: int, probe_interval: float) -> Dict[str, float]:
+    app = build_app(mode, hashed)
+    probes: List[float] = []
+    statuses: Dict[int, int] = {}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=120) as client:
+        await client.get("/health")
+        done = asyncio.Event()
+
+        async def probe():
+            # Open-loop: latency counts from when the probe was due, so time
+            # spent waiting for a blocked event loop shows up in the numbers.
+            due = time.perf_counter()
+            while not done.is_set():
+                await client.get("/health")
+                probes.append(time.perf_counter() - due)
+                due += probe_interval
+                await asyncio.sleep(max(0.0, due - time.perf_counter()))
+
+        async def login():
+            r = await client.post("/login")
+            statuses[r.status_code] = statuses.get(r.status_code, 0) + 1
+
+        prober = asyncio.create_task(probe())
+        await asyncio.sleep(probe_interval * 5)
+        t0 = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(burst)))
+        burst_seconds = time.perf_counter() - t0
+        # Let the probe catch up so a probe stuck behind the burst is recorded
+        await asyncio.sleep(probe_interval * 5)
+        done.set()
+        await prober
+
+    probes.sort()
+    q = statistics.quantiles(probes, n=100, method="inclusive")
+    return {
+        "burst_seconds": round(burst_seconds, 3),
+        "login_statuses": statuses,
+        "health_probes": len(probes),
+        "health_p50_ms": round(q[49] * 1000, 3),
+        "health_p99_ms": round(q[98] * 1000, 3),
+        "health_max_ms": round(probes[-1] * 1000, 3),
+    }
+
+
+async def main(args) -> Dict[str, Dict[str, float]]:
+    from src.core.config import settings
+    from src.core.security import hash_password
+
+    settings.PASSWORD_HASH_ROUNDS = args.rounds
+    hashed = hash_password(PASSWORD)
+    return {mode: await run(mode, hashed, args.burst, args.probe_interval_ms / 1000) for mode in ("inline", "pool")}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--burst", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--probe-interval-ms", type=float, default=10.0)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main(args)), indent=2))
@@ -0,0 +1,70 @@
+"""
+Multiprocess /metrics scrape cost.
+
+Simulates N gunicorn workers each writing request metrics to a shared
+PROMETHEUS_MULTIPROC_DIR, then times the aggregation done by
+MetricsCollector.get_metrics() for a single scrape.
+
+    python -m benchmarks.metrics_scrape --workers 1 4 16 --endpoints 50 --scrapes 20
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from typing import Dict, List
+
+
+def _worker(requests: int, endpoints: int):
+    # Runs in a spawned process with PROMETHEUS_MULTIPROC_DIR already set
+    from src.core.metrics import metrics as collector
+
+    for i in range(requests):
+        endpoint = f"/api/v1/route{i % endpoints}/{{item_id}}"
+        collector.record_request("GET", endpoint, 200 if i % 20 else 500, 0.001 * (i % 300))
+
+
+def run(workers: int, endpoints: int, requests: int, scrapes: int) -> Dict[str, float]:
+    directory = tempfile.mkdtemp(prefix="prom_multiproc_")
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = directory
+    try:
+        ctx = multiprocessing.get_context("spawn")
+        procs = [ctx.Process(target=_worker, args=(requests, endpoints)) for _ in range(workers)]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+
+        from prometheus_client import CollectorRegistry, generate_latest, multiprocess
+
+        timings: List[float] = []
+        size = 0
+        for _ in range(scrapes):
+            t0 = time.perf_counter()
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+            size = len(generate_latest(registry))
+            timings.append(time.perf_counter() - t0)
+        return {
+            "workers": workers,
+            "files": len(os.listdir(directory)),
+            "scrape_mean_ms": round(statistics.mean(timings) * 1000, 2),
+            "scrape_max_ms": round(max(timings) * 1000, 2),
+            "payload_kb": round(size / 1024, 1),
+        }
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--endpoints", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--scrapes", type=int, default=20)
+    args = parser.parse_args()
+    print(json.dumps([run(w, args.endpoints, args.requests, args.scrapes) for w in args.workers], indent=2))
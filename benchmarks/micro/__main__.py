@@ -0,0 +1,56 @@
+"""
+Micro-benchmarks for per-request hot functions (pytest-benchmark).
+
+    python -m benchmarks.micro                          # run and print the table
+    python -m benchmarks.micro --save main              # store a baseline
+    python -m benchmarks.micro --compare main           # fail if median regresses >10%
+    python -m benchmarks.micro --compare main --fail-on median:5% -k cache
+
+Baselines live in benchmarks/micro/.baselines/<machine>/. Only compare runs
+from the same machine class. No Redis, Postgres or GPU is needed.
+"""
+
+import argparse
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(os.path.dirname(HERE))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--save", metavar="NAME", help="save results as a named baseline")
+    parser.add_argument("--compare", metavar="NAME", help="compare against a saved baseline (name or run id)")
+    parser.add_argument("--fail-on", default="median:10%",
+                        help="pytest-benchmark --benchmark-compare-fail expression (default: median:10%%)")
+    parser.add_argument("-k", dest="keyword", help="only run benchmarks matching this expression")
+    parser.add_argument("--json", metavar="PATH", help="also write raw results as JSON")
+    args, passthrough = parser.parse_known_args(argv)
+
+    import pytest
+
+    sys.path.insert(0, ROOT)
+    opts = [
+        HERE,
+        "-o", "python_files=bench_*.py",
+        "-p", "no:cacheprovider",
+        f"--rootdir={ROOT}",
+        f"--benchmark-storage=file://{os.path.join(HERE, '.baselines')}",
+        "--benchmark-columns=min,median,mean,stddev,iqr,ops,rounds",
+        "--benchmark-sort=name",
+        "--benchmark-only",
+    ]
+    if args.save:
+        opts.append(f"--benchmark-save={args.save}")
+    if args.compare:
+        opts += [f"--benchmark-compare={args.compare}", f"--benchmark-compare-fail={args.fail_on}"]
+    if args.keyword:
+        opts += ["-k", args.keyword]
+    if args.json:
+        opts.append(f"--benchmark-json={args.json}")
+    return pytest.main(opts + passthrough)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
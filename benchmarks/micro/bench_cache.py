@@ -0,0 +1,33 @@
+import json
+import pytest
+from src.core.cache import CODEC_HEADERS, RedisCache, _codec_available, decode_payload, encode_value
+from benchmarks.micro.inputs import SMALL_VALUE, TRANSCRIPTION
+
+CODECS = [None] + [c for c in CODEC_HEADERS if _codec_available(c)]
+VALUES = {"small": SMALL_VALUE, "transcription": TRANSCRIPTION}
+
+@pytest.mark.parametrize("codec", CODECS, ids=lambda c: c or "none")
+@pytest.mark.parametrize("value", list(VALUES))
+def test_encode(benchmark, value, codec):
+    benchmark(encode_value, VALUES[value], codec, 1024)
+
+@pytest.mark.parametrize("codec", CODECS, ids=lambda c: c or "none")
+@pytest.mark.parametrize("value", list(VALUES))
+def test_decode(benchmark, value, codec):
+    _, stored, _ = encode_value(VALUES[value], codec, 1024)
+    assert benchmark(lambda: json.loads(decode_payload(stored))) == VALUES[value]
+
+@pytest.fixture
+def cache(loop):
+    fakeredis = pytest.importorskip("fakeredis")
+    c = RedisCache()
+    c.redis_client = fakeredis.FakeAsyncRedis()
+    yield c
+    loop.run_until_complete(c.redis_client.aclose())
+
+def test_get_transcription(run_async, cache, loop):
+    loop.run_until_complete(cache.set("whisper:bench", TRANSCRIPTION))
+    run_async(cache.get, "whisper:bench")
+
+def test_set_transcription(run_async, cache):
+    run_async(cache.set, "whisper:bench", TRANSCRIPTION)
@@ -0,0 +1,6 @@
+from src.pipelines.web_exporter import export_motion_to_web_json
+from benchmarks.micro.inputs import MOTION_FRAMES
+
+def test_export_motion_to_web_json(benchmark, tmp_path):
+    out = str(tmp_path / "motion.json")
+    assert benchmark(export_motion_to_web_json, MOTION_FRAMES, out) == out
@@ -0,0 +1,12 @@
+import pytest
+from benchmarks.micro.inputs import MEL, PREDICTION_INPUT
+
+def test_prediction_cache_key(benchmark):
+    model_manager = pytest.importorskip("src.ml_serving.model_manager")
+    key = benchmark(model_manager.prediction_cache_key, "motion_diffusion", PREDICTION_INPUT, {"seed": 7})
+    assert key.startswith("prediction:motion_diffusion:")
+
+def test_triton_cache_key(benchmark):
+    triton = pytest.importorskip("src.ml_serving.triton_client")
+    client = triton.TritonInferenceClient("triton:8001")
+    assert benchmark(client._ck, "whisper_large_v3", MEL).startswith("triton:")
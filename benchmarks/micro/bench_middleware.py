@@ -0,0 +1,34 @@
+from benchmarks.harness import load_middleware
+from src.core.cache import RedisCache
+from src.security.rate_limiter import RateLimiter
+
+async def _app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+async def _receive():
+    return {"type": "http.request", "body": b""}
+
+async def _send(message):
+    pass
+
+def _scope(headers):
+    return {"type": "http", "method": "GET", "path": "/api/v1/projects/42", "headers": headers,
+            "client": ("10.0.0.7", 51234)}
+
+def _middleware():
+    # No Redis client: the limiter runs on its in-process token buckets
+    limiter = RateLimiter(cache=RedisCache(), default_limit=10 ** 9, route_limits={}, client_limits={})
+    return load_middleware().RateLimitMiddleware(_app, limiter=limiter)
+
+def test_rate_limit_by_ip(run_async):
+    mw = _middleware()
+    scope = _scope([(b"host", b"api")])
+    run_async(lambda: mw(dict(scope), _receive, _send))
+
+def test_rate_limit_by_user(run_async):
+    from src.core.security import create_access_token
+    mw = _middleware()
+    token = create_access_token({"sub": "12345"})
+    scope = _scope([(b"host", b"api"), (b"authorization", f"Bearer {token}".encode())])
+    run_async(lambda: mw(dict(scope), _receive, _send))
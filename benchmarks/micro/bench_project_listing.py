@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import insert, select, tuple_
+from sqlalchemy.ext.asyncio import create_async_engine
+from src.models.project import Project
+from src.models.user import User
+
+PROJECTS = 10000
+PAGE = 50
+
+@pytest.fixture(scope="module")
+def db(loop):
+    pytest.importorskip("aiosqlite")
+    engine = create_async_engine("sqlite+aiosqlite://")
+
+    async def seed():
+        async with engine.begin() as conn:
+            await conn.run_sync(User.__table__.create)
+            await conn.run_sync(Project.__table__.create)
+            t0 = datetime(2026, 1, 1)
+            await conn.execute(insert(Project), [
+                {"name": f"p{i}", "owner_id": 1 + i % 4, "created_at": t0 + timedelta(seconds=i)} for i in range(PROJECTS * 4)
+            ])
+
+    loop.run_until_complete(seed())
+    yield engine
+    loop.run_until_complete(engine.dispose())
+
+def _page(depth, keyset):
+    newest_first = (Project.created_at.desc(), Project.id.desc())
+    query = select(Project.id, Project.name, Project.created_at).where(Project.owner_id == 1)
+    if keyset:
+        # Cursor for the row just before `depth` (owner 1 holds every 4th id, one second apart)
+        i = (PROJECTS - depth) * 4
+        query = query.where(tuple_(Project.created_at, Project.id) < tuple_(datetime(2026, 1, 1) + timedelta(seconds=i), i + 1))
+        return query.order_by(*newest_first).limit(PAGE)
+    return query.order_by(*newest_first).offset(depth).limit(PAGE)
+
+@pytest.mark.parametrize("depth", [0, 5000, 9900])
+@pytest.mark.parametrize("paging", ["keyset", "offset"])
+def test_list_page(run_async, db, paging, depth):
+    # Keyset stays flat with depth; OFFSET walks and discards `depth` rows first
+    query = _page(depth, paging == "keyset")
+
+    async def fetch():
+        async with db.connect() as conn:
+            assert len((await conn.execute(query)).all()) == PAGE
+
+    run_async(fetch, batch=20)
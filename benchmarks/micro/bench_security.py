@@ -0,0 +1,36 @@
+import pytest
+from src.core.security import create_access_token, decode_token, hash_password, verify_password, verify_token
+
+def test_decode_token(benchmark):
+    token = create_access_token({"sub": "12345", "email": "bench@example.com", "scopes": ["read", "write"]})
+    assert benchmark(decode_token, token)["sub"] == "12345"
+
+def test_verify_token_cached(benchmark):
+    token = create_access_token({"sub": "12345", "email": "bench@example.com", "scopes": ["read", "write"]})
+    verify_token(token)
+    assert benchmark(verify_token, token)["sub"] == "12345"
+
+@pytest.mark.parametrize("rounds", [10, 12])
+def test_verify_password(benchmark, rounds, monkeypatch):
+    from src.core.config import settings
+    monkeypatch.setattr(settings, "PASSWORD_HASH_ROUNDS", rounds)
+    hashed = hash_password("correct horse battery staple")
+    # bcrypt is deliberately slow; a few rounds are statistically enough
+    assert benchmark.pedantic(verify_password, args=("correct horse battery staple", hashed), rounds=5, iterations=1)
+
+@pytest.mark.parametrize("algorithm", ["RS256", "EdDSA"])
+def test_jwks_verify(run_async, algorithm, tmp_path, monkeypatch):
+    # What whisper/motion pay per request instead of a round trip to the API
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+    from src.core.config import settings
+    from src.core.security import jwks_document
+    from src.security.auth_handler import JWKSVerifier
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048) if algorithm == "RS256" else ed25519.Ed25519PrivateKey.generate()
+    (tmp_path / "bench.pem").write_bytes(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()))
+    monkeypatch.setattr(settings, "JWT_ALGORITHM", algorithm)
+    monkeypatch.setattr(settings, "JWT_KEYS_DIR", str(tmp_path))
+    verifier = JWKSVerifier()
+    verifier.load(jwks_document())
+    token = create_access_token({"sub": "12345", "email": "bench@example.com", "scopes": ["read", "write"]})
+    run_async(verifier.verify, token)
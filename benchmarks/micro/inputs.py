@@ -0,0 +1,34 @@
+"""Fixed, realistically sized inputs shared by the micro-benchmarks."""
+
+import random
+
+import numpy as np
+
+_rng = random.Random(42)
+
+# ~5 min of speech: 120 segments, roughly what WhisperService caches per file
+TRANSCRIPTION = {
+    "text": " ".join(f"segment {i} " + "lorem ipsum dolor sit amet " * 3 for i in range(120)),
+    "language": "en",
+    "task": "transcribe",
+    "duration": 300.0,
+    "processing_time": 4.2,
+    "segments": [
+        {"id": i, "start": i * 2.5, "end": i * 2.5 + 2.4, "text": "lorem ipsum dolor sit amet " * 3,
+         "confidence": round(_rng.uniform(-0.6, -0.1), 4)}
+        for i in range(120)
+    ],
+}
+
+SMALL_VALUE = {"status": "ok", "id": 12345}
+
+# 80 mel bins x 3000 frames (30 s window), the Whisper encoder input shape
+MEL = np.random.default_rng(42).standard_normal((1, 80, 3000), dtype=np.float32)
+
+# 10 s of 22-joint motion at 30 fps
+MOTION_FRAMES = [
+    {"t": f / 30, "joints": [[round(_rng.uniform(-1, 1), 4) for _ in range(3)] for _ in range(22)]}
+    for f in range(300)
+]
+
+PREDICTION_INPUT = {"text": "a person waves with the right hand", "length": 196, "guidance": 2.5}
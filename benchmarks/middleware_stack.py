@@ -0,0 +1,90 @@
+"""
+Middleware stack overhead benchmark.
+
+Drives /health and a small JSON route in-process (httpx ASGI transport, no
+network) with the API middleware stack on and off, and reports requests/sec
+and latency percentiles for each combination.
+
+    python -m benchmarks.middleware_stack --requests 5000 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Dict, List
+
+import httpx
+from fastapi import FastAPI
+
+
+def build_app(stack: bool) -> FastAPI:
+    from benchmarks.harness import load_middleware
+    from src.security.rate_limiter import rate_limiter
+
+    # The benchmark client is a single IP; keep the limiter on the hot path
+    # without ever rejecting.
+    rate_limiter.default_limit = 10 ** 9
+
+    app = FastAPI()
+    load_middleware().add_middleware_stack(app, enabled=stack)
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    @app.get("/api/v1/projects/{project_id}")
+    async def project(project_id: int):
+        return {"id": project_id, "name": "Motion Capture Demo", "tasks": [{"id": i, "status": "pending"} for i in range(20)]}
+
+    return app
+
+
+async def drive(app: FastAPI, path: str, total: int, concurrency: int) -> Dict[str, float]:
+    latencies: List[float] = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(min(200, total)):  # warm-up
+            await client.get(path)
+        queue: asyncio.Queue = asyncio.Queue()
+        for _ in range(total):
+            queue.put_nowait(None)
+
+        async def worker():
+            while not queue.empty():
+                queue.get_nowait()
+                t0 = time.perf_counter()
+                r = await client.get(path)
+                latencies.append(time.perf_counter() - t0)
+                assert r.status_code == 200, r.status_code
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    q = statistics.quantiles(latencies, n=100)
+    return {
+        "requests": total,
+        "rps": round(total / elapsed, 1),
+        "p50_ms": round(q[49] * 1000, 3),
+        "p99_ms": round(q[98] * 1000, 3),
+    }
+
+
+async def main(args) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for stack in (False, True):
+        app = build_app(stack)
+        for label, path in (("health", "/health"), ("json", "/api/v1/projects/42")):
+            results[f"{label}:{'stack' if stack else 'bare'}"] = await drive(app, path, args.requests, args.concurrency)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main(args)), indent=2))
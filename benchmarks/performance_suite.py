@@ -0,0 +1,104 @@
+"""
+Performance suite: latency + throughput, compared against a stored baseline.
+
+    # record a baseline on the reference runner
+    python -m benchmarks.performance_suite --profile ci --output benchmarks/baselines/ci.json
+
+    # gate: exits 1 if any tracked metric regresses past its threshold
+    python -m benchmarks.performance_suite --profile ci --baseline benchmarks/baselines/ci.json \\
+        --output results.json
+
+A latency metric regresses when it exceeds baseline * (1 + --latency-threshold)
+and by more than --min-delta-ms (filters noise on sub-millisecond routes).
+Throughput regresses when RPS falls below baseline * (1 - --throughput-threshold).
+Error rates may not rise above the baseline at all.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from typing import Any, Dict, Iterator, List, Tuple
+
+from benchmarks import latency_test, throughput_test
+from benchmarks.harness import PROFILES, add_common_args, emit, metadata
+
+LATENCY_KEYS = ("p50_ms", "p95_ms", "p99_ms")
+
+
+def flatten(result: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    for name, stats in result.get("latency", {}).items():
+        yield f"latency/{name}", stats
+    for name, stats in result.get("throughput", {}).get("levels", {}).items():
+        yield f"throughput/{name}", stats
+
+
+def compare(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    latency_threshold: float = 0.20,
+    throughput_threshold: float = 0.15,
+    min_delta_ms: float = 2.0,
+) -> List[Dict[str, Any]]:
+    """Return one entry per metric that regressed against `baseline`."""
+    base = dict(flatten(baseline))
+    regressions: List[Dict[str, Any]] = []
+    for name, stats in flatten(current):
+        ref = base.get(name)
+        if ref is None:
+            continue
+        for key in LATENCY_KEYS:
+            if key in stats and key in ref:
+                if stats[key] > ref[key] * (1 + latency_threshold) and stats[key] - ref[key] > min_delta_ms:
+                    regressions.append({"metric": f"{name}:{key}", "baseline": ref[key], "current": stats[key]})
+        if name.startswith("throughput/") and ref.get("rps"):
+            if stats.get("rps", 0.0) < ref["rps"] * (1 - throughput_threshold):
+                regressions.append({"metric": f"{name}:rps", "baseline": ref["rps"], "current": stats.get("rps", 0.0)})
+        if stats.get("error_rate", 0.0) > ref.get("error_rate", 0.0):
+            regressions.append({"metric": f"{name}:error_rate", "baseline": ref.get("error_rate", 0.0), "current": stats["error_rate"]})
+    return regressions
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    concurrency = PROFILES[args.profile]
+    # Latency at the low end of the profile, throughput across all of it
+    args.concurrency = concurrency[:2]
+    args.endpoints = list(latency_test.endpoints())
+    latency = await latency_test.run(args)
+    args.concurrency = concurrency
+    throughput = await throughput_test.run(args)
+    return {"latency": latency, "throughput": throughput}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_common_args(parser)
+    parser.add_argument("--profile", choices=list(PROFILES), default="ci")
+    parser.add_argument("--slo-ms", type=float, default=500.0)
+    parser.add_argument("--baseline", default=None, help="JSON from a previous run to compare against")
+    parser.add_argument("--latency-threshold", type=float, default=0.20)
+    parser.add_argument("--throughput-threshold", type=float, default=0.15)
+    parser.add_argument("--min-delta-ms", type=float, default=2.0)
+    args = parser.parse_args(argv)
+
+    result: Dict[str, Any] = {"meta": metadata(args)}
+    result.update(asyncio.run(run(args)))
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(result, baseline, args.latency_threshold, args.throughput_threshold, args.min_delta_ms)
+        result["comparison"] = {
+            "baseline": args.baseline,
+            "baseline_sha": baseline.get("meta", {}).get("git_sha"),
+            "regressions": regressions,
+        }
+    emit(result, args.output)
+    if result.get("comparison", {}).get("regressions"):
+        for r in result["comparison"]["regressions"]:
+            print(f"REGRESSION {r['metric']}: {r['baseline']} -> {r['current']}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
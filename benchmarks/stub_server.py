@@ -0,0 +1,42 @@
+"""
+Serve the benchmark stub API over HTTP for k6/Locust runs on a laptop.
+
+Same app as the in-process harness: real middleware, real JWT handling,
+fixed-latency fake Whisper/motion backends, fakeredis and SQLite.
+
+    python -m benchmarks.stub_server --port 8000 --whisper-latency-ms 400 --motion-latency-ms 2000
+    k6 run -e PROFILE=load tests/load/k6-script.js
+"""
+
+import argparse
+import asyncio
+
+import uvicorn
+
+from benchmarks.harness import Backends, FakeBackend, build_app
+
+
+async def serve(args: argparse.Namespace) -> None:
+    backends = Backends(
+        FakeBackend("whisper", args.whisper_latency_ms / 1000),
+        FakeBackend("motion", args.motion_latency_ms / 1000),
+    )
+    app, cleanup = await build_app(backends, stack=not args.no_middleware,
+                                   redis_url=args.redis_url, database_url=args.database_url)
+    server = uvicorn.Server(uvicorn.Config(app, host=args.host, port=args.port, log_level="warning"))
+    try:
+        await server.serve()
+    finally:
+        await cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--whisper-latency-ms", type=float, default=400.0)
+    parser.add_argument("--motion-latency-ms", type=float, default=2000.0)
+    parser.add_argument("--redis-url", default=None)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--no-middleware", action="store_true")
+    asyncio.run(serve(parser.parse_args()))
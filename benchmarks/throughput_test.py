@@ -0,0 +1,50 @@
+"""
+Throughput sweep.
+
+Drives the weighted mixed workload (projects 4 : transcribe 3 : motion 2 :
+health 1) at each concurrency level of a profile and reports RPS and
+latency per level, plus the highest-throughput level whose p99 stays
+within --slo-ms.
+
+    python -m benchmarks.throughput_test --profile ci --slo-ms 500
+"""
+
+import argparse
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from benchmarks.harness import PROFILES, Target, add_common_args, emit, endpoints, metadata, report, run_load
+
+
+def knee(levels: Dict[str, Dict[str, Any]], slo_ms: float) -> Optional[Dict[str, Any]]:
+    within = [(name, r) for name, r in levels.items() if r.get("p99_ms", float("inf")) <= slo_ms and r["error_rate"] == 0]
+    if not within:
+        return None
+    name, best = max(within, key=lambda kv: kv[1]["rps"])
+    return {"level": name, "rps": best["rps"], "p99_ms": best["p99_ms"]}
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    mix = list(endpoints(args.cache_hit_ratio).values())
+    levels: Dict[str, Dict[str, Any]] = {}
+    concurrency: List[int] = args.concurrency or PROFILES[args.profile]
+    async with Target(args) as client:
+        for c in concurrency:
+            samples = await run_load(client, mix, c, args.duration, args.warmup)
+            per_endpoint = report(samples, combined=True)
+            levels[f"mixed@c{c}"] = {**per_endpoint["all"], "endpoints": {k: v for k, v in per_endpoint.items() if k != "all"}}
+    return {"levels": levels, "max_within_slo": knee(levels, args.slo_ms)}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_common_args(parser)
+    parser.add_argument("--profile", choices=list(PROFILES), default="ci")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=None, help="overrides --profile")
+    parser.add_argument("--slo-ms", type=float, default=500.0, help="p99 bound for max_within_slo")
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    emit({"meta": metadata(args), "throughput": asyncio.run(run(args))}, args.output)
@@ -0,0 +1,71 @@
+"""
+Worker boot: create_all vs. Alembic revision check.
+
+Starts --workers concurrent "workers", each with its own engine, running
+the schema step of the API lifespan: `Base.metadata.create_all` (the old
+behaviour, DATABASE_SCHEMA_MODE=create) or the single alembic_version
+query (verify). The database is migrated to head first. Point
+--database-url at a Cloud SQL / Postgres instance to see catalog lock
+contention; the SQLite default only shows the per-worker query cost.
+
+    python -m benchmarks.worker_boot --workers 16
+    python -m benchmarks.worker_boot --database-url postgresql+asyncpg://... --workers 64
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Dict, List
+
+from sqlalchemy.ext.asyncio import create_async_engine
+
+
+async def boot(database_url: str, mode: str) -> float:
+    from src.core.schema import ensure_schema, head_revisions
+
+    # Each worker process parses the migration scripts once
+    head_revisions.cache_clear()
+    engine = create_async_engine(database_url)
+    try:
+        t0 = time.perf_counter()
+        await ensure_schema(engine, mode)
+        return time.perf_counter() - t0
+    finally:
+        await engine.dispose()
+
+
+async def run(database_url: str, workers: int, rounds: int) -> Dict[str, Dict[str, float]]:
+    from src.core.schema import upgrade
+
+    engine = create_async_engine(database_url)
+    async with engine.connect() as conn:
+        await conn.run_sync(lambda c: upgrade("head", c))
+        await conn.commit()
+    await engine.dispose()
+
+    results = {}
+    for mode in ("create", "verify"):
+        samples: List[float] = []
+        walls: List[float] = []
+        for _ in range(rounds):
+            t0 = time.perf_counter()
+            samples += await asyncio.gather(*(boot(database_url, mode) for _ in range(workers)))
+            walls.append(time.perf_counter() - t0)
+        samples.sort()
+        results[mode] = {
+            "worker_p50_ms": round(statistics.median(samples) * 1000, 2),
+            "worker_max_ms": round(samples[-1] * 1000, 2),
+            "all_workers_ready_ms": round(statistics.median(walls) * 1000, 2),
+        }
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--database-url", default="sqlite+aiosqlite:///./worker_boot_bench.db")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.database_url, args.workers, args.rounds)), indent=2))
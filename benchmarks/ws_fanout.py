@@ -0,0 +1,106 @@
+"""
+WebSocket fan-out under load.
+
+Opens --connections sockets on one WebSocketManager (default
+WS_MAX_CONNECTIONS), all in one room, with --slow-percent of them
+stalling --slow-ms on every send, and broadcasts --messages messages per
+round. Reports broadcast cost, delivery latency to the healthy sockets,
+drops and slow-consumer disconnects, and traced memory after each round:
+with bounded send queues it stays flat however far the slow sockets fall
+behind. The sockets are in-process fakes, so this measures the hub, not
+the network. Memory tracing slows everything ~5x; take timings with
+--no-trace.
+
+    python -m benchmarks.ws_fanout --connections 1000 --rounds 5
+    python -m benchmarks.ws_fanout --policy disconnect --slow-percent 10
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import statistics
+import time
+import tracemalloc
+from typing import Any, Dict, List
+
+
+class Socket:
+    def __init__(self, delay: float, latencies: List[float]):
+        self.delay = delay
+        self.latencies = latencies
+        self.received = 0
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text: str):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.received += 1
+        if not self.delay:
+            self.latencies.append(time.perf_counter() - json.loads(text)["t"])
+
+    async def close(self, code: int = 1000):
+        pass
+
+
+async def run(connections: int, messages: int, rounds: int, slow_percent: float, slow_ms: float,
+              queue_size: int, policy: str, payload_bytes: int, trace: bool = True) -> Dict[str, Any]:
+    from src.utils.websocket_manager import WebSocketManager
+
+    if trace:
+        tracemalloc.start()
+    hub = WebSocketManager(queue_size=queue_size, policy=policy, heartbeat=0, redis=None)
+    latencies: List[float] = []
+    slow = int(connections * slow_percent / 100)
+    sockets = [Socket(slow_ms / 1000 if i < slow else 0, latencies) for i in range(connections)]
+    for ws in sockets:
+        await hub.connect(ws)
+        hub.subscribe(ws, "room")
+    padding = "x" * payload_bytes
+
+    results = []
+    for _ in range(rounds):
+        latencies.clear()
+        broadcast_cost = 0.0
+        for n in range(messages):
+            t0 = time.perf_counter()
+            hub.broadcast("room", {"n": n, "t": t0, "data": padding})
+            broadcast_cost += time.perf_counter() - t0
+            await asyncio.sleep(0)
+        # Let the healthy sockets drain
+        while any(ws.received < (n + 1) * (len(results) + 1) for ws in sockets[slow:]):
+            await asyncio.sleep(0.001)
+        gc.collect()
+        latencies.sort()
+        results.append({
+            "broadcast_us": round(broadcast_cost / messages * 1e6, 1),
+            "delivery_p50_ms": round(statistics.median(latencies) * 1000, 2),
+            "delivery_p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 2),
+            "connections": len(hub),
+            "dropped": sum(c.dropped for c in hub.connections.values()),
+            "traced_mb": round(tracemalloc.get_traced_memory()[0] / 2**20, 2) if trace else None,
+        })
+    await hub.close()
+    if trace:
+        tracemalloc.stop()
+    return {"connections": connections, "slow": slow, "policy": policy, "queue_size": queue_size, "rounds": results}
+
+
+if __name__ == "__main__":
+    from src.core.config import settings
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--connections", type=int, default=settings.WS_MAX_CONNECTIONS)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--slow-percent", type=float, default=5.0)
+    parser.add_argument("--slow-ms", type=float, default=50.0)
+    parser.add_argument("--queue-size", type=int, default=settings.WS_SEND_QUEUE_SIZE)
+    parser.add_argument("--policy", default=settings.WS_SLOW_CONSUMER_POLICY)
+    parser.add_argument("--payload-bytes", type=int, default=256)
+    parser.add_argument("--no-trace", action="store_true", help="skip tracemalloc (accurate timings, no memory figures)")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.connections, args.messages, args.rounds, args.slow_percent, args.slow_ms,
+                                     args.queue_size, args.policy, args.payload_bytes, not args.no_trace)), indent=2))
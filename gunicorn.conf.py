@@ -1,4 +1,6 @@
 import multiprocessing
+import os
+import shutil
 
 bind = "0.0.0.0:8000"
 workers = max(2, multiprocessing.cpu_count() // 2)
@@ -9,3 +11,21 @@ keepalive = 5
 accesslog = "-"
 errorlog = "-"
 loglevel = "info"
+
+# Prometheus multiprocess mode: every worker writes its metrics to mmap files
+# in this directory and /metrics aggregates them, so a scrape sees all
+# workers instead of whichever one accepted the connection. Must be set
+# before workers import prometheus_client.
+prometheus_multiproc_dir = os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/prometheus_multiproc")
+
+
+def on_starting(server):
+    # Files left by a previous master would be summed into the new counters
+    shutil.rmtree(prometheus_multiproc_dir, ignore_errors=True)
+    os.makedirs(prometheus_multiproc_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    # Drops the dead worker's live gauges; its counters/histograms are kept
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -1,7 +1,8 @@
-import os, sys
+import asyncio, os, sys
 from logging.config import fileConfig
 from alembic import context
-from sqlalchemy import engine_from_config, pool
+from sqlalchemy import pool, text
+from sqlalchemy.ext.asyncio import create_async_engine
 
 # Add project root to path (so 'src' is importable)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
@@ -19,14 +20,23 @@ if db_url:
     config.set_main_option("sqlalchemy.url", db_url)
 
 if config.config_file_name is not None:
-    fileConfig(config.config_file_name)
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
 
-# Import application models metadata if available
-try:
-    from src.models import Base  # noqa
-    target_metadata = Base.metadata
-except Exception:
-    target_metadata = None
+# Application metadata, for autogenerate
+from src.core.database import Base  # noqa: E402
+from src.models import user, project, task, ml_model, motion  # noqa: E402,F401
+target_metadata = Base.metadata
+
+# Serializes concurrent migrate jobs (e.g. two overlapping deploys) on Postgres
+MIGRATION_LOCK_ID = 0x7265626D  # "rebm"
+
+def _async_url(url: str) -> str:
+    # The app and the migrate job share DATABASE_URL; run both on the async driver
+    if url.startswith("postgresql://") or url.startswith("postgres://"):
+        return "postgresql+asyncpg://" + url.split("://", 1)[1]
+    if url.startswith("sqlite://"):
+        return "sqlite+aiosqlite://" + url.split("://", 1)[1]
+    return url
 
 def run_migrations_offline():
     url = config.get_main_option("sqlalchemy.url")
@@ -39,16 +49,28 @@ def run_migrations_offline():
     with context.begin_transaction():
         context.run_migrations()
 
+def do_run_migrations(connection):
+    if connection.dialect.name == "postgresql":
+        connection.execute(text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+        connection.commit()
+    context.configure(connection=connection, target_metadata=target_metadata, render_as_batch=connection.dialect.name == "sqlite")
+    with context.begin_transaction():
+        context.run_migrations()
+
+async def run_async_migrations():
+    connectable = create_async_engine(_async_url(config.get_main_option("sqlalchemy.url")), poolclass=pool.NullPool)
+    async with connectable.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+    await connectable.dispose()
+
 def run_migrations_online():
-    connectable = engine_from_config(
-        config.get_section(config.config_ini_section),
-        prefix="sqlalchemy.",
-        poolclass=pool.NullPool,
-    )
-    with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
-        with context.begin_transaction():
-            context.run_migrations()
+    # A caller that already holds a connection (src.core.schema.upgrade from
+    # async code, tests) passes it in; otherwise open our own.
+    connection = config.attributes.get("connection")
+    if connection is None:
+        asyncio.run(run_async_migrations())
+    else:
+        do_run_migrations(connection)
 
 if context.is_offline_mode():
     run_migrations_offline()
@@ -0,0 +1,36 @@
+"""project listing index
+
+Composite index for the owner's newest-first project listing with keyset
+pagination on (created_at, id). Built CONCURRENTLY on Postgres so the
+projects table stays writable during the build.
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-19 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "002"
+down_revision = "001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The keyset predicate cannot order NULLs; the server default already fills new rows
+    op.execute("UPDATE projects SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL")
+    with op.batch_alter_table("projects") as batch:
+        batch.alter_column("created_at", existing_type=sa.DateTime(timezone=True), nullable=False)
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_projects_owner_created_id", "projects", ["owner_id", "created_at", "id"],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_projects_owner_created_id", table_name="projects", postgresql_concurrently=True)
+    with op.batch_alter_table("projects") as batch:
+        batch.alter_column("created_at", existing_type=sa.DateTime(timezone=True), nullable=True)
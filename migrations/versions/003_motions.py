@@ -0,0 +1,40 @@
+"""motions
+
+Motion generation jobs. Rows are written by the API when a job is queued
+and updated by the motion workers (src.workers.motion_worker).
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-19 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "003"
+down_revision = "002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "motions",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("user_id", sa.Integer, sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("project_id", sa.Integer, sa.ForeignKey("projects.id")),
+        sa.Column("audio_path", sa.String(1024), nullable=False),
+        sa.Column("parameters", sa.JSON, nullable=False),
+        sa.Column("status", sa.String(16), nullable=False),
+        sa.Column("motion_path", sa.String(1024)),
+        sa.Column("error", sa.Text),
+        sa.Column("attempts", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("started_at", sa.DateTime(timezone=True)),
+        sa.Column("completed_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_motions_user_created", "motions", ["user_id", "created_at"])
+
+
+def downgrade():
+    op.drop_index("ix_motions_user_created", table_name="motions")
+    op.drop_table("motions")
@@ -0,0 +1,38 @@
+"""motion artifacts
+
+Content-addressed motion results: motions with the same audio, parameters
+and model version point at one stored file (motions.content_key), counted
+in motion_artifacts.ref_count and collected by src.workers.motion_gc.
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "004"
+down_revision = "003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "motion_artifacts",
+        sa.Column("content_key", sa.String(64), primary_key=True),
+        sa.Column("path", sa.String(1024), nullable=False),
+        sa.Column("model_version", sa.String(64), nullable=False),
+        sa.Column("ref_count", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("released_at", sa.DateTime(timezone=True)),
+    )
+    op.add_column("motions", sa.Column("content_key", sa.String(64)))
+    op.create_index("ix_motions_content_key", "motions", ["content_key"])
+
+
+def downgrade():
+    op.drop_index("ix_motions_content_key", table_name="motions")
+    with op.batch_alter_table("motions") as batch:
+        batch.drop_column("content_key")
+    op.drop_table("motion_artifacts")
@@ -1,45 +1,58 @@
 from typing import AsyncGenerator
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
-from src.core.database import get_session
+from src.core.database import get_read_session, get_session, session_router
 from src.core.cache import redis_client
 from src.core.security import verify_token
-from src.services.auth_service import AuthService
-from src.models.user import User
+from src.services.auth_service import AuthService, UserSnapshot
 
 security = HTTPBearer()
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
+async def get_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
     async for session in get_session():
         yield session
+    # Committed: keep this user's reads on the primary until replicas catch up
+    if request.method not in ("GET", "HEAD", "OPTIONS"):
+        await session_router.mark_write(getattr(request.state, "user_id", None))
 
 async def get_redis():
     return redis_client
 
 async def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: AsyncSession = Depends(get_db),
-) -> User:
+) -> UserSnapshot:
+    # Fast path: a previously verified token and a cached user record touch
+    # neither the signature check nor Postgres (the session stays unused).
     token = credentials.credentials
     try:
         payload = verify_token(token)
         user_id = payload.get("sub")
         if user_id is None:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-        user = await AuthService(db).get_user_by_id(int(user_id))
+        user_id = int(user_id)
+        request.state.user_id = user_id
+        request.state.db_sticky = await session_router.is_sticky(user_id)
+        async for db in get_read_session(request.state.db_sticky):
+            user = await AuthService(db).get_cached_user(user_id)
         if not user:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
         return user
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=f"Token invalid: {e}")
 
-async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
+async def get_read_db(request: Request, current_user: UserSnapshot = Depends(get_current_user)) -> AsyncGenerator[AsyncSession, None]:
+    """Session for read-only endpoints: a replica, or the primary right after this user wrote."""
+    async for session in get_read_session(getattr(request.state, "db_sticky", False)):
+        yield session
+
+async def get_current_active_user(current_user: UserSnapshot = Depends(get_current_user)) -> UserSnapshot:
     if not current_user.is_active:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Inactive user")
     return current_user
 
-def require_admin(current_user: User = Depends(get_current_active_user)) -> User:
+def require_admin(current_user: UserSnapshot = Depends(get_current_active_user)) -> UserSnapshot:
     if not current_user.is_admin:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin required")
     return current_user
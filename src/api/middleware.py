@@ -1,39 +1,198 @@
-import time, logging
-from typing import Callable
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
-from src.core.metrics import metrics
+"""
+HTTP middleware stack.
+
+Everything here is raw ASGI rather than BaseHTTPMiddleware: no extra task
+per request, no response body re-streaming, and streaming responses pass
+through untouched.
+"""
+
+import json, math, time, logging, uuid
+from typing import Iterable, List, Optional, Tuple
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.middleware.trustedhost import TrustedHostMiddleware
+from starlette.middleware.sessions import SessionMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from src.core.config import settings
+from src.core.metrics import UNMATCHED_ENDPOINT, metrics
+from src.security.rate_limiter import RateLimiter, rate_limiter
 
 logger = logging.getLogger(__name__)
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        start = time.time()
-        response = await call_next(request)
-        duration = time.time() - start
+def _header(scope: Scope, name: bytes) -> Optional[str]:
+    for key, value in scope.get("headers", ()):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+async def _send_plain(send: Send, status: int, body: bytes, headers: Iterable[Tuple[bytes, bytes]] = (),
+                      content_type: bytes = b"text/plain; charset=utf-8"):
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", content_type), (b"content-length", str(len(body)).encode()), *headers],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+class ObservabilityMiddleware:
+    """Request ID, timing headers and request metrics in a single pass."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        request_id = _header(scope, b"x-request-id") or uuid.uuid4().hex
+        # Visible as request.state.request_id downstream
+        scope.setdefault("state", {})["request_id"] = request_id
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", ()))
+                headers.append((b"x-request-id", request_id.encode("latin-1")))
+                headers.append((b"x-process-time", f"{time.perf_counter() - start:.6f}".encode()))
+                message["headers"] = headers
+            await send(message)
+
+        metrics.requests_in_progress.inc()
         try:
-            metrics.record_request(request.method, request.url.path, response.status_code, duration)
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            metrics.requests_in_progress.dec()
+            # The router stores the matched route in the shared scope; label by
+            # its template so /projects/1 and /projects/2 share one series.
+            route = scope.get("route")
+            endpoint = getattr(route, "path", None) or UNMATCHED_ENDPOINT
+            try:
+                metrics.record_request(scope["method"], endpoint, status_code, time.perf_counter() - start)
+            except Exception:
+                pass
+
+# Kept for existing imports; observability now covers request logging
+RequestLoggingMiddleware = ObservabilityMiddleware
+
+class ErrorHandlingMiddleware:
+    """Turn unhandled exceptions into a JSON 500 carrying the request ID."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        started = False
+
+        async def send_wrapper(message: Message):
+            nonlocal started
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
         except Exception:
-            pass
-        response.headers["X-Process-Time"] = str(duration)
-        return response
-
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app: ASGIApp, requests_per_minute: int = 60):
-        super().__init__(app)
-        self.requests_per_minute = requests_per_minute
-        self.client_requests = {}
-
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        client_ip = request.client.host if request.client else "unknown"
-        now = time.time()
-        self.client_requests = {
-            ip: [t for t in ts if t > now - 60] for ip, ts in self.client_requests.items()
-        }
-        ts = self.client_requests.get(client_ip, [])
-        if len(ts) >= self.requests_per_minute:
-            return Response(content="Rate limit exceeded", status_code=429, headers={"Retry-After": "60"})
-        ts.append(now)
-        self.client_requests[client_ip] = ts
-        return await call_next(request)
+            logger.exception("Unhandled error on %s %s", scope.get("method"), scope.get("path"))
+            if started:
+                raise
+            body = json.dumps({
+                "error": "Internal Server Error",
+                "message": "An unexpected error occurred",
+                "request_id": scope.get("state", {}).get("request_id"),
+            }).encode()
+            await _send_plain(send, 500, body, content_type=b"application/json")
+
+class SecurityHeadersMiddleware:
+    def __init__(self, app: ASGIApp, hsts: bool = False):
+        self.app = app
+        self.headers: List[Tuple[bytes, bytes]] = [
+            (b"x-content-type-options", b"nosniff"),
+            (b"x-frame-options", b"DENY"),
+            (b"referrer-policy", b"strict-origin-when-cross-origin"),
+        ]
+        if hsts:
+            self.headers.append((b"strict-transport-security", b"max-age=31536000; includeSubDomains"))
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", ())) + self.headers
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+class RateLimitMiddleware:
+    def __init__(self, app: ASGIApp, limiter: Optional[RateLimiter] = None, requests_per_minute: Optional[int] = None):
+        self.app = app
+        if limiter is None:
+            limiter = rate_limiter if requests_per_minute is None else RateLimiter(default_limit=requests_per_minute)
+        self.limiter = limiter
+        self.exempt_paths = tuple(settings.API_RATE_LIMIT_EXEMPT_PATHS)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"].startswith(self.exempt_paths):
+            return await self.app(scope, receive, send)
+        client = scope.get("client")
+        identity = self.limiter.identify(
+            _header(scope, b"authorization"),
+            client[0] if client else None,
+        )
+        result = await self.limiter.hit(identity, scope["path"])
+        headers = [
+            (b"x-ratelimit-limit", str(result.limit).encode()),
+            (b"x-ratelimit-remaining", str(result.remaining).encode()),
+        ]
+        if not result.allowed:
+            headers.append((b"retry-after", str(max(1, math.ceil(result.retry_after))).encode()))
+            return await _send_plain(send, 429, b"Rate limit exceeded", headers)
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", ())) + headers
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+def add_middleware_stack(app: FastAPI, enabled: bool = True) -> None:
+    """Install the API middleware stack.
+
+    Starlette wraps the app in reverse order of add_middleware calls, so the
+    innermost middleware is added first. Outermost to innermost:
+    Observability, ErrorHandling, CORS, TrustedHost, RateLimit,
+    SecurityHeaders, Session, GZip.
+    """
+    if not enabled:
+        return
+    app.add_middleware(GZipMiddleware, minimum_size=1000)
+    app.add_middleware(
+        SessionMiddleware,
+        secret_key=settings.SECRET_KEY.get_secret_value(),
+        session_cookie=settings.SESSION_COOKIE_NAME,
+        max_age=settings.SESSION_MAX_AGE,
+        same_site="lax",
+        https_only=settings.USE_HTTPS,
+    )
+    app.add_middleware(SecurityHeadersMiddleware, hsts=settings.USE_HTTPS)
+    if settings.ENABLE_RATE_LIMITING:
+        app.add_middleware(RateLimitMiddleware)
+    if settings.ALLOWED_HOSTS:
+        app.add_middleware(TrustedHostMiddleware, allowed_hosts=settings.ALLOWED_HOSTS)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.CORS_ORIGINS,
+        allow_credentials=settings.CORS_ALLOW_CREDENTIALS,
+        allow_methods=settings.CORS_ALLOW_METHODS,
+        allow_headers=settings.CORS_ALLOW_HEADERS,
+        expose_headers=["X-Request-ID", "X-Process-Time"],
+    )
+    app.add_middleware(ErrorHandlingMiddleware)
+    if settings.ENABLE_REQUEST_LOGGING:
+        app.add_middleware(ObservabilityMiddleware)
@@ -3,6 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict, Any
 from sqlalchemy import text
 from src.api.dependencies import get_db, get_redis
+from src.core.database import db_manager
 
 router = APIRouter()
 
@@ -25,7 +26,7 @@ async def readiness_check(db: AsyncSession = Depends(get_db), redis = Depends(ge
             redis_ok = True
     except Exception:
         redis_ok = False
-    return {"ready": db_ok and redis_ok, "checks": {"database": db_ok, "redis": redis_ok}}
+    return {"ready": db_ok and redis_ok, "checks": {"database": db_ok, "redis": redis_ok}, "database_pool": db_manager.pool_stats()}
 
 @router.get("/live")
 async def liveness_check() -> Dict[str, str]:
@@ -1,30 +1,47 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from src.api.dependencies import get_db, get_current_user
+from src.api.dependencies import get_db, get_read_db, get_current_user
 from src.api.schemas.motion import MotionGenerationRequest, MotionGenerationResponse
-from src.services.motion_service import MotionService
-from src.models.user import User
+from src.core.exceptions import QueueUnavailableError, ValidationError
+from src.services.motion_job_service import MotionService
+from src.services.auth_service import UserSnapshot
 
 router = APIRouter()
 
-@router.post("/generate", response_model=MotionGenerationResponse)
+@router.post("/generate", response_model=MotionGenerationResponse, status_code=202)
 async def generate_motion(
     request: MotionGenerationRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
+    # Queued for the motion workers; poll GET /{motion_id} for the result
     svc = MotionService(db)
-    result = await svc.generate_motion(audio_path=request.audio_path, user_id=current_user.id, parameters=request.parameters)
-    return result
+    try:
+        return await svc.generate_motion(audio_path=request.audio_path, user_id=current_user.id, parameters=request.parameters)
+    except ValidationError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+    except QueueUnavailableError as e:
+        raise HTTPException(status_code=503, detail=e.message, headers={"Retry-After": "5"})
 
 @router.get("/{motion_id}", response_model=MotionGenerationResponse)
 async def get_motion(
     motion_id: str,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    current_user: UserSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
     svc = MotionService(db)
-    res = await svc.get_motion(motion_id)
+    res = await svc.get_motion(motion_id, user_id=current_user.id)
     if not res:
         raise HTTPException(status_code=404, detail="Motion not found")
     return res
+
+@router.delete("/{motion_id}")
+async def delete_motion(
+    motion_id: str,
+    current_user: UserSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    # Shared results stay until no motion points at them (src.workers.motion_gc)
+    if not await MotionService(db).delete_motion(motion_id, user_id=current_user.id):
+        raise HTTPException(status_code=404, detail="Motion not found")
+    return {"detail": "Motion deleted"}
@@ -0,0 +1,38 @@
+import asyncio
+from typing import Any, Dict
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from src.api.dependencies import require_admin
+from src.core.config import settings
+from src.monitoring import profiler
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+@router.get("/cpu", response_class=PlainTextResponse)
+async def cpu_profile(
+    seconds: float = Query(10, gt=0),
+    hz: int = Query(None, ge=1, le=1000),
+):
+    """Sample every thread for `seconds` and return collapsed stacks (flamegraph input)."""
+    if seconds > settings.PROFILING_MAX_SECONDS:
+        raise HTTPException(status_code=400, detail=f"seconds must be <= {settings.PROFILING_MAX_SECONDS}")
+    try:
+        # Sampling thread plus sleep run off the event loop so the API keeps serving
+        return await asyncio.to_thread(profiler.profile, seconds, hz)
+    except profiler.ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@router.get("/continuous", response_class=PlainTextResponse)
+async def continuous_profile(reset: bool = False):
+    """Collapsed stacks accumulated by the always-on profiler since start or last reset."""
+    cp = profiler.continuous_profiler
+    if cp is None or not cp.running:
+        raise HTTPException(status_code=404, detail="Continuous profiling is not enabled")
+    return cp.collapsed(reset=reset)
+
+@router.get("/continuous/status")
+async def continuous_status() -> Dict[str, Any]:
+    cp = profiler.continuous_profiler
+    if cp is None:
+        return {"running": False}
+    return cp.summary()
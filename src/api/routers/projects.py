@@ -1,13 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
-from src.core.database import get_db
-from src.api.schemas.project import ProjectCreate, ProjectRead, ProjectUpdate
-from src.core.security import get_current_active_user
+from typing import Literal, Optional
+from src.api.dependencies import get_db, get_read_db, get_current_active_user
+from src.api.schemas.project import (
+    ProjectBulkRequest, ProjectBulkResult, ProjectCreate, ProjectPage, ProjectRead, ProjectSummary, ProjectUpdate,
+)
+from src.api.schemas.task import TaskBulkRequest, TaskBulkResult
+from src.core.config import settings
 from src.models.project import Project
-from sqlalchemy import select
+from src.services.project_service import ProjectService
+from src.utils.pagination import decode_cursor, encode_cursor
+from sqlalchemy import select, tuple_
 
-router = APIRouter(prefix="/projects", tags=["projects"])
+router = APIRouter()
 
 
 @router.post("/", response_model=ProjectRead)
@@ -23,19 +28,77 @@ async def create_project(
     return new_project
 
 
-@router.get("/", response_model=List[ProjectRead])
+@router.get("/", response_model=ProjectPage)
 async def list_projects(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    view: Literal["full", "summary"] = Query("full", description="summary: id, name and created_at only"),
+    db: AsyncSession = Depends(get_read_db),
+    user=Depends(get_current_active_user),
+):
+    # Newest first, keyset on (created_at, id): every page is one range scan of
+    # ix_projects_owner_created_id, however deep the cursor is.
+    columns = (Project.id, Project.name, Project.created_at) if view == "summary" else (Project,)
+    query = select(*columns).where(Project.owner_id == user.id)
+    if cursor:
+        try:
+            created_at, last_id = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        query = query.where(tuple_(Project.created_at, Project.id) < tuple_(created_at, last_id))
+    query = query.order_by(Project.created_at.desc(), Project.id.desc()).limit(limit + 1)
+    result = await db.execute(query)
+    if view == "summary":
+        rows = [ProjectSummary(id=r.id, name=r.name, created_at=r.created_at) for r in result]
+    else:
+        rows = [ProjectRead.model_validate(p) for p in result.scalars()]
+    next_cursor = encode_cursor(rows[limit - 1].created_at, rows[limit - 1].id) if len(rows) > limit else None
+    return ProjectPage(items=rows[:limit], next_cursor=next_cursor)
+
+
+def _check_bulk_size(req):
+    total = len(req.create) + len(req.update) + len(req.delete)
+    if total > settings.API_BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {settings.API_BULK_MAX_ITEMS} items per bulk request")
+
+
+async def _finish_bulk(db: AsyncSession, req, result):
+    # Non-atomic requests commit whatever applied; atomic ones all or nothing
+    if req.atomic and result.errors:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail=[e.model_dump() for e in result.errors])
+    await db.commit()
+    return result
+
+
+@router.post("/bulk", response_model=ProjectBulkResult)
+async def bulk_projects(
+    req: ProjectBulkRequest,
     db: AsyncSession = Depends(get_db),
     user=Depends(get_current_active_user),
 ):
-    result = await db.execute(select(Project).where(Project.owner_id == user.id))
-    return result.scalars().all()
+    """Create, update and delete many projects in one transaction; failures are reported per item."""
+    _check_bulk_size(req)
+    result = await ProjectService(db).bulk_projects(user.id, req)
+    return await _finish_bulk(db, req, result)
+
+
+@router.post("/tasks/bulk", response_model=TaskBulkResult)
+async def bulk_tasks(
+    req: TaskBulkRequest,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_current_active_user),
+):
+    """Same as /bulk for tasks, which must belong to the caller's projects."""
+    _check_bulk_size(req)
+    result = await ProjectService(db).bulk_tasks(user.id, req)
+    return await _finish_bulk(db, req, result)
 
 
 @router.get("/{project_id}", response_model=ProjectRead)
 async def get_project(
     project_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     user=Depends(get_current_active_user)
 ):
     result = await db.execute(
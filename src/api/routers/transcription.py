@@ -3,7 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from src.api.dependencies import get_db, get_current_user
 from src.api.schemas.transcription import TranscriptionResponse
 from src.services.transcription_service import TranscriptionService
-from src.models.user import User
+from src.services.auth_service import UserSnapshot
 
 router = APIRouter()
 
@@ -11,7 +11,7 @@ router = APIRouter()
 async def transcribe_audio(
     file: UploadFile = File(...),
     language: str = "auto",
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     svc = TranscriptionService(db)
@@ -1,6 +1,10 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 import json, logging
-from src.utils.websocket_manager import websocket_manager
+from src.core.config import settings
+from src.core.database import get_read_session
+from src.core.security import verify_token
+from src.services.motion_job_service import MotionService, motion_event
+from src.utils.websocket_manager import job_topic, websocket_manager
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -15,12 +19,70 @@ async def websocket_endpoint(ws: WebSocket):
                 message = json.loads(data)
             except Exception:
                 message = {"type":"echo","data":data}
+            if not isinstance(message, dict):
+                message = {}
             if message.get("type") == "echo":
-                await ws.send_text(json.dumps({"type":"echo","data":message.get("data")}))
+                websocket_manager.send(ws, {"type":"echo","data":message.get("data")})
             else:
-                await ws.send_text(json.dumps({"error":"Unknown message type"}))
+                websocket_manager.send(ws, {"error":"Unknown message type"})
     except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.exception("WebSocket error: %s", e)
+        await ws.close(code=1011)
+    finally:
         websocket_manager.disconnect(ws)
+
+async def _job_snapshot(job_id: str, user_id: int):
+    # Primary, not a replica: a lagging snapshot could predate an event already missed
+    async for db in get_read_session(True):
+        motion = await MotionService(db).get_motion(job_id, user_id=user_id)
+    return motion_event(motion) if motion else None
+
+@router.websocket("/jobs")
+async def job_events_endpoint(ws: WebSocket):
+    """
+    Pushed job status for the token's user: `?token=<access token>`.
+    Events for all of the user's jobs arrive unasked; {"type": "subscribe",
+    "job_id": ...} also replies with the job's current status, so a client
+    can drop polling entirely.
+    """
+    try:
+        user_id = int(verify_token(ws.query_params.get("token", ""))["sub"])
+    except Exception:
+        await ws.close(code=1008)
+        return
+    if len(websocket_manager) >= settings.WS_MAX_CONNECTIONS:
+        await ws.close(code=1013)
+        return
+    await websocket_manager.connect(ws, user_id)
+    try:
+        while True:
+            try:
+                message = json.loads(await ws.receive_text())
+            except ValueError:
+                message = {}
+            if not isinstance(message, dict):
+                # Valid JSON, but not a command: 5, [], "x"
+                message = {}
+            kind, job_id = message.get("type"), str(message.get("job_id") or "")
+            if kind == "subscribe" and job_id:
+                snapshot = await _job_snapshot(job_id, user_id)
+                if snapshot is None:
+                    websocket_manager.send(ws, {"type": "error", "job_id": job_id, "detail": "Job not found"})
+                    continue
+                websocket_manager.subscribe(ws, job_topic(job_id))
+                websocket_manager.send(ws, snapshot)
+            elif kind == "unsubscribe" and job_id:
+                websocket_manager.unsubscribe(ws, job_topic(job_id))
+            elif kind == "ping":
+                websocket_manager.send(ws, {"type": "pong"})
+            else:
+                websocket_manager.send(ws, {"type": "error", "detail": "Unknown message type"})
+    except WebSocketDisconnect:
+        pass
     except Exception as e:
         logger.exception("WebSocket error: %s", e)
         await ws.close(code=1011)
+    finally:
+        websocket_manager.disconnect(ws)
@@ -10,6 +10,7 @@ class MotionGenerationResponse(BaseModel):
     id: str
     status: str
     motion_path: Optional[str] = None
+    error: Optional[str] = None
     created_at: datetime
     completed_at: Optional[datetime] = None
 
@@ -1,12 +1,11 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import List, Literal, Optional, Union
 
 
 class ProjectBase(BaseModel):
-    name: str = Field(..., example="Motion Capture Demo")
-    description: Optional[str] = Field(None, example="3D motion reconstruction project")
-    is_active: bool = True
+    name: str = Field(..., max_length=255, example="Motion Capture Demo")
+    description: Optional[str] = Field(None, max_length=512, example="3D motion reconstruction project")
 
 
 class ProjectCreate(ProjectBase):
@@ -14,16 +13,51 @@ class ProjectCreate(ProjectBase):
 
 
 class ProjectUpdate(BaseModel):
-    name: Optional[str] = None
-    description: Optional[str] = None
-    is_active: Optional[bool] = None
+    name: Optional[str] = Field(None, max_length=255)
+    description: Optional[str] = Field(None, max_length=512)
 
 
 class ProjectRead(ProjectBase):
     id: int
     owner_id: int
     created_at: datetime
-    updated_at: Optional[datetime]
 
     class Config:
-        orm_mode = True
+        from_attributes = True
+
+
+class ProjectSummary(BaseModel):
+    """Column-projected listing row (`view=summary`): no ORM object behind it."""
+    id: int
+    name: str
+    created_at: datetime
+
+
+class ProjectPage(BaseModel):
+    items: List[Union[ProjectRead, ProjectSummary]]
+    next_cursor: Optional[str] = Field(None, description="Pass as `cursor` for the next page; null on the last page")
+
+
+class ProjectBulkUpdate(ProjectUpdate):
+    id: int
+
+
+class ProjectBulkRequest(BaseModel):
+    create: List[ProjectCreate] = []
+    update: List[ProjectBulkUpdate] = []
+    delete: List[int] = []
+    atomic: bool = Field(False, description="Apply nothing (409) if any item fails")
+
+
+class BulkItemError(BaseModel):
+    op: Literal["create", "update", "delete"]
+    index: int = Field(..., description="Position in that operation's array")
+    id: Optional[int] = None
+    detail: str
+
+
+class ProjectBulkResult(BaseModel):
+    created: List[ProjectRead] = []
+    updated: List[int] = []
+    deleted: List[int] = []
+    errors: List[BulkItemError] = []
@@ -0,0 +1,39 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import List, Optional
+from src.api.schemas.project import BulkItemError
+
+
+class TaskCreate(BaseModel):
+    project_id: int
+    title: str = Field(..., max_length=255)
+    status: str = Field("pending", max_length=64)
+
+
+class TaskRead(TaskCreate):
+    id: int
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class TaskBulkUpdate(BaseModel):
+    id: int
+    project_id: Optional[int] = None
+    title: Optional[str] = Field(None, max_length=255)
+    status: Optional[str] = Field(None, max_length=64)
+
+
+class TaskBulkRequest(BaseModel):
+    create: List[TaskCreate] = []
+    update: List[TaskBulkUpdate] = []
+    delete: List[int] = []
+    atomic: bool = Field(False, description="Apply nothing (409) if any item fails")
+
+
+class TaskBulkResult(BaseModel):
+    created: List[TaskRead] = []
+    updated: List[int] = []
+    deleted: List[int] = []
+    errors: List[BulkItemError] = []
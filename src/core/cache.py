@@ -1,7 +1,9 @@
-import logging, json
-from typing import Any, Optional
+import asyncio, logging, json, math, random, time, uuid, zlib
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
 
 from src.core.config import settings
+from src.core.metrics import metrics
 logger = logging.getLogger(__name__)
 
 try:
@@ -9,10 +11,139 @@ try:
 except Exception:
     redis = None
 
+try:
+    import zstandard
+except Exception:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except Exception:
+    lz4_frame = None
+
+_MISS = object()
+
+# Compressed payloads start with a codec header byte. Serialized JSON never
+# starts with a control character, so values without a header (small ones,
+# and everything written before compression existed) are read as plain JSON.
+CODEC_HEADERS = {"zstd": b"\x01", "lz4": b"\x02", "zlib": b"\x03"}
+_HEADER_CODECS = {v[0]: k for k, v in CODEC_HEADERS.items()}
+
+def _codec_available(codec: str) -> bool:
+    return {"zstd": zstandard is not None, "lz4": lz4_frame is not None, "zlib": True}.get(codec, False)
+
+def compress(codec: str, data: bytes, level: Optional[int] = None) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=level if level is not None else 3).compress(data)
+    if codec == "lz4":
+        return lz4_frame.compress(data, compression_level=level or 0)
+    if codec == "zlib":
+        return zlib.compress(data, level if level is not None else 6)
+    raise ValueError(f"Unknown cache codec: {codec}")
+
+def decompress(codec: str, data: bytes) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstandard not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec == "lz4":
+        if lz4_frame is None:
+            raise RuntimeError("lz4 not installed")
+        return lz4_frame.decompress(data)
+    if codec == "zlib":
+        return zlib.decompress(data)
+    raise ValueError(f"Unknown cache codec: {codec}")
+
+def encode_value(value: Any, codec: Optional[str], min_bytes: int, level: Optional[int] = None) -> Tuple[bytes, bytes, str]:
+    """Serialize `value`; returns (json bytes, stored bytes, codec used)."""
+    raw = json.dumps(value, separators=(",", ":")).encode("utf-8")
+    if codec and len(raw) >= min_bytes:
+        packed = compress(codec, raw, level)
+        if len(packed) + 1 < len(raw):
+            return raw, CODEC_HEADERS[codec] + packed, codec
+    return raw, raw, "none"
+
+def decode_payload(data: bytes) -> bytes:
+    """Strip the codec header (if any) and return the JSON bytes."""
+    codec = _HEADER_CODECS.get(data[0]) if data else None
+    return decompress(codec, data[1:]) if codec else data
+
+# Compare-and-delete so a pod only ever releases the lock it acquired
+_RELEASE_LOCK = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+def should_refresh(expires_at: float, delta: float, beta: float, now: Optional[float] = None,
+                   rand: Optional[float] = None) -> bool:
+    """XFetch: refresh early with a probability that grows as expiry approaches.
+
+    `delta` is how long the value took to compute, so expensive entries start
+    refreshing earlier. See Vattani et al., "Optimal Probabilistic Cache
+    Stampede Prevention" (VLDB 2015).
+    """
+    now = time.time() if now is None else now
+    rand = random.random() if rand is None else rand
+    return now - delta * beta * math.log(rand or 1e-12) >= expires_at
+
+class NearCache:
+    """Bounded in-process LRU holding serialized values with a per-key expiry.
+
+    Entries are the decompressed JSON bytes, so every hit still decodes into
+    a fresh object and callers can't mutate shared state.
+    """
+
+    def __init__(self, max_entries: int, ttl: int):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str) -> Any:
+        item = self._data.get(key)
+        if item is None:
+            return _MISS
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return _MISS
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        ttl = min(ttl, self.ttl) if ttl else self.ttl
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key: str):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
 class RedisCache:
     def __init__(self):
         self.redis_client: Optional['redis.Redis'] = None
         self.ttl = settings.CACHE_TTL
+        self.near_cache: Optional[NearCache] = None
+        if settings.NEAR_CACHE_ENABLED:
+            self.near_cache = NearCache(settings.NEAR_CACHE_MAX_ENTRIES, settings.NEAR_CACHE_TTL)
+        self._near_prefixes = tuple(settings.NEAR_CACHE_PREFIXES)
+        self.codec = self._resolve_codec(settings.CACHE_COMPRESSION)
+        self.compress_min_bytes = settings.CACHE_COMPRESSION_MIN_BYTES
+        self.compress_level = settings.CACHE_COMPRESSION_LEVEL
+        self._channel = settings.CACHE_INVALIDATION_CHANNEL
+        # Lets the listener skip invalidations this process published itself
+        self._origin = uuid.uuid4().hex
+        self._listener: Optional[asyncio.Task] = None
+        # get_or_compute single-flight: one recompute per key per process
+        self._inflight: Dict[str, asyncio.Task] = {}
 
     async def initialize(self):
         if redis is None:
@@ -20,25 +151,66 @@ class RedisCache:
             self.redis_client = None
             return
         try:
-            self.redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+            # Binary client: compressed payloads aren't valid UTF-8
+            self.redis_client = redis.from_url(str(settings.REDIS_URL), decode_responses=False)
             await self.redis_client.ping()
             logger.info("Redis ready")
         except Exception as e:
             logger.warning("Redis disabled: %s", e)
             self.redis_client = None
+            return
+        if self.near_cache is not None and self._listener is None:
+            self._listener = asyncio.create_task(self._listen_for_invalidations())
+
+    @staticmethod
+    def _resolve_codec(codec: Optional[str]) -> Optional[str]:
+        codec = (codec or "none").lower()
+        if codec == "none":
+            return None
+        if codec not in CODEC_HEADERS:
+            logger.warning("Unknown CACHE_COMPRESSION %r; storing values uncompressed", codec)
+            return None
+        if not _codec_available(codec):
+            logger.warning("%s not installed; falling back to zlib cache compression", codec)
+            return "zlib"
+        return codec
+
+    @staticmethod
+    def _prefix(key: str) -> str:
+        return key.split(":", 1)[0]
+
+    def _near_cacheable(self, key: str) -> bool:
+        return self.near_cache is not None and self._prefix(key) in self._near_prefixes
 
     async def get(self, key: str):
+        near = self._near_cacheable(key)
+        if near:
+            v = self.near_cache.get(key)
+            metrics.record_near_cache(self._prefix(key), v is not _MISS, len(self.near_cache))
+            if v is not _MISS:
+                return json.loads(v)
         if not self.redis_client: return None
         try:
             v = await self.redis_client.get(key)
-            return json.loads(v) if v else None
-        except Exception:
+            if not v:
+                return None
+            v = decode_payload(v)
+            if near:
+                self.near_cache.set(key, v)
+            return json.loads(v)
+        except Exception as e:
+            logger.debug("Cache read of %s failed: %s", key, e)
             return None
 
     async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
         if not self.redis_client: return False
         try:
-            await self.redis_client.setex(key, ttl or self.ttl, json.dumps(value))
+            raw, stored, codec = encode_value(value, self.codec, self.compress_min_bytes, self.compress_level)
+            await self.redis_client.setex(key, ttl or self.ttl, stored)
+            metrics.record_cache_write(self._prefix(key), codec, len(raw), len(stored))
+            if self._near_cacheable(key):
+                self.near_cache.set(key, raw, ttl or self.ttl)
+                await self._publish_invalidation(key)
             return True
         except Exception:
             return False
@@ -47,6 +219,9 @@ class RedisCache:
         if not self.redis_client: return False
         try:
             await self.redis_client.delete(key)
+            if self._near_cacheable(key):
+                self.near_cache.invalidate(key)
+                await self._publish_invalidation(key)
             return True
         except Exception:
             return False
@@ -55,11 +230,173 @@ class RedisCache:
         if not self.redis_client: return False
         try:
             await self.redis_client.flushdb()
+            if self.near_cache is not None:
+                self.near_cache.clear()
+                await self._publish_invalidation("*")
             return True
         except Exception:
             return False
 
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: Optional[int] = None,
+        stale_ttl: Optional[int] = None,
+        beta: Optional[float] = None,
+    ) -> Any:
+        """Return the cached value for `key`, computing it at most once cluster-wide.
+
+        Entries stay in Redis for `ttl + stale_ttl`. Past `ttl` (or earlier, as
+        decided by XFetch) the current value is still returned while a single
+        pod refreshes it in the background under a Redis lock. Only a cold
+        miss makes the caller wait for `compute`.
+
+        Keys written here hold an envelope, so read them back through
+        get_or_compute rather than get.
+        """
+        ttl = ttl or self.ttl
+        stale_ttl = settings.CACHE_STALE_TTL if stale_ttl is None else stale_ttl
+        beta = settings.CACHE_XFETCH_BETA if beta is None else beta
+
+        entry = await self.get(key)
+        if isinstance(entry, dict) and "e" in entry:
+            if should_refresh(entry["e"], entry.get("d", 0.0), beta):
+                if key not in self._inflight:
+                    self._start_compute(key, compute, ttl, stale_ttl, wait_for_peer=False)
+            return entry["v"]
+
+        task = self._inflight.get(key)
+        if task is not None:
+            value = await asyncio.shield(task)
+            if value is not _MISS:
+                return value
+        task = self._start_compute(key, compute, ttl, stale_ttl, wait_for_peer=True)
+        return await asyncio.shield(task)
+
+    def _start_compute(self, key, compute, ttl, stale_ttl, wait_for_peer: bool) -> asyncio.Task:
+        task = asyncio.create_task(self._compute_locked(key, compute, ttl, stale_ttl, wait_for_peer))
+        self._inflight[key] = task
+
+        def _done(t: asyncio.Task):
+            if self._inflight.get(key) is t:
+                del self._inflight[key]
+            if not t.cancelled() and t.exception() is not None and not wait_for_peer:
+                logger.warning("Background refresh of %s failed: %s", key, t.exception())
+        task.add_done_callback(_done)
+        return task
+
+    async def _compute_locked(self, key, compute, ttl, stale_ttl, wait_for_peer: bool) -> Any:
+        token = await self._acquire_lock(key)
+        if token is None:
+            if not wait_for_peer:
+                # Another pod is already refreshing; keep serving the old value
+                return _MISS
+            entry = await self._wait_for_peer(key)
+            if entry is not None:
+                return entry["v"]
+        try:
+            start = time.time()
+            value = await compute()
+            now = time.time()
+            await self.set(key, {"v": value, "d": now - start, "e": now + ttl}, ttl=ttl + stale_ttl)
+            return value
+        finally:
+            if token is not None:
+                await self._release_lock(key, token)
+
+    async def _acquire_lock(self, key: str) -> Optional[str]:
+        if not self.redis_client:
+            return ""
+        token = uuid.uuid4().hex
+        try:
+            ok = await self.redis_client.set(f"lock:{key}", token, nx=True, ex=settings.CACHE_LOCK_TIMEOUT)
+        except Exception:
+            # Redis trouble shouldn't block computation, only deduplication
+            return ""
+        return token if ok else None
+
+    async def _release_lock(self, key: str, token: str):
+        if not token or not self.redis_client:
+            return
+        try:
+            await self.redis_client.eval(_RELEASE_LOCK, 1, f"lock:{key}", token)
+        except Exception as e:
+            logger.debug("Failed to release lock for %s: %s", key, e)
+
+    async def _wait_for_peer(self, key: str) -> Optional[dict]:
+        """Poll for the value another pod is computing, up to the lock timeout."""
+        deadline = time.monotonic() + settings.CACHE_LOCK_TIMEOUT
+        delay = 0.05
+        while time.monotonic() < deadline:
+            await asyncio.sleep(delay)
+            entry = await self.get(key)
+            if isinstance(entry, dict) and "e" in entry:
+                return entry
+            delay = min(delay * 2, 1.0)
+        return None
+
+    async def _publish_invalidation(self, key: str):
+        try:
+            await self.redis_client.publish(self._channel, json.dumps({"origin": self._origin, "key": key}))
+        except Exception as e:
+            logger.debug("Near-cache invalidation publish failed: %s", e)
+
+    def _apply_invalidation(self, data: str):
+        try:
+            msg = json.loads(data)
+        except (TypeError, ValueError):
+            return
+        if msg.get("origin") == self._origin:
+            return
+        key = msg.get("key")
+        if key == "*":
+            self.near_cache.clear()
+        elif key:
+            self.near_cache.invalidate(key)
+        metrics.record_near_cache_invalidation("pubsub")
+
+    async def _listen_for_invalidations(self):
+        """Evict near-cache entries written or deleted by other processes.
+
+        While the subscription is down we can't see remote writes, so the
+        near-cache is flushed on every (re)connect; NEAR_CACHE_TTL bounds
+        staleness for anything published in between.
+        """
+        backoff = 1
+        while True:
+            pubsub = None
+            try:
+                pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+                await pubsub.subscribe(self._channel)
+                self.near_cache.clear()
+                backoff = 1
+                async for message in pubsub.listen():
+                    if message and message.get("type") == "message":
+                        self._apply_invalidation(message.get("data"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Near-cache invalidation listener disconnected: %s", e)
+                self.near_cache.clear()
+                metrics.record_near_cache_invalidation("reconnect")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+            finally:
+                if pubsub is not None:
+                    try:
+                        await pubsub.aclose()
+                    except Exception:
+                        pass
+
     async def close(self):
+        if self._listener:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._listener = None
         if self.redis_client:
             await self.redis_client.close()
 
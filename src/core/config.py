@@ -41,10 +41,19 @@ class Settings(BaseSettings):
     # ===== Security Settings =====
     SECRET_KEY: SecretStr = Field(..., env="SECRET_KEY")
     JWT_SECRET_KEY: SecretStr = Field(..., env="JWT_SECRET_KEY")
-    JWT_ALGORITHM: str = Field("HS256", env="JWT_ALGORITHM")
+    JWT_ALGORITHM: str = Field("HS256", env="JWT_ALGORITHM")  # HS256, or RS256/EdDSA with JWT_KEYS_DIR
+    JWT_KEYS_DIR: Optional[str] = Field(None, env="JWT_KEYS_DIR")  # <kid>.pem signing keys (private or public-only)
+    JWT_ACTIVE_KID: Optional[str] = Field(None, env="JWT_ACTIVE_KID")  # key that signs new tokens
+    JWT_ISSUER: Optional[str] = Field(None, env="JWT_ISSUER")
+    JWT_AUDIENCE: Optional[str] = Field(None, env="JWT_AUDIENCE")
+    JWKS_MAX_AGE: int = Field(300, env="JWKS_MAX_AGE")  # Cache-Control on /.well-known/jwks.json
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = Field(30, env="JWT_ACCESS_TOKEN_EXPIRE_MINUTES")
     JWT_REFRESH_TOKEN_EXPIRE_DAYS: int = Field(7, env="JWT_REFRESH_TOKEN_EXPIRE_DAYS")
     PASSWORD_HASH_ROUNDS: int = Field(12, env="PASSWORD_HASH_ROUNDS")
+    PASSWORD_HASH_WORKERS: int = Field(4, env="PASSWORD_HASH_WORKERS")  # dedicated bcrypt threads
+    PASSWORD_HASH_QUEUE_SIZE: int = Field(64, env="PASSWORD_HASH_QUEUE_SIZE")  # waiting calls before 503
+    AUTH_TOKEN_CACHE_SIZE: int = Field(10000, env="AUTH_TOKEN_CACHE_SIZE")  # verified JWTs kept until exp
+    AUTH_USER_CACHE_TTL: int = Field(30, env="AUTH_USER_CACHE_TTL")  # seconds; 0 disables
     
     # OAuth Settings
     GOOGLE_CLIENT_ID: Optional[str] = Field(None, env="GOOGLE_CLIENT_ID")
@@ -59,6 +68,13 @@ class Settings(BaseSettings):
     DATABASE_POOL_TIMEOUT: int = Field(30, env="DATABASE_POOL_TIMEOUT")
     DATABASE_POOL_RECYCLE: int = Field(3600, env="DATABASE_POOL_RECYCLE")
     DATABASE_ECHO: bool = Field(False, env="DATABASE_ECHO")
+    DATABASE_STATEMENT_CACHE_SIZE: int = Field(500, env="DATABASE_STATEMENT_CACHE_SIZE")  # asyncpg prepared statements; 0 behind pgbouncer
+    DATABASE_SLOW_QUERY_MS: int = Field(500, env="DATABASE_SLOW_QUERY_MS")  # log statements slower than this; 0 disables
+    DATABASE_REPLICA_URLS: List[str] = Field([], env="DATABASE_REPLICA_URLS")  # read replicas, JSON list
+    DATABASE_REPLICA_MAX_LAG: float = Field(5.0, env="DATABASE_REPLICA_MAX_LAG")  # seconds before a replica stops taking reads
+    DATABASE_REPLICA_CHECK_INTERVAL: int = Field(10, env="DATABASE_REPLICA_CHECK_INTERVAL")  # seconds
+    DATABASE_READ_YOUR_WRITES: int = Field(5, env="DATABASE_READ_YOUR_WRITES")  # seconds a writer reads from the primary; 0 disables
+    DATABASE_SCHEMA_MODE: str = Field("verify", env="DATABASE_SCHEMA_MODE")  # verify (alembic revision), create (dev/test only), skip
     
     # Test Database
     TEST_DATABASE_URL: Optional[PostgresDsn] = Field(None, env="TEST_DATABASE_URL")
@@ -69,7 +85,25 @@ class Settings(BaseSettings):
     REDIS_DECODE_RESPONSES: bool = Field(True, env="REDIS_DECODE_RESPONSES")
     CACHE_TTL: int = Field(3600, env="CACHE_TTL")  # seconds
     SESSION_TTL: int = Field(86400, env="SESSION_TTL")  # 24 hours
-    
+
+    # In-process near-cache in front of Redis
+    NEAR_CACHE_ENABLED: bool = Field(False, env="NEAR_CACHE_ENABLED")
+    NEAR_CACHE_MAX_ENTRIES: int = Field(10000, env="NEAR_CACHE_MAX_ENTRIES")
+    NEAR_CACHE_TTL: int = Field(5, env="NEAR_CACHE_TTL")  # seconds, upper bound on staleness
+    NEAR_CACHE_PREFIXES: List[str] = Field(["motion", "whisper", "user"], env="NEAR_CACHE_PREFIXES")  # JSON list
+    CACHE_INVALIDATION_CHANNEL: str = Field("cache:invalidate", env="CACHE_INVALIDATION_CHANNEL")
+    JOB_EVENTS_CHANNEL: str = Field("jobs:events", env="JOB_EVENTS_CHANNEL")  # job status transitions, fanned out to WebSockets
+
+    # get_or_compute: stale-while-revalidate / probabilistic early refresh
+    CACHE_STALE_TTL: int = Field(300, env="CACHE_STALE_TTL")  # seconds a stale value may still be served
+    CACHE_XFETCH_BETA: float = Field(1.0, env="CACHE_XFETCH_BETA")  # >1 refreshes earlier, 0 disables
+    CACHE_LOCK_TIMEOUT: int = Field(30, env="CACHE_LOCK_TIMEOUT")  # seconds
+
+    # Value compression for large cache entries
+    CACHE_COMPRESSION: str = Field("zstd", env="CACHE_COMPRESSION")  # zstd, lz4, zlib, none
+    CACHE_COMPRESSION_MIN_BYTES: int = Field(1024, env="CACHE_COMPRESSION_MIN_BYTES")
+    CACHE_COMPRESSION_LEVEL: Optional[int] = Field(None, env="CACHE_COMPRESSION_LEVEL")  # codec default
+
     # ===== Storage Configuration =====
     STORAGE_BACKEND: str = Field("gcs", env="STORAGE_BACKEND")  # local, gcs, s3
     
@@ -103,6 +137,14 @@ class Settings(BaseSettings):
     VAE_MODEL_PATH: Path = Field(MODELS_DIR / "vae", env="VAE_MODEL_PATH")
     
     # Model Settings
+    ENABLE_ML_MODELS: bool = Field(True, env="ENABLE_ML_MODELS")  # start the model manager (API and motion worker)
+    ENABLE_WHISPER: bool = Field(True, env="ENABLE_WHISPER")
+    ENABLE_MOTION_MODEL: bool = Field(True, env="ENABLE_MOTION_MODEL")
+    ENABLE_MOTION_VAE: bool = Field(True, env="ENABLE_MOTION_VAE")
+    PRELOAD_WHISPER: bool = Field(False, env="PRELOAD_WHISPER")  # otherwise loaded on first use
+    PRELOAD_MOTION_MODEL: bool = Field(False, env="PRELOAD_MOTION_MODEL")
+    MAX_GPU_MEMORY_MB: int = Field(16384, env="MAX_GPU_MEMORY_MB")
+    MAX_CPU_MEMORY_MB: int = Field(8192, env="MAX_CPU_MEMORY_MB")
     WHISPER_MODEL_SIZE: str = Field("medium", env="WHISPER_MODEL_SIZE")  # tiny, base, small, medium, large
     WHISPER_DEVICE: str = Field("auto", env="WHISPER_DEVICE")  # auto, cuda, cpu
     WHISPER_COMPUTE_TYPE: str = Field("float16", env="WHISPER_COMPUTE_TYPE")
@@ -111,10 +153,12 @@ class Settings(BaseSettings):
     
     MOTION_MODEL_VERSION: str = Field("v1.5", env="MOTION_MODEL_VERSION")
     MOTION_DEVICE: str = Field("auto", env="MOTION_DEVICE")
-    MOTION_BATCH_SIZE: int = Field(4, env="MOTION_BATCH_SIZE")
+    MOTION_BATCH_SIZE: int = Field(4, env="MOTION_BATCH_SIZE")  # compatible queued jobs per diffusion call
+    MOTION_BATCH_WAIT_MS: int = Field(100, env="MOTION_BATCH_WAIT_MS")  # how long a worker waits for a partial batch to fill
     MOTION_MAX_LENGTH: int = Field(600, env="MOTION_MAX_LENGTH")  # frames
     MOTION_FPS: int = Field(30, env="MOTION_FPS")
     MOTION_CACHE_TTL: int = Field(7200, env="MOTION_CACHE_TTL")  # 2 hours
+    MOTION_ARTIFACT_GC_GRACE: int = Field(86400, env="MOTION_ARTIFACT_GC_GRACE")  # seconds an unreferenced result (or stray file) is kept before GC deletes it
     
     # Triton Settings
     TRITON_URL: Optional[str] = Field(None, env="TRITON_URL")
@@ -124,8 +168,23 @@ class Settings(BaseSettings):
     # ===== API Configuration =====
     API_V1_PREFIX: str = Field("/api/v1", env="API_V1_PREFIX")
     API_KEY_HEADER: str = Field("X-API-Key", env="API_KEY_HEADER")
-    API_RATE_LIMIT: int = Field(100, env="API_RATE_LIMIT")  # requests per minute
+    API_RATE_LIMIT: int = Field(100, env="API_RATE_LIMIT")  # requests per window (default: minute)
+    API_RATE_LIMIT_WINDOW: int = Field(60, env="API_RATE_LIMIT_WINDOW")  # seconds
+    # Path prefix -> limit, e.g. {"/api/v1/auth/login": 10}
+    API_RATE_LIMIT_ROUTES: Dict[str, int] = Field({}, env="API_RATE_LIMIT_ROUTES")
+    # Client identity ("user:<id>", "ip:<addr>") -> limit
+    API_RATE_LIMIT_CLIENTS: Dict[str, int] = Field({}, env="API_RATE_LIMIT_CLIENTS")
+    API_RATE_LIMIT_EXEMPT_PATHS: List[str] = Field(["/health", "/metrics", "/.well-known"], env="API_RATE_LIMIT_EXEMPT_PATHS")
     API_TIMEOUT: int = Field(30, env="API_TIMEOUT")  # seconds
+    API_BULK_MAX_ITEMS: int = Field(1000, env="API_BULK_MAX_ITEMS")  # items per bulk request, all operations together
+
+    # Middleware stack
+    ENABLE_REQUEST_LOGGING: bool = Field(True, env="ENABLE_REQUEST_LOGGING")
+    ENABLE_RATE_LIMITING: bool = Field(True, env="ENABLE_RATE_LIMITING")
+    ALLOWED_HOSTS: List[str] = Field([], env="ALLOWED_HOSTS")
+    SESSION_COOKIE_NAME: str = Field("rebellis_session", env="SESSION_COOKIE_NAME")
+    SESSION_MAX_AGE: int = Field(86400, env="SESSION_MAX_AGE")
+    USE_HTTPS: bool = Field(False, env="USE_HTTPS")
     
     # CORS Settings
     CORS_ORIGINS: List[str] = Field(["http://localhost:3000"], env="CORS_ORIGINS")
@@ -138,12 +197,19 @@ class Settings(BaseSettings):
     WS_HEARTBEAT_INTERVAL: int = Field(30, env="WS_HEARTBEAT_INTERVAL")
     WS_MAX_CONNECTIONS: int = Field(1000, env="WS_MAX_CONNECTIONS")
     WS_MAX_MESSAGE_SIZE: int = Field(1024 * 1024, env="WS_MAX_MESSAGE_SIZE")  # 1MB
+    WS_SEND_QUEUE_SIZE: int = Field(256, env="WS_SEND_QUEUE_SIZE")  # outbound messages buffered per connection
+    WS_SLOW_CONSUMER_POLICY: str = Field("drop_oldest", env="WS_SLOW_CONSUMER_POLICY")  # drop_oldest, drop_newest, disconnect
+    WS_BACKPLANE_CHANNEL: str = Field("ws:broadcast", env="WS_BACKPLANE_CHANNEL")  # room broadcasts shared by all API pods
     
     # ===== Queue Configuration =====
     CELERY_BROKER_URL: Optional[str] = Field(None, env="CELERY_BROKER_URL")
     CELERY_RESULT_BACKEND: Optional[str] = Field(None, env="CELERY_RESULT_BACKEND")
     TASK_MAX_RETRIES: int = Field(3, env="TASK_MAX_RETRIES")
     TASK_TIMEOUT: int = Field(300, env="TASK_TIMEOUT")  # 5 minutes
+    TASK_VISIBILITY_TIMEOUT: int = Field(360, env="TASK_VISIBILITY_TIMEOUT")  # unacked seconds before another worker reclaims a job; > TASK_TIMEOUT
+    JOB_QUEUE_MAXLEN: int = Field(100000, env="JOB_QUEUE_MAXLEN")  # approximate cap per stream
+    WORKER_CONCURRENCY: int = Field(1, env="WORKER_CONCURRENCY")  # jobs one worker process runs at once
+    WORKER_METRICS_PORT: int = Field(9102, env="WORKER_METRICS_PORT")
     
     # ===== Monitoring & Logging =====
     LOG_LEVEL: str = Field("INFO", env="LOG_LEVEL")
@@ -156,12 +222,21 @@ class Settings(BaseSettings):
     ENABLE_METRICS: bool = Field(True, env="ENABLE_METRICS")
     METRICS_PORT: int = Field(9090, env="METRICS_PORT")
     METRICS_PATH: str = Field("/metrics", env="METRICS_PATH")
+    METRICS_MAX_ENDPOINT_LABELS: int = Field(500, env="METRICS_MAX_ENDPOINT_LABELS")
     
     # Tracing
     ENABLE_TRACING: bool = Field(False, env="ENABLE_TRACING")
+    ENABLE_STAGE_TIMING: bool = Field(True, env="ENABLE_STAGE_TIMING")  # per-stage inference histograms
     JAEGER_HOST: Optional[str] = Field(None, env="JAEGER_HOST")
     JAEGER_PORT: Optional[int] = Field(None, env="JAEGER_PORT")
     
+    # Profiling (admin-only sampling profiler)
+    ENABLE_PROFILING: bool = Field(False, env="ENABLE_PROFILING")
+    PROFILING_DEFAULT_HZ: int = Field(100, env="PROFILING_DEFAULT_HZ")
+    PROFILING_MAX_SECONDS: int = Field(60, env="PROFILING_MAX_SECONDS")
+    PROFILING_CONTINUOUS: bool = Field(False, env="PROFILING_CONTINUOUS")
+    PROFILING_CONTINUOUS_HZ: int = Field(10, env="PROFILING_CONTINUOUS_HZ")
+    
     # Sentry
     SENTRY_DSN: Optional[str] = Field(None, env="SENTRY_DSN")
     SENTRY_ENVIRONMENT: Optional[str] = Field(None, env="SENTRY_ENVIRONMENT")
@@ -212,6 +287,20 @@ class Settings(BaseSettings):
             return [e.strip() for e in v.split(",") if e.strip()]
         return v
     
+    @field_validator("DATABASE_SCHEMA_MODE", mode="after")
+    def validate_schema_mode(cls, v):
+        allowed = ["verify", "create", "skip"]
+        if v not in allowed:
+            raise ValueError(f"DATABASE_SCHEMA_MODE must be one of {allowed}")
+        return v
+
+    @field_validator("WS_SLOW_CONSUMER_POLICY", mode="after")
+    def validate_ws_policy(cls, v):
+        allowed = ["drop_oldest", "drop_newest", "disconnect"]
+        if v not in allowed:
+            raise ValueError(f"WS_SLOW_CONSUMER_POLICY must be one of {allowed}")
+        return v
+
     @field_validator("APP_ENV", mode="after")
     def validate_environment(cls, v):
         allowed = ["development", "staging", "production", "testing"]
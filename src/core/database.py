@@ -1,28 +1,217 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator
-from sqlalchemy import text
+from typing import Any, AsyncGenerator, Dict, List, Optional
+from sqlalchemy import event, exc, text
+from src.core.cache import redis_client
 from src.core.config import settings
+from src.core.metrics import metrics
+import asyncio
+import itertools
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    pool_pre_ping=True,
+_OPERATIONS = frozenset({"SELECT", "INSERT", "UPDATE", "DELETE", "WITH"})
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool reporting checkout wait, checked-out and overflow
+    per engine, so a saturated pool shows up as rising wait times long
+    before callers hit pool_timeout. The engine name travels as the pool's
+    logging_name, which recreate() preserves.
+    """
+
+    @property
+    def engine_name(self) -> str:
+        return self._orig_logging_name or "primary"
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            conn = super().connect()
+        except exc.TimeoutError:
+            metrics.db_pool_timeouts.labels(engine=self.engine_name).inc()
+            raise
+        metrics.record_db_checkout(self.engine_name, time.perf_counter() - start, self.checkedout(), self.overflow())
+        return conn
+
+    def _do_return_conn(self, record):
+        super()._do_return_conn(record)
+        metrics.record_db_pool(self.engine_name, self.checkedout(), self.overflow())
+
+
+def _operation(statement: str) -> str:
+    verb = statement.lstrip()[:6].split(None, 1)[0].upper() if statement.strip() else ""
+    return verb if verb in _OPERATIONS else "OTHER"
+
+
+def _instrument_queries(engine: AsyncEngine, name: str, slow_ms: int):
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        context._query_start = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _finish(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._query_start
+        slow = slow_ms > 0 and elapsed * 1000 >= slow_ms
+        metrics.record_db_query(name, _operation(statement), elapsed, slow)
+        if slow:
+            # Statement text only: parameters may carry user data
+            logger.warning("Slow query on %s: %.0f ms: %s", name, elapsed * 1000, " ".join(statement.split())[:500])
+
+
+def create_engine(url: Optional[str] = None, name: str = "primary", **overrides: Any) -> AsyncEngine:
+    """
+    Async engine built from the DATABASE_* settings: sized, recycled and
+    pre-pinged pool, asyncpg prepared-statement cache, pool and query
+    metrics labelled `name`. SQLite (tests, benchmarks) gets no pool sizing.
+    """
+    url = url or settings.get_database_url()
+    kwargs: Dict[str, Any] = {"echo": settings.DATABASE_ECHO, "logging_name": name}
+    if not url.startswith("sqlite"):
+        kwargs.update(
+            poolclass=InstrumentedPool,
+            pool_size=settings.DATABASE_POOL_SIZE,
+            max_overflow=settings.DATABASE_MAX_OVERFLOW,
+            pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+            pool_recycle=settings.DATABASE_POOL_RECYCLE,
+            pool_pre_ping=True,
+            pool_logging_name=name,
+        )
+        if "+asyncpg" in url:
+            cache_size = settings.DATABASE_STATEMENT_CACHE_SIZE
+            # prepared_statement_cache_size is SQLAlchemy's per-connection LRU of
+            # asyncpg prepared statements; statement_cache_size is asyncpg's own.
+            # pgbouncer in transaction mode needs both off.
+            kwargs["connect_args"] = {"prepared_statement_cache_size": cache_size}
+            if cache_size == 0:
+                kwargs["connect_args"]["statement_cache_size"] = 0
+    kwargs.update(overrides)
+    engine = create_async_engine(url, **kwargs)
+    _instrument_queries(engine, name, settings.DATABASE_SLOW_QUERY_MS)
+    return engine
+
+
+# Replay lag, treated as zero when the replica has applied everything it received
+# (pg_last_xact_replay_timestamp alone grows while the primary is idle).
+REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
 )
 
+
+class SessionRouter:
+    """
+    Picks the engine for read-only sessions: healthy replicas round-robin,
+    the primary when none is healthy, or when the caller wrote within the
+    last DATABASE_READ_YOUR_WRITES seconds (so users see their own writes).
+
+    A background check measures each replica's lag and takes it out of
+    rotation above DATABASE_REPLICA_MAX_LAG or when it stops answering.
+    Writers are remembered in-process and in Redis, so stickiness holds
+    across workers and pods.
+    """
+
+    def __init__(self, primary: AsyncEngine, replicas: List[AsyncEngine], max_lag: float, sticky_seconds: int):
+        self.primary = primary
+        self.replicas = replicas
+        self.max_lag = max_lag
+        self.sticky_seconds = sticky_seconds
+        self.healthy: Dict[str, bool] = {self.name(e): True for e in replicas}
+        self._next = itertools.count()
+        self._writers: Dict[Any, float] = {}
+        self._checker: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def name(engine: AsyncEngine) -> str:
+        return engine.sync_engine.logging_name or "primary"
+
+    def read_engine(self, sticky: bool = False) -> AsyncEngine:
+        if sticky:
+            reason, engine = "sticky", self.primary
+        else:
+            healthy = [e for e in self.replicas if self.healthy[self.name(e)]]
+            if healthy:
+                reason, engine = "replica", healthy[next(self._next) % len(healthy)]
+            else:
+                reason, engine = ("fallback" if self.replicas else "primary"), self.primary
+        metrics.db_reads_routed.labels(engine=self.name(engine), reason=reason).inc()
+        return engine
+
+    async def mark_write(self, actor: Any):
+        if not self.replicas or self.sticky_seconds <= 0 or actor is None:
+            return
+        now = time.monotonic()
+        # Re-inserted so the dict stays in expiry order: expired writers are at the front
+        self._writers.pop(actor, None)
+        self._writers[actor] = now + self.sticky_seconds
+        while True:
+            writer, until = next(iter(self._writers.items()))
+            if until > now:
+                break
+            del self._writers[writer]
+        await redis_client.set(f"dbrw:{actor}", 1, ttl=self.sticky_seconds)
+
+    async def is_sticky(self, actor: Any) -> bool:
+        if not self.replicas or self.sticky_seconds <= 0 or actor is None:
+            return False
+        until = self._writers.get(actor)
+        if until is not None:
+            if until > time.monotonic():
+                return True
+            del self._writers[actor]
+        return bool(await redis_client.get(f"dbrw:{actor}"))
+
+    async def check_replicas(self):
+        for replica in self.replicas:
+            name = self.name(replica)
+            lag = None
+            try:
+                async with replica.connect() as conn:
+                    query = REPLICA_LAG_SQL if replica.dialect.name == "postgresql" else text("SELECT 0")
+                    lag = float(await conn.scalar(query) or 0)
+                healthy = lag <= self.max_lag
+            except Exception as e:
+                logger.debug("Replica check of %s failed: %s", name, e)
+                healthy = False
+            if healthy != self.healthy[name]:
+                logger.warning("Replica %s %s reads (lag=%s)", name, "back in" if healthy else "out of", lag)
+            self.healthy[name] = healthy
+            metrics.record_replica(name, lag, healthy)
+
+    async def _check_loop(self, interval: float):
+        while True:
+            await self.check_replicas()
+            await asyncio.sleep(interval)
+
+    def start(self, interval: float):
+        if self.replicas and self._checker is None:
+            self._checker = asyncio.create_task(self._check_loop(interval))
+
+    async def close(self):
+        if self._checker is not None:
+            self._checker.cancel()
+            self._checker = None
+        for replica in self.replicas:
+            await replica.dispose()
+
+
+engine = create_engine()
+replica_engines = [create_engine(url, name=f"replica-{i}") for i, url in enumerate(settings.DATABASE_REPLICA_URLS)]
+session_router = SessionRouter(engine, replica_engines, settings.DATABASE_REPLICA_MAX_LAG, settings.DATABASE_READ_YOUR_WRITES)
+
 AsyncSessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 Base = declarative_base()
 
 class DatabaseManager:
     async def init_db(self):
-        async with engine.begin() as conn:
-            from src.models import user, project, task, ml_model  # noqa
-            await conn.run_sync(Base.metadata.create_all)
-            logger.info("DB tables ready")
+        # No DDL here by default: the migrate job owns the schema (see src.core.schema)
+        from src.core.schema import ensure_schema
+        await ensure_schema(engine, settings.DATABASE_SCHEMA_MODE)
 
     async def check_connection(self) -> bool:
         try:
@@ -33,6 +222,12 @@ class DatabaseManager:
             logger.error("DB check failed: %s", e)
             return False
 
+    def pool_stats(self) -> Dict[str, int]:
+        pool = engine.pool
+        if not isinstance(pool, InstrumentedPool):
+            return {}
+        return {"size": pool.size(), "checked_out": pool.checkedout(), "overflow": max(0, pool.overflow())}
+
     @asynccontextmanager
     async def get_session(self) -> AsyncGenerator[AsyncSession, None]:
         async with AsyncSessionLocal() as session:
@@ -51,5 +246,10 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
     async with db_manager.get_session() as s:
         yield s
 
+async def get_read_session(sticky: bool = False) -> AsyncGenerator[AsyncSession, None]:
+    """Session for read-only work, bound to a replica when one is usable. Never committed."""
+    async with AsyncSessionLocal(bind=session_router.read_engine(sticky)) as s:
+        yield s
+
 async def init_db():
     await db_manager.init_db()
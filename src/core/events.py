@@ -5,12 +5,15 @@ from fastapi import FastAPI
 from src.core.config import settings
 from src.ml_serving.model_manager import ModelManager
 from src.core.cache import redis_client
-from src.core.metrics import MetricsCollector
+from src.core.metrics import metrics
+from src.core.security import password_pool
+from src.core.database import session_router
+from src.core.job_events import job_events
+from src.utils.websocket_manager import websocket_manager
 
 logger = logging.getLogger(__name__)
 
 model_manager = ModelManager()
-metrics = MetricsCollector()
 
 
 async def startup_handler(app: FastAPI):
@@ -38,6 +41,12 @@ async def startup_handler(app: FastAPI):
     except Exception as e:
         logger.warning(f"⚠️ Metrics disabled or failed: {e}")
 
+    # Replica lag checks; reads fall back to the primary while a replica lags
+    session_router.start(settings.DATABASE_REPLICA_CHECK_INTERVAL)
+
+    # Job status from the workers, pushed to this process's WebSockets
+    job_events.start(websocket_manager.dispatch_job_event)
+
     # Any async startup hooks (background tasks, queues, etc.)
     logger.info(f"App started in {settings.APP_ENV} mode (v{settings.APP_VERSION})")
 
@@ -52,12 +61,18 @@ async def shutdown_handler(app: FastAPI):
     except Exception as e:
         logger.error(f"Failed to cleanup models: {e}")
 
+    await job_events.close()
+    await websocket_manager.close()
+
     try:
         await redis_client.close()
         logger.info("🔌 Redis connection closed")
     except Exception as e:
         logger.warning(f"Error during Redis closure: {e}")
 
+    password_pool.shutdown()
+    await session_router.close()
+
     try:
         await metrics.stop()
         logger.info("📊 Metrics stopped gracefully")
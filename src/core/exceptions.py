@@ -19,6 +19,18 @@ class ValidationError(RebellisException):
 class ResourceNotFoundError(RebellisException):
     def __init__(self, resource: str, id: Any): super().__init__(f"{resource} with id {id} not found", 404)
 
+class ServiceOverloadedError(RebellisException):
+    def __init__(self, message: str = "Service overloaded", retry_after: int = 1):
+        super().__init__(message, 503, {"retry_after": retry_after})
+
+class QueueUnavailableError(RebellisException):
+    def __init__(self, message: str = "Job queue unavailable"): super().__init__(message, 503)
+
+class SchemaVersionError(RebellisException):
+    def __init__(self, current, expected):
+        super().__init__(f"Database schema at {current or 'no revision'}, code expects {expected}; run the migrate job",
+                         500, {"current": current, "expected": expected})
+
 class ProcessingError(RebellisException): pass
 class StorageError(RebellisException): pass
 class MLModelError(RebellisException):
@@ -0,0 +1,102 @@
+"""
+Job Events
+Workers (and the API, when it completes a job itself) publish job status
+transitions on one Redis pub/sub channel; every API process subscribes
+and hands each event to its WebSocket connections, routed by job and
+user. Clients watching a job get pushed updates instead of polling
+GET /api/v1/motion/{id} against the database.
+
+An event:
+
+    {"type": "job", "kind": "motion", "job_id": "...", "user_id": 1,
+     "status": "processing", "progress": 10, "ts": 1760860800.0, ...}
+
+Pub/sub is at-most-once: a process that is disconnected misses events,
+so subscribers read the current status once when they start watching.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from src.core.cache import redis_client
+from src.core.config import settings
+from src.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class JobEventBus:
+    def __init__(self, channel: Optional[str] = None, redis: Any = None):
+        self.channel = channel or settings.JOB_EVENTS_CHANNEL
+        self._redis = redis
+        self._listener: Optional[asyncio.Task] = None
+
+    @property
+    def redis(self):
+        return self._redis or redis_client.redis_client
+
+    async def publish(self, kind: str, job_id: str, user_id: int, status: str, progress: Optional[int] = None, **extra: Any):
+        """Best effort: a lost event only means a client falls back to reading the status."""
+        event: Dict[str, Any] = {
+            "type": "job", "kind": kind, "job_id": job_id, "user_id": user_id,
+            "status": status, "progress": progress, "ts": time.time(), **extra,
+        }
+        client = self.redis
+        if client is None:
+            return
+        try:
+            await client.publish(self.channel, json.dumps(event, default=str))
+            metrics.record_job_event("published")
+        except Exception as e:
+            logger.debug("Job event publish failed: %s", e)
+
+    def start(self, handler: Callable[[Dict[str, Any]], Awaitable[Any]]):
+        if self.redis is not None and self._listener is None:
+            self._listener = asyncio.create_task(self._listen(handler))
+
+    async def _listen(self, handler: Callable[[Dict[str, Any]], Awaitable[Any]]):
+        backoff = 1
+        while True:
+            pubsub = None
+            try:
+                pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+                await pubsub.subscribe(self.channel)
+                backoff = 1
+                async for message in pubsub.listen():
+                    if not message or message.get("type") != "message":
+                        continue
+                    try:
+                        event = json.loads(message.get("data"))
+                    except (TypeError, ValueError):
+                        continue
+                    try:
+                        await handler(event)
+                    except Exception as e:
+                        logger.warning("Job event handler failed: %s", e)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Job event listener disconnected: %s", e)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+            finally:
+                if pubsub is not None:
+                    try:
+                        await pubsub.aclose()
+                    except Exception:
+                        pass
+
+    async def close(self):
+        if self._listener:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._listener = None
+
+
+job_events = JobEventBus()
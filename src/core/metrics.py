@@ -1,27 +1,158 @@
-from prometheus_client import Counter, Histogram, Gauge, generate_latest
+import os
+from typing import Dict, Optional, Set
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Histogram, Gauge, generate_latest, multiprocess
+
+OVERFLOW_ENDPOINT = "__overflow__"
+UNMATCHED_ENDPOINT = "__unmatched__"
+_HTTP_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
 
 class MetricsCollector:
-    def __init__(self):
-        self.request_count = Counter("http_requests_total","Total HTTP requests",["method","endpoint","status"])
-        self.request_duration = Histogram("http_request_duration_seconds","HTTP request duration seconds",["method","endpoint"])
-        self.model_inference_count = Counter("ml_model_inference_total","Total ML inferences",["model","status"])
-        self.model_inference_duration = Histogram("ml_model_inference_duration_seconds","ML inference duration",["model"])
-        self.cache_hits = Counter("cache_hits_total","Cache hits",["cache_type"])
-        self.cache_misses = Counter("cache_misses_total","Cache misses",["cache_type"])
-        self.active_connections = Gauge("active_connections","Active connections")
-        self.queue_size = Gauge("queue_size","Processing queue size",["queue_name"])
-
-    def record_request(self, method:str, path:str, status_code:int, duration:float):
-        self.request_count.labels(method=method, endpoint=path, status=str(status_code)).inc()
-        self.request_duration.labels(method=method, endpoint=path).observe(duration)
+    def __init__(self, registry: CollectorRegistry = REGISTRY, max_endpoints: Optional[int] = None):
+        if max_endpoints is None:
+            from src.core.config import settings
+            max_endpoints = settings.METRICS_MAX_ENDPOINT_LABELS
+        self.registry = registry
+        # Endpoint labels are route templates; anything beyond the cap is
+        # folded into OVERFLOW_ENDPOINT so series count stays bounded.
+        self.max_endpoints = max_endpoints
+        self._endpoints: Set[str] = set()
+        self.request_count = Counter("http_requests_total","Total HTTP requests",["method","endpoint","status"], registry=registry)
+        self.requests_in_progress = Gauge("http_requests_inprogress","HTTP requests in progress", registry=registry, multiprocess_mode="livesum")
+        self.request_duration = Histogram("http_request_duration_seconds","HTTP request duration seconds",["method","endpoint"], registry=registry)
+        self.model_inference_count = Counter("ml_model_inference_total","Total ML inferences",["model","status"], registry=registry)
+        self.model_inference_duration = Histogram("ml_model_inference_duration_seconds","ML inference duration",["model"], registry=registry)
+        self.cache_hits = Counter("cache_hits_total","Cache hits",["cache_type"], registry=registry)
+        self.cache_misses = Counter("cache_misses_total","Cache misses",["cache_type"], registry=registry)
+        self.near_cache_lookups = Counter("near_cache_lookups_total","Near-cache lookups",["prefix","result"], registry=registry)
+        self.near_cache_entries = Gauge("near_cache_entries","Entries held in the in-process near-cache", registry=registry, multiprocess_mode="livesum")
+        self.near_cache_invalidations = Counter("near_cache_invalidations_total","Near-cache invalidations received",["source"], registry=registry)
+        self.cache_raw_bytes = Counter("cache_value_raw_bytes_total","Serialized cache bytes before compression",["prefix"], registry=registry)
+        self.cache_stored_bytes = Counter("cache_value_stored_bytes_total","Cache bytes written to Redis",["prefix","codec"], registry=registry)
+        self.rate_limit_decisions = Counter("rate_limit_decisions_total","Rate limiter decisions",["scope","result","backend"], registry=registry)
+        self.password_hash_duration = Histogram("password_hash_seconds","bcrypt pool time per call",["op","phase"], registry=registry,
+                                                buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5))
+        self.password_hash_pending = Gauge("password_hash_pending","bcrypt calls admitted (running or queued)", registry=registry, multiprocess_mode="livesum")
+        self.password_hash_rejections = Counter("password_hash_rejected_total","bcrypt calls rejected by the admission queue",["op"], registry=registry)
+        self.db_pool_checked_out = Gauge("db_pool_checked_out","DB connections checked out of the pool",["engine"], registry=registry, multiprocess_mode="livesum")
+        self.db_pool_overflow = Gauge("db_pool_overflow","DB connections open beyond pool_size",["engine"], registry=registry, multiprocess_mode="livesum")
+        self.db_pool_wait = Histogram("db_pool_checkout_seconds","Time to obtain a DB connection from the pool",["engine"], registry=registry,
+                                      buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30))
+        self.db_pool_timeouts = Counter("db_pool_timeouts_total","DB pool checkouts that hit pool_timeout",["engine"], registry=registry)
+        self.db_query_duration = Histogram("db_query_duration_seconds","DB statement execution time",["engine","operation"], registry=registry,
+                                           buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 10))
+        self.db_slow_queries = Counter("db_slow_queries_total","DB statements over DATABASE_SLOW_QUERY_MS",["engine","operation"], registry=registry)
+        self.db_reads_routed = Counter("db_reads_routed_total","Read sessions by engine and routing reason",["engine","reason"], registry=registry)
+        self.db_replica_lag = Gauge("db_replica_lag_seconds","Replication lag measured by the replica check",["engine"], registry=registry, multiprocess_mode="max")
+        self.db_replica_healthy = Gauge("db_replica_healthy","1 while a replica takes reads",["engine"], registry=registry, multiprocess_mode="min")
+        self.job_queue_depth = Gauge("job_queue_depth","Queued jobs: waiting (undelivered), pending (delivered, unacked), dead",["queue","state"], registry=registry, multiprocess_mode="max")
+        self.jobs_processed = Counter("jobs_processed_total","Job attempts by outcome (success, retry, dead)",["queue","result"], registry=registry)
+        self.job_duration = Histogram("job_duration_seconds","Time one job attempt took in a worker",["queue"], registry=registry,
+                                      buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600))
+        self.motion_batch_fill = Histogram("motion_batch_fill_ratio","Jobs per motion diffusion call / MOTION_BATCH_SIZE", registry=registry,
+                                           buckets=(0.125, 0.25, 0.375, 0.5, 0.625, 0.75, 0.875, 1.0))
+        self.motion_gpu_seconds_per_job = Histogram("motion_gpu_seconds_per_job","Diffusion call time divided by the jobs it served", registry=registry,
+                                                    buckets=(0.5, 1, 2, 5, 10, 20, 30, 60, 120, 300))
+        self.motion_gpu_seconds = Counter("motion_gpu_seconds_total","GPU time spent in motion diffusion calls", registry=registry)
+        self.job_events = Counter("job_events_total","Job status events: published by this process, delivered to or dropped for WebSockets",["stage"], registry=registry)
+        self.ws_connections = Gauge("ws_connections","Open WebSocket connections", registry=registry, multiprocess_mode="livesum")
+        self.ws_messages = Counter("ws_messages_total","Outbound WebSocket messages by outcome (queued, sent, dropped)",["result"], registry=registry)
+        self.ws_slow_disconnects = Counter("ws_slow_consumer_disconnects_total","Connections closed because their send queue was full", registry=registry)
+        self.motion_results_reused = Counter("motion_results_reused_total","Motions completed from a stored result instead of diffusion",["stage"], registry=registry)
+        self.startup_seconds = Gauge("app_startup_seconds","Time spent in each startup phase of this worker",["phase"], registry=registry, multiprocess_mode="max")
+        self.active_connections = Gauge("active_connections","Active connections", registry=registry, multiprocess_mode="livesum")
+        self.queue_size = Gauge("queue_size","Processing queue size",["queue_name"], registry=registry, multiprocess_mode="max")
+        self.endpoint_labels = Gauge("metrics_endpoint_labels","Distinct endpoint label values tracked", registry=registry, multiprocess_mode="max")
+        self.endpoint_overflow = Counter("metrics_endpoint_overflow_total","Requests recorded under the overflow endpoint label", registry=registry)
+
+    def _bounded_endpoint(self, endpoint:str) -> str:
+        if endpoint in self._endpoints:
+            return endpoint
+        if len(self._endpoints) < self.max_endpoints:
+            self._endpoints.add(endpoint)
+            self.endpoint_labels.set(len(self._endpoints))
+            return endpoint
+        self.endpoint_overflow.inc()
+        return OVERFLOW_ENDPOINT
+
+    def record_request(self, method:str, endpoint:str, status_code:int, duration:float):
+        """Record an HTTP request. `endpoint` should be the matched route template
+        (e.g. /api/v1/projects/{project_id}), never the raw path."""
+        method = method if method in _HTTP_METHODS else "OTHER"
+        endpoint = self._bounded_endpoint(endpoint)
+        self.request_count.labels(method=method, endpoint=endpoint, status=str(status_code)).inc()
+        self.request_duration.labels(method=method, endpoint=endpoint).observe(duration)
 
     def record_inference(self, model:str, status:str, duration:float):
         self.model_inference_count.labels(model=model, status=status).inc()
         self.model_inference_duration.labels(model=model).observe(duration)
 
+    def record_password_hash(self, op:str, wait:float, run:float):
+        self.password_hash_duration.labels(op=op, phase="wait").observe(wait)
+        self.password_hash_duration.labels(op=op, phase="run").observe(run)
+
+    def record_db_checkout(self, engine:str, wait:float, checked_out:int, overflow:int):
+        self.db_pool_wait.labels(engine=engine).observe(wait)
+        self.record_db_pool(engine, checked_out, overflow)
+
+    def record_db_pool(self, engine:str, checked_out:int, overflow:int):
+        self.db_pool_checked_out.labels(engine=engine).set(checked_out)
+        self.db_pool_overflow.labels(engine=engine).set(max(0, overflow))
+
+    def record_db_query(self, engine:str, operation:str, duration:float, slow:bool):
+        self.db_query_duration.labels(engine=engine, operation=operation).observe(duration)
+        if slow:
+            self.db_slow_queries.labels(engine=engine, operation=operation).inc()
+
+    def record_replica(self, engine:str, lag:Optional[float], healthy:bool):
+        if lag is not None:
+            self.db_replica_lag.labels(engine=engine).set(lag)
+        self.db_replica_healthy.labels(engine=engine).set(1 if healthy else 0)
+
+    def record_job(self, queue:str, result:str, duration:Optional[float]=None):
+        self.jobs_processed.labels(queue=queue, result=result).inc()
+        if duration is not None:
+            self.job_duration.labels(queue=queue).observe(duration)
+
+    def record_motion_batch(self, jobs:int, capacity:int, gpu_seconds:float):
+        self.motion_batch_fill.observe(jobs / capacity)
+        self.motion_gpu_seconds.inc(gpu_seconds)
+        for _ in range(jobs):
+            self.motion_gpu_seconds_per_job.observe(gpu_seconds / jobs)
+
+    def record_job_event(self, stage:str, n:int=1):
+        self.job_events.labels(stage=stage).inc(n)
+
+    def record_ws_messages(self, result:str, n:int=1):
+        if n:
+            self.ws_messages.labels(result=result).inc(n)
+
+    def record_motion_reuse(self, stage:str, n:int=1):
+        self.motion_results_reused.labels(stage=stage).inc(n)
+
+    def record_queue_depth(self, queue:str, depth:Dict[str, int]):
+        for state, n in depth.items():
+            self.job_queue_depth.labels(queue=queue, state=state).set(n)
+
+    def record_startup(self, phase:str, seconds:float):
+        self.startup_seconds.labels(phase=phase).set(seconds)
+
     def record_cache(self, cache_type:str, hit:bool):
         (self.cache_hits if hit else self.cache_misses).labels(cache_type=cache_type).inc()
 
+    def record_near_cache(self, prefix:str, hit:bool, size:int):
+        self.near_cache_lookups.labels(prefix=prefix, result="hit" if hit else "miss").inc()
+        self.near_cache_entries.set(size)
+
+    def record_near_cache_invalidation(self, source:str):
+        self.near_cache_invalidations.labels(source=source).inc()
+
+    def record_cache_write(self, prefix:str, codec:str, raw_bytes:int, stored_bytes:int):
+        self.cache_raw_bytes.labels(prefix=prefix).inc(raw_bytes)
+        self.cache_stored_bytes.labels(prefix=prefix, codec=codec).inc(stored_bytes)
+
+    def record_rate_limit(self, scope:str, allowed:bool, backend:str):
+        self.rate_limit_decisions.labels(scope=scope, result="allowed" if allowed else "limited", backend=backend).inc()
+
     def update_gauge(self, name:str, value:float, label:str=None):
         if name == "queue_size" and label:
             self.queue_size.labels(queue_name=label).set(value)
@@ -29,6 +160,16 @@ class MetricsCollector:
             self.active_connections.set(value)
 
     def get_metrics(self):
-        return generate_latest()
+        """Exposition for /metrics.
+
+        Under gunicorn (PROMETHEUS_MULTIPROC_DIR set) this aggregates the
+        mmap files of every worker, including metrics registered outside this
+        collector, so one scrape covers the whole pod.
+        """
+        if os.environ.get("PROMETHEUS_MULTIPROC_DIR") and self.registry is REGISTRY:
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+            return generate_latest(registry)
+        return generate_latest(self.registry)
 
 metrics = MetricsCollector()
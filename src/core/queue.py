@@ -0,0 +1,339 @@
+"""
+Durable Job Queue
+Redis Streams with one consumer group per queue. Jobs survive API and
+worker restarts, workers scale independently of the API (KEDA on stream
+length), and a job whose worker dies is redelivered after
+TASK_VISIBILITY_TIMEOUT.
+
+Stream entries carry the JSON payload and how many times the job has
+already been retried. Acked entries are deleted, so XLEN is the number
+of jobs not yet finished (waiting + in flight). A failed attempt is
+re-added as a new entry; after TASK_MAX_RETRIES retries the job goes to
+`<stream>:dead` for inspection instead.
+"""
+
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import socket
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from src.core.cache import redis_client
+from src.core.config import settings
+from src.core.exceptions import QueueUnavailableError
+from src.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+LOST_JOB_ERROR = "Worker lost the job on every attempt"
+
+
+def _s(v) -> str:
+    return v.decode() if isinstance(v, bytes) else v
+
+
+@dataclass
+class Job:
+    id: str
+    payload: Dict[str, Any]
+    attempt: int  # 1 on first delivery
+    exhausted: bool = False  # reclaimed with no attempts left: dead-letter, don't run
+
+
+class JobQueue:
+    def __init__(
+        self,
+        name: str,
+        group: str = "workers",
+        visibility_timeout: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        maxlen: Optional[int] = None,
+        redis: Any = None,
+    ):
+        self.name = name
+        self.stream = f"jobs:{name}"
+        self.dead_stream = f"jobs:{name}:dead"
+        self.group = group
+        self.visibility_timeout = visibility_timeout if visibility_timeout is not None else settings.TASK_VISIBILITY_TIMEOUT
+        self.max_retries = max_retries if max_retries is not None else settings.TASK_MAX_RETRIES
+        self.maxlen = maxlen or settings.JOB_QUEUE_MAXLEN
+        self._redis = redis
+
+    @property
+    def redis(self):
+        # Shares the cache's connection unless one was passed in (tests, tools)
+        client = self._redis or redis_client.redis_client
+        if client is None:
+            raise QueueUnavailableError()
+        return client
+
+    async def ensure_group(self):
+        try:
+            await self.redis.xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except Exception as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def enqueue(self, payload: Dict[str, Any], retries: int = 0) -> str:
+        try:
+            entry_id = await self.redis.xadd(
+                self.stream, {"payload": json.dumps(payload), "retries": retries}, maxlen=self.maxlen, approximate=True,
+            )
+        except QueueUnavailableError:
+            raise
+        except Exception as e:
+            raise QueueUnavailableError(f"Could not enqueue {self.name} job: {e}")
+        return _s(entry_id)
+
+    def _job(self, entry_id, fields, deliveries: int = 1) -> Job:
+        fields = {_s(k): v for k, v in fields.items()}
+        return Job(_s(entry_id), json.loads(fields["payload"]), int(fields.get("retries", 0)) + deliveries)
+
+    async def consume(self, consumer: str, count: int = 1, block_ms: int = 1000) -> List[Job]:
+        """Up to `count` jobs for this consumer: expired deliveries first, then new entries."""
+        jobs = await self.reclaim(consumer, count)
+        if jobs:
+            return jobs
+        resp = await self.redis.xreadgroup(self.group, consumer, {self.stream: ">"}, count=count, block=block_ms)
+        return [self._job(entry_id, fields) for _, entries in resp or [] for entry_id, fields in entries if fields]
+
+    async def reclaim(self, consumer: str, count: int = 1) -> List[Job]:
+        """
+        Take over jobs delivered more than visibility_timeout ago and never
+        acked (worker crashed or hung). Each lost delivery counts as an
+        attempt, so a job that keeps killing its worker ends up dead too:
+        such jobs come back with `exhausted` set, for the caller to
+        dead-letter through retry() (JobWorker does, running on_dead).
+        """
+        resp = await self.redis.xautoclaim(
+            self.stream, self.group, consumer, min_idle_time=self.visibility_timeout * 1000, count=count,
+        )
+        entries = [(entry_id, fields) for entry_id, fields in resp[1] if fields]
+        jobs = []
+        for entry_id, fields in entries:
+            info = await self.redis.xpending_range(self.stream, self.group, min=entry_id, max=entry_id, count=1)
+            job = self._job(entry_id, fields, info[0]["times_delivered"] if info else 1)
+            logger.warning("Reclaimed %s job %s (attempt %d)", self.name, job.id, job.attempt)
+            job.exhausted = job.attempt > self.max_retries + 1
+            jobs.append(job)
+        return jobs
+
+    async def ack(self, *jobs: Job):
+        ids = [job.id for job in jobs]
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.xack(self.stream, self.group, *ids)
+            pipe.xdel(self.stream, *ids)
+            await pipe.execute()
+
+    async def retry(self, job: Job, error: str) -> bool:
+        """Requeue a failed attempt; False (and dead-lettered) once retries are used up."""
+        if job.attempt > self.max_retries:
+            await self._bury(job, error)
+            return False
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.xadd(self.stream, {"payload": json.dumps(job.payload), "retries": job.attempt}, maxlen=self.maxlen, approximate=True)
+            pipe.xack(self.stream, self.group, job.id)
+            pipe.xdel(self.stream, job.id)
+            await pipe.execute()
+        return True
+
+    async def release(self, *jobs: Job):
+        """Hand back jobs taken but not started; the delivery does not count as an attempt."""
+        async with self.redis.pipeline(transaction=True) as pipe:
+            for job in jobs:
+                pipe.xadd(self.stream, {"payload": json.dumps(job.payload), "retries": job.attempt - 1},
+                          maxlen=self.maxlen, approximate=True)
+            pipe.xack(self.stream, self.group, *[job.id for job in jobs])
+            pipe.xdel(self.stream, *[job.id for job in jobs])
+            await pipe.execute()
+
+    async def _bury(self, job: Job, error: str):
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.xadd(self.dead_stream, {"payload": json.dumps(job.payload), "attempts": job.attempt, "error": error[:1000]},
+                      maxlen=self.maxlen, approximate=True)
+            pipe.xack(self.stream, self.group, job.id)
+            pipe.xdel(self.stream, job.id)
+            await pipe.execute()
+
+    async def depth(self) -> Dict[str, int]:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.xlen(self.stream)
+            pipe.xpending(self.stream, self.group)
+            pipe.xlen(self.dead_stream)
+            # XPENDING fails until a worker has created the group; nothing is in flight then
+            length, pending, dead = await pipe.execute(raise_on_error=False)
+        pending = pending["pending"] if isinstance(pending, dict) else 0
+        return {"waiting": max(length - pending, 0), "pending": pending, "dead": dead}
+
+
+class JobWorker:
+    """
+    Runs `handler(job)` for jobs from one queue, at most `concurrency` at a
+    time, each bounded by TASK_TIMEOUT. Success acks; an exception retries
+    the job, and `on_dead(job, error)` runs once retries are exhausted.
+    stop() finishes the jobs in hand without taking new ones.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        handler: Callable[[Job], Awaitable[Any]],
+        on_dead: Optional[Callable[[Job, str], Awaitable[Any]]] = None,
+        concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+        name: Optional[str] = None,
+        depth_interval: float = 5.0,
+    ):
+        self.queue = queue
+        self.handler = handler
+        self.on_dead = on_dead
+        self.concurrency = concurrency or settings.WORKER_CONCURRENCY
+        self.timeout = timeout or settings.TASK_TIMEOUT
+        self.name = name or f"{socket.gethostname()}-{os.getpid()}"
+        self.depth_interval = depth_interval
+        self._stopping = asyncio.Event()
+        self._running: Set[asyncio.Task] = set()
+        self._depth_at = 0.0
+
+    def stop(self):
+        self._stopping.set()
+
+    async def run(self):
+        await self.queue.ensure_group()
+        logger.info("Worker %s consuming %s (concurrency %d)", self.name, self.queue.stream, self.concurrency)
+        while not self._stopping.is_set():
+            free = self.concurrency - len(self._running)
+            if free <= 0:
+                await asyncio.wait(self._running, return_when=asyncio.FIRST_COMPLETED)
+                continue
+            try:
+                jobs = await self._take(free)
+                await self._report_depth()
+            except Exception as e:
+                logger.error("Consuming %s failed: %s", self.queue.stream, e)
+                await asyncio.sleep(1)
+                if "NOGROUP" in str(e):
+                    # Stream deleted under us (FLUSHDB, failover to an empty replica)
+                    with contextlib.suppress(Exception):
+                        await self.queue.ensure_group()
+                continue
+            for job in jobs:
+                if job.exhausted:
+                    await self._lost(job)
+            jobs = [job for job in jobs if not job.exhausted]
+            for work in self._split(jobs):
+                task = asyncio.create_task(self._handle(work))
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+        if self._running:
+            await asyncio.wait(self._running)
+
+    async def _take(self, free: int) -> List[Job]:
+        return await self.queue.consume(self.name, count=free)
+
+    def _split(self, jobs: List[Job]) -> List[Any]:
+        return jobs
+
+    async def _handle(self, job: Job):
+        started = time.perf_counter()
+        try:
+            try:
+                await asyncio.wait_for(self.handler(job), self.timeout)
+            except Exception as e:
+                await self._failed(job, str(e) or type(e).__name__, time.perf_counter() - started)
+                return
+            await self.queue.ack(job)
+            metrics.record_job(self.queue.name, "success", time.perf_counter() - started)
+        except Exception as e:
+            # Queue unreachable: the entry stays pending and is reclaimed later
+            logger.error("Could not settle %s job %s: %s", self.queue.name, job.id, e)
+
+    async def _lost(self, job: Job):
+        try:
+            await self._failed(job, LOST_JOB_ERROR, None)
+        except Exception as e:
+            logger.error("Could not dead-letter %s job %s: %s", self.queue.name, job.id, e)
+
+    async def _failed(self, job: Job, error: str, duration: Optional[float]):
+        if await self.queue.retry(job, error):
+            logger.warning("%s job %s attempt %d failed, retrying: %s", self.queue.name, job.id, job.attempt, error)
+            metrics.record_job(self.queue.name, "retry", duration)
+            return
+        logger.error("%s job %s failed after %d attempts: %s", self.queue.name, job.id, job.attempt, error)
+        metrics.record_job(self.queue.name, "dead", duration)
+        if self.on_dead:
+            await self.on_dead(job, error)
+
+    async def _report_depth(self):
+        now = time.monotonic()
+        if now - self._depth_at >= self.depth_interval:
+            self._depth_at = now
+            metrics.record_queue_depth(self.queue.name, await self.queue.depth())
+
+
+class BatchJobWorker(JobWorker):
+    """
+    JobWorker for handlers that are cheaper per job in batches (GPU models).
+    Takes up to `batch_size` jobs, waiting up to `linger_ms` for a partial
+    batch to fill, groups them by `batch_key(job)` and calls
+    `handler(jobs)` once per group. The handler returns {job.id: error}
+    for the jobs that failed; those retry on their own, the rest are acked
+    together. `concurrency` counts batches: groups beyond the free slots
+    are released back to the queue unstarted.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        handler: Callable[[List[Job]], Awaitable[Optional[Dict[str, str]]]],
+        on_dead: Optional[Callable[[Job, str], Awaitable[Any]]] = None,
+        batch_size: int = 4,
+        batch_key: Callable[[Job], Any] = lambda job: None,
+        linger_ms: int = 0,
+        **kwargs: Any,
+    ):
+        super().__init__(queue, handler, on_dead, **kwargs)
+        self.batch_size = batch_size
+        self.batch_key = batch_key
+        self.linger_ms = linger_ms
+
+    async def _take(self, free: int) -> List[Job]:
+        jobs = await self.queue.consume(self.name, count=self.batch_size)
+        if jobs and len(jobs) < self.batch_size and self.linger_ms:
+            jobs += await self.queue.consume(self.name, count=self.batch_size - len(jobs), block_ms=self.linger_ms)
+        # Oldest job's group first, so a minority key is not starved by releases
+        groups = self._split([job for job in jobs if not job.exhausted])
+        if len(groups) > free:
+            await self.queue.release(*[job for group in groups[free:] for job in group])
+            groups = groups[:free]
+        return [job for job in jobs if job.exhausted] + [job for group in groups for job in group]
+
+    def _split(self, jobs: List[Job]) -> List[List[Job]]:
+        groups: Dict[Any, List[Job]] = {}
+        for job in jobs:
+            groups.setdefault(self.batch_key(job), []).append(job)
+        return list(groups.values())
+
+    async def _handle(self, jobs: List[Job]):
+        started = time.perf_counter()
+        try:
+            try:
+                errors = await asyncio.wait_for(self.handler(jobs), self.timeout) or {}
+            except Exception as e:
+                errors = {job.id: str(e) or type(e).__name__ for job in jobs}
+            duration = time.perf_counter() - started
+            done = [job for job in jobs if job.id not in errors]
+            if done:
+                await self.queue.ack(*done)
+                for _ in done:
+                    metrics.record_job(self.queue.name, "success", duration)
+            for job in jobs:
+                if job.id in errors:
+                    await self._failed(job, errors[job.id], duration)
+        except Exception as e:
+            logger.error("Could not settle %s batch %s: %s", self.queue.name, [j.id for j in jobs], e)
@@ -0,0 +1,116 @@
+"""
+Schema Revision Management
+API workers never run DDL. At boot they compare the database's Alembic
+revision with the head of migrations/versions in one query and refuse to
+start on a mismatch; migrations run once per deploy from a one-shot job:
+
+    python -m src.core.schema upgrade [revision]   # alembic upgrade, default head
+    python -m src.core.schema check                # exit 1 unless the database is at head
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import FrozenSet, Optional
+
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import Connection, text
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.core.exceptions import SchemaVersionError
+
+logger = logging.getLogger(__name__)
+
+ROOT = Path(__file__).resolve().parents[2]
+SCHEMA_MODES = ("verify", "create", "skip")
+
+
+def alembic_config() -> Config:
+    cfg = Config(str(ROOT / "alembic.ini"))
+    cfg.set_main_option("script_location", str(ROOT / "migrations"))
+    return cfg
+
+
+@lru_cache(maxsize=1)
+def head_revisions() -> FrozenSet[str]:
+    """Heads of the migration scripts shipped in this image (read from disk, no DB)."""
+    return frozenset(ScriptDirectory.from_config(alembic_config()).get_heads())
+
+
+async def current_revisions(engine: AsyncEngine) -> FrozenSet[str]:
+    """Revisions stamped in alembic_version; empty when the table does not exist."""
+    async with engine.connect() as conn:
+        try:
+            rows = await conn.execute(text("SELECT version_num FROM alembic_version"))
+        except (OperationalError, ProgrammingError):
+            return frozenset()
+        return frozenset(r[0] for r in rows)
+
+
+async def verify_schema(engine: AsyncEngine):
+    current, heads = await current_revisions(engine), head_revisions()
+    if current != heads:
+        raise SchemaVersionError(sorted(current), sorted(heads))
+    logger.info("Database schema at revision %s", ", ".join(sorted(heads)))
+
+
+async def ensure_schema(engine: AsyncEngine, mode: str = "verify"):
+    """
+    verify: one SELECT against alembic_version, SchemaVersionError unless at head.
+    create: Base.metadata.create_all, for throwaway SQLite/test databases only.
+    skip:   nothing.
+    """
+    if mode == "verify":
+        await verify_schema(engine)
+    elif mode == "create":
+        from src.core.database import Base
+        from src.models import user, project, task, ml_model, motion  # noqa
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        logger.info("DB tables ready")
+    elif mode != "skip":
+        raise ValueError(f"Schema mode must be one of {SCHEMA_MODES}")
+
+
+def upgrade(revision: str = "head", connection: Optional[Connection] = None):
+    """alembic upgrade; pass a sync connection (AsyncConnection.run_sync) to migrate over it."""
+    cfg = alembic_config()
+    if connection is not None:
+        cfg.attributes["connection"] = connection
+    command.upgrade(cfg, revision)
+
+
+async def _check() -> int:
+    from src.core.database import engine
+    try:
+        await verify_schema(engine)
+        return 0
+    except SchemaVersionError as e:
+        logger.error(e.message)
+        return 1
+    finally:
+        await engine.dispose()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="action", required=True)
+    up = sub.add_parser("upgrade", help="apply migrations")
+    up.add_argument("revision", nargs="?", default="head")
+    sub.add_parser("check", help="exit 1 unless the database is at head")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+    if args.action == "upgrade":
+        upgrade(args.revision)
+        return 0
+    return asyncio.run(_check())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,26 +5,229 @@ Handles JWT encoding/decoding, password hashing, and validation logic.
 
 import jwt
 import bcrypt
+import asyncio
+import base64
 import datetime
-from typing import Optional, Dict, Any
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Dict, Any, Tuple
 from src.core.config import settings
+from src.core.exceptions import ServiceOverloadedError
+from src.core.metrics import metrics
 
 
 # === Password Hashing ===
 
+BCRYPT_MAX_BYTES = 72
+
+
+def _bcrypt_input(password: str) -> bytes:
+    # bcrypt reads at most 72 bytes (bcrypt>=5 raises beyond that), so longer
+    # passwords are pre-hashed; shorter ones stay as-is and existing hashes keep matching
+    raw = password.encode("utf-8")
+    if len(raw) > BCRYPT_MAX_BYTES:
+        return base64.b64encode(hashlib.sha256(raw).digest())
+    return raw
+
+
 def hash_password(password: str) -> str:
     """Return bcrypt hash for a plain-text password."""
     salt = bcrypt.gensalt(rounds=settings.PASSWORD_HASH_ROUNDS)
-    return bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8")
+    return bcrypt.hashpw(_bcrypt_input(password), salt).decode("utf-8")
 
 
 def verify_password(password: str, hashed: str) -> bool:
     """Check if provided password matches hashed value."""
-    return bcrypt.checkpw(password.encode("utf-8"), hashed.encode("utf-8"))
+    try:
+        return bcrypt.checkpw(_bcrypt_input(password), hashed.encode("utf-8"))
+    except ValueError:
+        # Malformed hash: no password matches it
+        return False
+
+
+def needs_rehash(hashed: str) -> bool:
+    """True for legacy (non-bcrypt) hashes and bcrypt hashes below the configured cost."""
+    if not hashed.startswith("$2"):
+        return True
+    try:
+        return int(hashed.split("$")[2]) < settings.PASSWORD_HASH_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+
+class PasswordHashPool:
+    """
+    Runs bcrypt on a small dedicated thread pool so a login burst never
+    blocks the event loop (bcrypt releases the GIL while hashing).
+
+    At most `workers` calls run at once and `max_queue` more may wait;
+    beyond that callers get ServiceOverloadedError (503) immediately
+    instead of piling up behind a queue they would time out in anyway.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    async def run(self, op: str, fn: Callable, *args):
+        if self._pending >= self.workers + self.max_queue:
+            metrics.password_hash_rejections.labels(op=op).inc()
+            raise ServiceOverloadedError("Too many concurrent password operations", retry_after=1)
+        submitted = time.perf_counter()
+        started = submitted
+
+        def call():
+            nonlocal started
+            started = time.perf_counter()
+            return fn(*args)
+
+        self._pending += 1
+        metrics.password_hash_pending.inc()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._pool(), call)
+        finally:
+            self._pending -= 1
+            metrics.password_hash_pending.dec()
+            metrics.record_password_hash(op, started - submitted, time.perf_counter() - started)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_pool = PasswordHashPool(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_QUEUE_SIZE)
+
+
+async def hash_password_async(password: str) -> str:
+    """hash_password on the bcrypt pool; use this from async code."""
+    return await password_pool.run("hash", hash_password, password)
+
+
+async def verify_password_async(password: str, hashed: str) -> bool:
+    """verify_password on the bcrypt pool; use this from async code."""
+    return await password_pool.run("verify", verify_password, password, hashed)
+
+
+# === JWT Signing Keys ===
+
+ASYMMETRIC_ALGORITHMS = ("RS256", "EdDSA")
+
+
+class KeyRing:
+    """
+    Asymmetric JWT keys by kid, loaded from JWT_KEYS_DIR/<kid>.pem.
+
+    The active kid signs new tokens; every key in the directory still
+    verifies and is published in the JWKS. To rotate: add the new key and
+    deploy (verifiers learn it), switch JWT_ACTIVE_KID, then once the
+    longest-lived token signed by the old key has expired, replace its
+    private PEM with the public half or delete it.
+    """
+
+    def __init__(self, keys: Dict[str, Any], active_kid: Optional[str], algorithm: str):
+        self.keys = keys
+        self.active_kid = active_kid
+        self.algorithm = algorithm
+        self._jwks: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_dir(cls, path: Optional[str], active_kid: Optional[str], algorithm: str) -> "KeyRing":
+        from pathlib import Path
+        from cryptography.hazmat.primitives.asymmetric import ed448, ed25519, rsa
+        from cryptography.hazmat.primitives.serialization import load_pem_private_key, load_pem_public_key
+
+        if not path:
+            raise RuntimeError(f"JWT_ALGORITHM={algorithm} requires JWT_KEYS_DIR")
+        expected = (rsa.RSAPrivateKey, rsa.RSAPublicKey) if algorithm == "RS256" else (
+            ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey, ed448.Ed448PrivateKey, ed448.Ed448PublicKey)
+        keys = {}
+        for pem in sorted(Path(path).glob("*.pem")):
+            data = pem.read_bytes()
+            try:
+                key = load_pem_private_key(data, password=None)
+            except (TypeError, ValueError):
+                key = load_pem_public_key(data)
+            if not isinstance(key, expected):
+                raise RuntimeError(f"{pem.name} is not a {algorithm} key")
+            keys[pem.stem] = key
+        if active_kid is None and len(keys) == 1:
+            active_kid = next(iter(keys))
+        if active_kid not in keys or not hasattr(keys[active_kid], "public_key"):
+            raise RuntimeError(f"JWT_ACTIVE_KID={active_kid!r} must name a private key in {path}")
+        return cls(keys, active_kid, algorithm)
+
+    def signing_key(self) -> Tuple[str, Any]:
+        return self.active_kid, self.keys[self.active_kid]
+
+    def public_key(self, kid: Optional[str]) -> Optional[Any]:
+        key = self.keys.get(kid)
+        if key is not None and hasattr(key, "public_key"):
+            key = key.public_key()
+        return key
+
+    def jwks(self) -> Dict[str, Any]:
+        """Public halves of every key, as a JWK Set; computed once."""
+        if self._jwks is None:
+            algo = jwt.get_algorithm_by_name(self.algorithm)
+            entries = []
+            for kid in self.keys:
+                jwk = algo.to_jwk(self.public_key(kid), as_dict=True)
+                jwk.pop("key_ops", None)
+                jwk.update(kid=kid, alg=self.algorithm, use="sig")
+                entries.append(jwk)
+            self._jwks = {"keys": entries}
+        return self._jwks
+
+
+_keyring: Optional[KeyRing] = None
+_keyring_source: Optional[Tuple] = None
+
+
+def get_keyring() -> KeyRing:
+    """The KeyRing for the current settings, loaded once per (dir, kid, algorithm)."""
+    global _keyring, _keyring_source
+    source = (settings.JWT_KEYS_DIR, settings.JWT_ACTIVE_KID, settings.JWT_ALGORITHM)
+    if _keyring is None or _keyring_source != source:
+        _keyring = KeyRing.from_dir(*source)
+        _keyring_source = source
+    return _keyring
+
+
+def jwks_document() -> Dict[str, Any]:
+    """JWK Set served at /.well-known/jwks.json (empty while tokens are HS256)."""
+    if settings.JWT_ALGORITHM not in ASYMMETRIC_ALGORITHMS:
+        return {"keys": []}
+    return get_keyring().jwks()
 
 
 # === JWT Token Handling ===
 
+def _encode(claims: Dict[str, Any]) -> str:
+    if settings.JWT_ISSUER:
+        claims.setdefault("iss", settings.JWT_ISSUER)
+    if settings.JWT_AUDIENCE:
+        claims.setdefault("aud", settings.JWT_AUDIENCE)
+    if settings.JWT_ALGORITHM in ASYMMETRIC_ALGORITHMS:
+        kid, key = get_keyring().signing_key()
+        return jwt.encode(claims, key, algorithm=settings.JWT_ALGORITHM, headers={"kid": kid})
+    return jwt.encode(claims, settings.JWT_SECRET_KEY.get_secret_value(), algorithm=settings.JWT_ALGORITHM)
+
+
 def create_access_token(data: Dict[str, Any]) -> str:
     """Create short-lived (access) JWT token."""
     to_encode = data.copy()
@@ -32,9 +235,7 @@ def create_access_token(data: Dict[str, Any]) -> str:
         minutes=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES
     )
     to_encode.update({"exp": expire})
-    return jwt.encode(
-        to_encode, settings.JWT_SECRET_KEY.get_secret_value(), algorithm=settings.JWT_ALGORITHM
-    )
+    return _encode(to_encode)
 
 
 def create_refresh_token(data: Dict[str, Any]) -> str:
@@ -44,21 +245,93 @@ def create_refresh_token(data: Dict[str, Any]) -> str:
         days=settings.JWT_REFRESH_TOKEN_EXPIRE_DAYS
     )
     to_encode.update({"exp": expire, "type": "refresh"})
-    return jwt.encode(
-        to_encode, settings.JWT_SECRET_KEY.get_secret_value(), algorithm=settings.JWT_ALGORITHM
-    )
+    return _encode(to_encode)
 
 
 def decode_token(token: str) -> Optional[Dict[str, Any]]:
     """Decode and validate a JWT token."""
     try:
+        if settings.JWT_ALGORITHM in ASYMMETRIC_ALGORITHMS:
+            key = get_keyring().public_key(jwt.get_unverified_header(token).get("kid"))
+            if key is None:
+                raise ValueError("Unknown signing key")
+        else:
+            key = settings.JWT_SECRET_KEY.get_secret_value()
         payload = jwt.decode(
             token,
-            settings.JWT_SECRET_KEY.get_secret_value(),
+            key,
             algorithms=[settings.JWT_ALGORITHM],
+            issuer=settings.JWT_ISSUER,
+            audience=settings.JWT_AUDIENCE,
         )
         return payload
     except jwt.ExpiredSignatureError:
         raise ValueError("Token expired")
     except jwt.InvalidTokenError:
         raise ValueError("Invalid token format")
+
+
+# Kept for callers written against the old name
+create_token = create_access_token
+
+
+# === Verified-Token Cache ===
+
+class TokenCache:
+    """
+    Bounded LRU of already-verified tokens: sha256(token) -> claims.
+
+    An entry is dropped at the token's own `exp`, so a cached token is never
+    accepted for longer than the signature check would have accepted it.
+    Tokens without `exp` are not cached.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[bytes, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: bytes, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            claims, exp = entry
+            if exp <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return claims
+
+    def put(self, key: bytes, claims: Dict[str, Any]):
+        exp = claims.get("exp")
+        if not isinstance(exp, (int, float)) or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (claims, float(exp))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = TokenCache(settings.AUTH_TOKEN_CACHE_SIZE)
+
+
+def verify_token(token: str) -> Dict[str, Any]:
+    """decode_token with a cache in front: a token seen before skips the signature check."""
+    key = hashlib.sha256(token.encode("utf-8")).digest()
+    claims = token_cache.get(key)
+    metrics.record_cache("jwt_claims", claims is not None)
+    if claims is None:
+        claims = decode_token(token)
+        token_cache.put(key, claims)
+    # Callers get their own copy; the cached dict stays pristine
+    return dict(claims)
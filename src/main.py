@@ -5,24 +5,16 @@ Production-ready FastAPI application with complete middleware stack
 
 import logging
 import sys
+import time
 from contextlib import asynccontextmanager
 from pathlib import Path
 
 import uvicorn
 from fastapi import FastAPI, Request
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
-from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
-from prometheus_fastapi_instrumentator import Instrumentator
-from starlette.middleware.sessions import SessionMiddleware
+from fastapi.responses import JSONResponse, Response
+from prometheus_client import CONTENT_TYPE_LATEST
 
-from src.api.middleware import (
-    RateLimitMiddleware,
-    SecurityHeadersMiddleware,
-    RequestLoggingMiddleware,
-    ErrorHandlingMiddleware
-)
+from src.api.middleware import add_middleware_stack
 from src.api.routers import (
     auth,
     health,
@@ -30,15 +22,21 @@ from src.api.routers import (
     transcription,
     upload,
     websocket,
-    projects
+    projects,
+    profiling
 )
 from src.core.config import settings
-from src.core.database import engine, Base
+from src.core.database import engine
 from src.core.events import startup_handler, shutdown_handler
 from src.core.logging import setup_logging
+from src.core.metrics import metrics
+from src.core.schema import ensure_schema
+from src.core.security import jwks_document
 from src.core.cache import redis_client
 from src.ml_serving.model_manager import model_manager
 from src.ml_serving.whisper_service import whisper_service
+from src.monitoring.tracing import setup_tracing
+from src.monitoring.profiler import start_continuous_profiler, stop_continuous_profiler
 
 # Setup logging
 logger = setup_logging()
@@ -51,12 +49,16 @@ async def lifespan(app: FastAPI):
     """
     # Startup
     logger.info("Starting Rebellis API...")
+    boot_started = time.perf_counter()
     
     try:
-        # Initialize database
-        logger.info("Initializing database...")
-        async with engine.begin() as conn:
-            await conn.run_sync(Base.metadata.create_all)
+        setup_tracing()
+        start_continuous_profiler()
+        
+        # Check the schema revision; DDL only runs in the migrate job
+        schema_started = time.perf_counter()
+        await ensure_schema(engine, settings.DATABASE_SCHEMA_MODE)
+        metrics.record_startup("schema", time.perf_counter() - schema_started)
         
         # Initialize Redis cache
         logger.info("Connecting to Redis...")
@@ -74,7 +76,9 @@ async def lifespan(app: FastAPI):
         # Run custom startup handler
         await startup_handler(app)
         
-        logger.info("Rebellis API started successfully")
+        boot_seconds = time.perf_counter() - boot_started
+        metrics.record_startup("total", boot_seconds)
+        logger.info(f"Rebellis API started successfully in {boot_seconds:.2f}s")
         
     except Exception as e:
         logger.error(f"Startup failed: {e}")
@@ -89,6 +93,8 @@ async def lifespan(app: FastAPI):
         # Run custom shutdown handler
         await shutdown_handler(app)
         
+        stop_continuous_profiler()
+        
         # Cleanup ML models
         if settings.ENABLE_ML_MODELS:
             await model_manager.cleanup()
@@ -125,63 +131,14 @@ def create_app() -> FastAPI:
     )
     
     # Add middleware stack (order matters!)
+    add_middleware_stack(app)
     
-    # 1. Error handling (outermost)
-    app.add_middleware(ErrorHandlingMiddleware)
-    
-    # 2. CORS
-    app.add_middleware(
-        CORSMiddleware,
-        allow_origins=settings.CORS_ORIGINS,
-        allow_credentials=True,
-        allow_methods=["*"],
-        allow_headers=["*"],
-        expose_headers=["X-Request-ID", "X-Process-Time"]
-    )
-    
-    # 3. Trusted Host
-    if settings.ALLOWED_HOSTS:
-        app.add_middleware(
-            TrustedHostMiddleware,
-            allowed_hosts=settings.ALLOWED_HOSTS
-        )
-    
-    # 4. Security Headers
-    app.add_middleware(SecurityHeadersMiddleware)
-    
-    # 5. Session
-    app.add_middleware(
-        SessionMiddleware,
-        secret_key=settings.SECRET_KEY,
-        session_cookie=settings.SESSION_COOKIE_NAME,
-        max_age=settings.SESSION_MAX_AGE,
-        same_site="lax",
-        https_only=settings.USE_HTTPS
-    )
-    
-    # 6. GZip compression
-    app.add_middleware(GZipMiddleware, minimum_size=1000)
-    
-    # 7. Request Logging
-    if settings.ENABLE_REQUEST_LOGGING:
-        app.add_middleware(RequestLoggingMiddleware)
-    
-    # 8. Rate Limiting
-    if settings.ENABLE_RATE_LIMITING:
-        app.add_middleware(RateLimitMiddleware)
-    
-    # Add Prometheus metrics
+    # Prometheus metrics: one endpoint aggregating every gunicorn worker
     if settings.ENABLE_METRICS:
-        instrumentator = Instrumentator(
-            should_group_status_codes=False,
-            should_ignore_untemplated=True,
-            should_respect_env_var=True,
-            should_instrument_requests_inprogress=True,
-            excluded_handlers=[".*health.*", ".*metrics.*"],
-            inprogress_name="http_requests_inprogress",
-            inprogress_labels=True
-        )
-        instrumentator.instrument(app).expose(app, endpoint="/metrics")
+        @app.get(settings.METRICS_PATH, include_in_schema=False)
+        def prometheus_metrics():
+            # Sync so multiprocess aggregation runs in the threadpool, off the event loop
+            return Response(metrics.get_metrics(), media_type=CONTENT_TYPE_LATEST)
     
     # Include routers
     app.include_router(health.router, prefix="/health", tags=["Health"])
@@ -191,6 +148,8 @@ def create_app() -> FastAPI:
     app.include_router(transcription.router, prefix="/api/v1/transcribe", tags=["Transcription"])
     app.include_router(motion.router, prefix="/api/v1/motion", tags=["Motion"])
     app.include_router(websocket.router, prefix="/ws", tags=["WebSocket"])
+    if settings.ENABLE_PROFILING:
+        app.include_router(profiling.router, prefix="/api/v1/admin/profile", tags=["Admin"])
     
     # Root endpoint
     @app.get("/", include_in_schema=False)
@@ -202,6 +161,11 @@ def create_app() -> FastAPI:
             "docs": "/docs" if settings.ENABLE_DOCS else None
         }
     
+    # Public signing keys, so whisper/motion/edge verify tokens without calling back
+    @app.get("/.well-known/jwks.json", include_in_schema=False)
+    async def jwks():
+        return JSONResponse(jwks_document(), headers={"Cache-Control": f"public, max-age={settings.JWKS_MAX_AGE}"})
+    
     # Custom error handlers
     @app.exception_handler(404)
     async def not_found_handler(request: Request, exc):
@@ -4,7 +4,9 @@ Centralized management for all machine learning models
 """
 
 import asyncio
+import hashlib
 import logging
+import pickle
 import time
 from pathlib import Path
 from typing import Dict, Any, Optional, List
@@ -18,6 +20,7 @@ from src.core.config import settings
 from src.core.exceptions import MLModelError
 from src.core.metrics import metrics
 from src.core.cache import redis_client
+from src.monitoring.tracing import stage_timer
 
 logger = logging.getLogger(__name__)
 
@@ -70,6 +73,12 @@ class ModelConfig(BaseModel):
     cache_ttl: int = 300
 
 
+def prediction_cache_key(model_name: str, input_data: Any, kwargs: Dict[str, Any]) -> str:
+    """Redis key for a cached prediction of `model_name` on these inputs"""
+    cache_data = pickle.dumps((model_name, input_data, kwargs))
+    return f"prediction:{model_name}:{hashlib.sha256(cache_data).hexdigest()}"
+
+
 class ModelManager:
     """
     Centralized model lifecycle management
@@ -165,7 +174,7 @@ class ModelManager:
                 name="motion_vae",
                 type=ModelType.MOTION_VAE,
                 version="v1.0",
-                path=settings.MOTION_VAE_PATH,
+                path=settings.VAE_MODEL_PATH,
                 device="cuda" if self.gpu_available else "cpu",
                 enabled=settings.ENABLE_MOTION_VAE,
                 preload=False,
@@ -459,15 +468,68 @@ class ModelManager:
         Returns:
             Prediction result
         """
-        # Check cache if enabled
+        if model_name not in self.model_configs:
+            raise MLModelError(f"Unknown model: {model_name}")
+        
         config = self.model_configs[model_name]
-        cache_key = None
+        timer = stage_timer(f"model.{model_name}")
+        start_time = time.time()
+        computed = False
+
+        async def compute() -> Any:
+            nonlocal computed
+            computed = True
+            with timer.stage("model_load"):
+                model = await self.get_model(model_name)
+            try:
+                with timer.stage("model_compute"):
+                    result = await asyncio.wait_for(
+                        asyncio.to_thread(self._run_model, model, input_data, kwargs),
+                        timeout=config.timeout_seconds,
+                    )
+            except asyncio.TimeoutError:
+                metrics.record_inference(model_name, "timeout", time.time() - start_time)
+                raise MLModelError(f"Prediction with {model_name} timed out after {config.timeout_seconds}s")
+            except MLModelError:
+                raise
+            except Exception as e:
+                metrics.record_inference(model_name, "error", time.time() - start_time)
+                raise MLModelError(f"Prediction with {model_name} failed: {e}")
+            metrics.record_inference(model_name, "success", time.time() - start_time)
+            return result
+
+        if not config.cache_predictions:
+            return await compute()
+
+        # Concurrent misses for the same inputs run the model once cluster-wide,
+        # and an expiring entry is refreshed in the background while it is served
+        result = await redis_client.get_or_compute(
+            prediction_cache_key(model_name, input_data, kwargs), compute, ttl=config.cache_ttl,
+        )
+        metrics.record_cache(model_name, not computed)
+        return result
+    
+    @staticmethod
+    def _run_model(model: Any, input_data: Any, kwargs: Dict[str, Any]) -> Any:
+        """Blocking model call; runs in a worker thread"""
+        with torch.no_grad():
+            if hasattr(model, "predict"):
+                return model.predict(input_data, **kwargs)
+            if hasattr(model, "transcribe"):
+                return model.transcribe(input_data, **kwargs)
+            return model(input_data, **kwargs)
+    
+    async def cleanup(self):
+        """Unload all models and release GPU memory"""
+        for name in list(self.models.keys()):
+            await self.unload_model(name)
         
-        if config.cache_predictions:
-            import hashlib
-            import pickle
-            
-            # Generate cache key
-            cache_data = pickle.dumps((model_name, input_data, kwargs))
-            cache_hash = hashlib.sha256(cache_data).hexdigest()
-            cache_key = f"prediction:{model_name}:{cache_hash
\ No newline at end of file
+        if self.gpu_available:
+            torch.cuda.empty_cache()
+        
+        self._initialized = False
+        logger.info("Model Manager cleaned up")
+
+
+# Global model manager instance
+model_manager = ModelManager()
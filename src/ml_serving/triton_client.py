@@ -2,6 +2,7 @@ import asyncio, logging, numpy as np, pickle, hashlib
 from typing import Optional, Dict, Any
 import pybreaker
 from prometheus_client import Histogram, Counter
+from src.monitoring.tracing import stage_timer
 
 try:
     import tritonclient.grpc.aio as grpcclient
@@ -41,28 +42,35 @@ class TritonInferenceClient:
     async def transcribe(self, mel: np.ndarray, model="whisper_large_v3"):
         if grpcclient is None:
             raise RuntimeError("tritonclient not installed")
+        timer = stage_timer("triton.transcribe")
         ckey = self._ck(model, mel)
         if self.cache:
-            c = await self.cache.get(ckey)
+            with timer.stage("cache_lookup"):
+                c = await self.cache.get(ckey)
             if c:
                 cache_hits.labels(model=model).inc()
                 return pickle.loads(c)
-        async with self._sem:
-            try:
-                client = grpcclient.InferenceServerClient(url=self.url, ssl=True)
-                with inference_duration.labels(model=model, version="latest").time():
-                    inp = grpcclient.InferInput("audio_input", mel.shape, "FP32")
-                    inp.set_data_from_numpy(mel)
-                    out = [grpcclient.InferRequestedOutput("transcription"),
-                           grpcclient.InferRequestedOutput("confidence")]
-                    res = await self._breaker.call_async(client.infer)(model_name=model, model_version="latest", inputs=[inp], outputs=out)
+        with timer.stage("queue_wait"):
+            await self._sem.acquire()
+        try:
+            client = grpcclient.InferenceServerClient(url=self.url, ssl=True)
+            with timer.stage("model_compute"), inference_duration.labels(model=model, version="latest").time():
+                inp = grpcclient.InferInput("audio_input", mel.shape, "FP32")
+                inp.set_data_from_numpy(mel)
+                out = [grpcclient.InferRequestedOutput("transcription"),
+                       grpcclient.InferRequestedOutput("confidence")]
+                res = await self._breaker.call_async(client.infer)(model_name=model, model_version="latest", inputs=[inp], outputs=out)
+            with timer.stage("postprocess"):
                 tr = res.as_numpy("transcription")[0].decode("utf-8")
                 conf = float(res.as_numpy("confidence")[0])
                 payload = {"text": tr, "confidence": conf}
-                if self.cache:
+            if self.cache:
+                with timer.stage("cache_write"):
                     await self.cache.set(ckey, pickle.dumps(payload), ex=1800)
-                return payload
-            except Exception as e:
-                inference_errors.labels(model=model).inc()
-                logging.exception("Triton error")
-                raise
+            return payload
+        except Exception as e:
+            inference_errors.labels(model=model).inc()
+            logging.exception("Triton error")
+            raise
+        finally:
+            self._sem.release()
@@ -19,6 +19,7 @@ from src.core.config import settings
 from src.core.exceptions import MLModelError
 from src.core.metrics import metrics
 from src.core.cache import redis_client
+from src.monitoring.tracing import stage_timer
 
 logger = logging.getLogger(__name__)
 
@@ -109,19 +110,23 @@ class WhisperService:
         
         start_time = time.time()
         audio_hash = None
+        timer = stage_timer("whisper.transcribe")
         
         try:
             # Save uploaded file temporarily
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp_file:
+            with timer.stage("upload_read"):
                 content = await audio_file.read()
-                tmp_file.write(content)
-                tmp_file_path = tmp_file.name
+            with timer.stage("temp_write"):
+                with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp_file:
+                    tmp_file.write(content)
+                    tmp_file_path = tmp_file.name
             
             # Check cache if enabled
             if self.cache_enabled:
                 import hashlib
-                audio_hash = hashlib.sha256(content).hexdigest()
-                cached_result = await redis_client.get(f"whisper:{audio_hash}")
+                with timer.stage("cache_lookup"):
+                    audio_hash = hashlib.sha256(content).hexdigest()
+                    cached_result = await redis_client.get(f"whisper:{audio_hash}")
                 if cached_result:
                     logger.info(f"Cache hit for audio hash: {audio_hash}")
                     metrics.record_cache_hit("whisper")
@@ -140,44 +145,47 @@ class WhisperService:
             }
             
             # Run transcription
-            if settings.USE_FASTER_WHISPER:
-                result = await self._transcribe_faster_whisper(tmp_file_path, options)
-            else:
-                result = await self._transcribe_openai_whisper(tmp_file_path, options)
+            with timer.stage("model_compute"):
+                if settings.USE_FASTER_WHISPER:
+                    result = await self._transcribe_faster_whisper(tmp_file_path, options)
+                else:
+                    result = await self._transcribe_openai_whisper(tmp_file_path, options)
             
             # Process result
-            processed_result = {
-                "text": result.get("text", "").strip(),
-                "language": result.get("language", language),
-                "task": task,
-                "duration": result.get("duration", 0),
-                "processing_time": time.time() - start_time
-            }
+            with timer.stage("postprocess"):
+                processed_result = {
+                    "text": result.get("text", "").strip(),
+                    "language": result.get("language", language),
+                    "task": task,
+                    "duration": result.get("duration", 0),
+                    "processing_time": time.time() - start_time
+                }
             
-            # Add segments if requested
-            if return_segments and "segments" in result:
-                processed_result["segments"] = [
-                    {
-                        "id": seg.get("id", i),
-                        "start": seg.get("start", 0),
-                        "end": seg.get("end", 0),
-                        "text": seg.get("text", "").strip(),
-                        "confidence": seg.get("confidence", seg.get("avg_logprob", 0))
-                    }
-                    for i, seg in enumerate(result["segments"])
-                ]
+                # Add segments if requested
+                if return_segments and "segments" in result:
+                    processed_result["segments"] = [
+                        {
+                            "id": seg.get("id", i),
+                            "start": seg.get("start", 0),
+                            "end": seg.get("end", 0),
+                            "text": seg.get("text", "").strip(),
+                            "confidence": seg.get("confidence", seg.get("avg_logprob", 0))
+                        }
+                        for i, seg in enumerate(result["segments"])
+                    ]
             
-            # Add word-level timestamps if available
-            if return_timestamps and "words" in result:
-                processed_result["words"] = result["words"]
+                # Add word-level timestamps if available
+                if return_timestamps and "words" in result:
+                    processed_result["words"] = result["words"]
             
             # Cache result if enabled
             if self.cache_enabled and audio_hash:
-                await redis_client.set(
-                    f"whisper:{audio_hash}",
-                    processed_result,
-                    ttl=self.cache_ttl
-                )
+                with timer.stage("cache_write"):
+                    await redis_client.set(
+                        f"whisper:{audio_hash}",
+                        processed_result,
+                        ttl=self.cache_ttl
+                    )
                 metrics.record_cache_miss("whisper")
             
             # Record metrics
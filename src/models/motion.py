@@ -0,0 +1,41 @@
+from enum import Enum
+from sqlalchemy import JSON, Column, DateTime, ForeignKey, Index, Integer, String, Text, func
+from sqlalchemy.orm import relationship
+from src.core.database import Base
+
+class MotionStatus(str, Enum):
+    PENDING = "pending"
+    PROCESSING = "processing"
+    COMPLETED = "completed"
+    ERROR = "error"
+
+class Motion(Base):
+    __tablename__ = "motions"
+    __table_args__ = (
+        Index("ix_motions_user_created", "user_id", "created_at"),
+        Index("ix_motions_content_key", "content_key"),
+    )
+    id = Column(String(36), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    project_id = Column(Integer, ForeignKey("projects.id"))
+    audio_path = Column(String(1024), nullable=False)
+    parameters = Column(JSON, nullable=False, default=dict)
+    status = Column(String(16), nullable=False, default=MotionStatus.PENDING.value)
+    motion_path = Column(String(1024))
+    content_key = Column(String(64))  # MotionArtifact the result points at; None if the audio was unreadable when queued
+    error = Column(Text)
+    attempts = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    started_at = Column(DateTime(timezone=True))
+    completed_at = Column(DateTime(timezone=True))
+    user = relationship("User", backref="motions")
+
+class MotionArtifact(Base):
+    """One stored result, shared by every motion with the same audio, parameters and model version."""
+    __tablename__ = "motion_artifacts"
+    content_key = Column(String(64), primary_key=True)
+    path = Column(String(1024), nullable=False)
+    model_version = Column(String(64), nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    released_at = Column(DateTime(timezone=True))  # last time a motion stopped pointing here
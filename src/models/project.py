@@ -1,12 +1,14 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, func
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index, func
 from sqlalchemy.orm import relationship
 from src.core.database import Base
 
 class Project(Base):
     __tablename__ = "projects"
+    # Serves the owner's listing newest-first, keyset-paginated on (created_at, id)
+    __table_args__ = (Index("ix_projects_owner_created_id", "owner_id", "created_at", "id"),)
     id = Column(Integer, primary_key=True)
     name = Column(String(255), nullable=False)
     description = Column(String(512))
     owner_id = Column(Integer, ForeignKey("users.id"))
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     owner = relationship("User", backref="projects")
@@ -0,0 +1,158 @@
+"""
+Sampling profiler.
+
+A daemon thread wakes `hz` times a second, grabs every thread's current
+frame via sys._current_frames() and counts the stacks in collapsed form
+("thread;outer (file:line);...;inner (file:line) count"), which
+flamegraph.pl, speedscope and Grafana's flame graph panel all read
+directly. Executor threads running inference are sampled like any other
+thread. The cost is roughly one stack walk per thread per tick; nothing
+is installed in the interpreter (no setprofile/settrace hooks).
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+TRUNCATED = "[truncated]"
+
+
+class ProfilerBusy(RuntimeError):
+    """An on-demand profile is already running in this process."""
+
+
+class SamplingProfiler:
+    def __init__(self, hz: int = 100, max_depth: int = 128, max_stacks: int = 20000):
+        self.hz = max(1, hz)
+        self.max_depth = max_depth
+        self.max_stacks = max_stacks
+        self.samples = 0
+        self.started_at: Optional[float] = None
+        self._stacks: Counter = Counter()
+        self._labels: Dict[object, str] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+        return label
+
+    def sample(self) -> None:
+        own = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        frames = sys._current_frames()
+        with self._lock:
+            for ident, frame in frames.items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < self.max_depth:
+                    stack.append(self._label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}"))
+                key = ";".join(reversed(stack))
+                if key not in self._stacks and len(self._stacks) >= self.max_stacks:
+                    key = TRUNCATED
+                self._stacks[key] += 1
+            self.samples += 1
+
+    def _run(self) -> None:
+        interval = 1.0 / self.hz
+        next_tick = time.perf_counter()
+        while not self._stop.is_set():
+            try:
+                self.sample()
+            except Exception as e:
+                logger.warning(f"Profiler sample failed: {e}")
+            next_tick += interval
+            delay = next_tick - time.perf_counter()
+            if delay < 0:
+                # Fell behind (GIL contention); skip missed ticks rather than burst
+                next_tick = time.perf_counter()
+                delay = 0
+            self._stop.wait(delay)
+
+    def collapsed(self, reset: bool = False) -> str:
+        with self._lock:
+            lines = [f"{stack} {count}" for stack, count in self._stacks.most_common()]
+            if reset:
+                self._stacks.clear()
+                self.samples = 0
+                self.started_at = time.time()
+        return "\n".join(lines) + ("\n" if lines else "")
+
+    def summary(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "hz": self.hz,
+                "samples": self.samples,
+                "unique_stacks": len(self._stacks),
+                "started_at": self.started_at,
+                "running": self.running,
+            }
+
+
+_on_demand = threading.Lock()
+continuous_profiler: Optional[SamplingProfiler] = None
+
+
+def profile(seconds: float, hz: Optional[int] = None) -> str:
+    """Blocking: sample all threads for `seconds`, return collapsed stacks.
+
+    Raises ProfilerBusy if another on-demand profile is in progress.
+    """
+    if not _on_demand.acquire(blocking=False):
+        raise ProfilerBusy("A profile is already running")
+    try:
+        profiler = SamplingProfiler(hz=hz or settings.PROFILING_DEFAULT_HZ)
+        profiler.start()
+        time.sleep(seconds)
+        profiler.stop()
+        return profiler.collapsed()
+    finally:
+        _on_demand.release()
+
+
+def start_continuous_profiler() -> Optional[SamplingProfiler]:
+    global continuous_profiler
+    if not (settings.ENABLE_PROFILING and settings.PROFILING_CONTINUOUS):
+        return None
+    if continuous_profiler is None:
+        continuous_profiler = SamplingProfiler(hz=settings.PROFILING_CONTINUOUS_HZ)
+    continuous_profiler.start()
+    logger.info(f"Continuous profiler sampling at {continuous_profiler.hz} Hz")
+    return continuous_profiler
+
+
+def stop_continuous_profiler() -> None:
+    if continuous_profiler is not None:
+        continuous_profiler.stop()
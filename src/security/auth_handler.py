@@ -0,0 +1,168 @@
+"""
+Stateless JWT Verification
+Lets services that do not hold the signing key (whisper, motion, edge)
+validate access tokens locally against the API's published JWKS, instead
+of calling back to the API on every request.
+
+Deliberately free of src.core imports: the lightweight service images
+only need PyJWT[crypto] and FastAPI, not the API's settings.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+import urllib.request
+from typing import Any, Dict, Iterable, Optional
+
+import jwt
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+logger = logging.getLogger(__name__)
+
+
+class JWKSVerifier:
+    """
+    Verifies RS256/EdDSA tokens with keys from a JWK Set, cached by kid.
+
+    The set is fetched on first use and again once `cache_ttl` has passed.
+    A token with an unknown kid (the API rotated keys) triggers an early
+    refresh, but at most once per `min_refresh_interval`, so garbage kids
+    cannot turn into a request storm against the JWKS endpoint. If a
+    refresh fails the previous keys stay in use.
+
+    `jwks_url` may be http(s):// or file:// (a mounted ConfigMap/secret).
+    """
+
+    def __init__(
+        self,
+        jwks_url: Optional[str] = None,
+        algorithms: Iterable[str] = ("RS256", "EdDSA"),
+        issuer: Optional[str] = None,
+        audience: Optional[str] = None,
+        cache_ttl: float = 300.0,
+        min_refresh_interval: float = 30.0,
+        timeout: float = 2.0,
+    ):
+        self.jwks_url = jwks_url
+        self.algorithms = set(algorithms)
+        self.issuer = issuer
+        self.audience = audience
+        self.cache_ttl = cache_ttl
+        self.min_refresh_interval = min_refresh_interval
+        self.timeout = timeout
+        self._keys: Dict[str, jwt.PyJWK] = {}
+        self._fetched_at: Optional[float] = None
+        self._attempted_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def from_env(cls) -> Optional["JWKSVerifier"]:
+        """Verifier configured from JWKS_URL & co., or None when JWKS_URL is unset (auth off)."""
+        url = os.getenv("JWKS_URL")
+        if not url:
+            return None
+        return cls(
+            url,
+            algorithms=[a.strip() for a in os.getenv("JWT_ALGORITHMS", "RS256,EdDSA").split(",")],
+            issuer=os.getenv("JWT_ISSUER") or None,
+            audience=os.getenv("JWT_AUDIENCE") or None,
+            cache_ttl=float(os.getenv("JWKS_CACHE_TTL", "300")),
+        )
+
+    def load(self, jwks: Dict[str, Any]):
+        """Replace the cached keys with a JWK Set; entries without kid or with other algorithms are skipped."""
+        keys = {}
+        for entry in jwks.get("keys", []):
+            if "kid" not in entry or entry.get("use", "sig") != "sig":
+                continue
+            try:
+                key = jwt.PyJWK(entry)
+            except jwt.PyJWKError as e:
+                logger.warning("Skipping JWK %s: %s", entry.get("kid"), e)
+                continue
+            if key.algorithm_name in self.algorithms:
+                keys[entry["kid"]] = key
+        self._keys = keys
+        self._fetched_at = time.monotonic()
+
+    def _fetch(self) -> Dict[str, Any]:
+        with urllib.request.urlopen(self.jwks_url, timeout=self.timeout) as resp:
+            return json.loads(resp.read())
+
+    async def refresh(self, force: bool = False):
+        attempted = self._attempted_at
+        async with self._lock:
+            # Someone else refreshed while we waited for the lock
+            if self._attempted_at != attempted:
+                return
+            now = time.monotonic()
+            if not force and attempted is not None and now - attempted < self.min_refresh_interval:
+                return
+            self._attempted_at = now
+            try:
+                self.load(await asyncio.to_thread(self._fetch))
+                logger.info("Loaded %d signing keys from %s", len(self._keys), self.jwks_url)
+            except Exception as e:
+                logger.warning("JWKS refresh from %s failed: %s", self.jwks_url, e)
+
+    async def get_key(self, kid: Optional[str]) -> Optional[jwt.PyJWK]:
+        if self.jwks_url:
+            stale = self._fetched_at is None or time.monotonic() - self._fetched_at > self.cache_ttl
+            if stale or kid not in self._keys:
+                await self.refresh()
+        return self._keys.get(kid)
+
+    async def verify(self, token: str) -> Dict[str, Any]:
+        """Claims of a valid access token; ValueError otherwise."""
+        try:
+            header = jwt.get_unverified_header(token)
+        except jwt.InvalidTokenError:
+            raise ValueError("Invalid token format")
+        if header.get("alg") not in self.algorithms:
+            raise ValueError("Unsupported token algorithm")
+        key = await self.get_key(header.get("kid"))
+        if key is None:
+            raise ValueError("Unknown signing key")
+        try:
+            claims = jwt.decode(
+                token,
+                key.key,
+                algorithms=[key.algorithm_name],
+                issuer=self.issuer,
+                audience=self.audience,
+                options={"require": ["exp"]},
+            )
+        except jwt.ExpiredSignatureError:
+            raise ValueError("Token expired")
+        except jwt.InvalidTokenError:
+            raise ValueError("Invalid token format")
+        if claims.get("type") == "refresh":
+            raise ValueError("Refresh tokens are not accepted here")
+        return claims
+
+
+_bearer = HTTPBearer(auto_error=False)
+
+
+def bearer_auth(verifier: Optional[JWKSVerifier]):
+    """
+    FastAPI dependency returning the verified claims of the bearer token.
+    With no verifier (JWKS_URL unset) auth is off and it returns None.
+    """
+
+    async def dependency(credentials: Optional[HTTPAuthorizationCredentials] = Depends(_bearer)) -> Optional[Dict[str, Any]]:
+        if verifier is None:
+            return None
+        if credentials is None:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated",
+                                headers={"WWW-Authenticate": "Bearer"})
+        try:
+            return await verifier.verify(credentials.credentials)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e),
+                                headers={"WWW-Authenticate": "Bearer"})
+
+    return dependency
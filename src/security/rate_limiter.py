@@ -0,0 +1,148 @@
+"""
+Distributed Rate Limiting
+Sliding-window counters enforced atomically in Redis, with an in-process
+token bucket used whenever Redis is unavailable.
+"""
+
+import logging
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from src.core.cache import RedisCache, redis_client
+from src.core.config import settings
+from src.core.metrics import metrics
+from src.core.security import verify_token
+
+logger = logging.getLogger(__name__)
+
+# Sliding-window counter: the previous fixed window is weighted by how much
+# of it still overlaps the sliding window. Two GETs and one INCR per call,
+# independent of request volume.
+SLIDING_WINDOW_LUA = """
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local elapsed = tonumber(ARGV[3])
+local previous = tonumber(redis.call("GET", KEYS[2]) or "0")
+local current = tonumber(redis.call("GET", KEYS[1]) or "0")
+local weighted = previous * (window - elapsed) / window + current
+if weighted + 1 > limit then
+    return {0, 0, window - elapsed}
+end
+current = redis.call("INCR", KEYS[1])
+if current == 1 then
+    redis.call("PEXPIRE", KEYS[1], window * 2)
+end
+return {1, math.floor(limit - weighted - 1), 0}
+"""
+
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float  # seconds
+    backend: str = "redis"
+
+
+class TokenBucket:
+    """Per-process fallback limiter; bounded so memory stays O(max_keys)."""
+
+    def __init__(self, window_seconds: int, max_keys: int = 10000):
+        self.window = window_seconds
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def hit(self, key: str, limit: int, now: Optional[float] = None) -> RateLimitResult:
+        now = time.monotonic() if now is None else now
+        rate = limit / self.window
+        tokens, last = self._buckets.get(key, (float(limit), now))
+        tokens = min(float(limit), tokens + (now - last) * rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        retry_after = 0.0 if allowed else (1 - tokens) / rate
+        return RateLimitResult(allowed, limit, int(tokens), retry_after, backend="local")
+
+
+class RateLimiter:
+    """Resolves who is calling and which limit applies, then enforces it."""
+
+    def __init__(
+        self,
+        cache: RedisCache = redis_client,
+        default_limit: Optional[int] = None,
+        window_seconds: Optional[int] = None,
+        route_limits: Optional[Dict[str, int]] = None,
+        client_limits: Optional[Dict[str, int]] = None,
+    ):
+        self.cache = cache
+        self.default_limit = default_limit or settings.API_RATE_LIMIT
+        self.window = window_seconds or settings.API_RATE_LIMIT_WINDOW
+        routes = settings.API_RATE_LIMIT_ROUTES if route_limits is None else route_limits
+        # Longest prefix wins
+        self.route_limits = sorted(routes.items(), key=lambda kv: len(kv[0]), reverse=True)
+        self.client_limits = settings.API_RATE_LIMIT_CLIENTS if client_limits is None else client_limits
+        self.fallback = TokenBucket(self.window)
+        self._script = None
+        self._script_client = None
+        self._redis_down_until = 0.0
+
+    def identify(self, authorization: Optional[str], client_host: Optional[str]) -> str:
+        # API keys are not validated anywhere yet, so X-API-Key cannot pick the
+        # bucket: a fresh random key per request would dodge the per-IP limit
+        if authorization and authorization.lower().startswith("bearer "):
+            try:
+                sub = verify_token(authorization[7:]).get("sub")
+                if sub is not None:
+                    return f"user:{sub}"
+            except ValueError:
+                pass
+        return f"ip:{client_host or 'unknown'}"
+
+    def resolve(self, path: str, identity: str) -> Tuple[str, int]:
+        for prefix, limit in self.route_limits:
+            if path.startswith(prefix):
+                return prefix, limit
+        return "global", self.client_limits.get(identity, self.default_limit)
+
+    async def hit(self, identity: str, path: str) -> RateLimitResult:
+        scope, limit = self.resolve(path, identity)
+        result = await self._hit_redis(identity, scope, limit)
+        if result is None:
+            result = self.fallback.hit(f"{identity}|{scope}", limit)
+        metrics.record_rate_limit(scope, result.allowed, result.backend)
+        return result
+
+    async def _hit_redis(self, identity: str, scope: str, limit: int) -> Optional[RateLimitResult]:
+        client = self.cache.redis_client
+        if client is None or time.monotonic() < self._redis_down_until:
+            return None
+        if self._script is None or self._script_client is not client:
+            self._script = client.register_script(SLIDING_WINDOW_LUA)
+            self._script_client = client
+        window_ms = self.window * 1000
+        now_ms = int(time.time() * 1000)
+        index, elapsed = divmod(now_ms, window_ms)
+        # Hash tag keeps both windows in one cluster slot
+        base = f"ratelimit:{{{identity}|{scope}}}"
+        try:
+            allowed, remaining, retry_ms = await self._script(
+                keys=[f"{base}:{index}", f"{base}:{index - 1}"],
+                args=[limit, window_ms, elapsed],
+            )
+        except Exception as e:
+            logger.warning("Redis rate limiter unavailable, using local buckets: %s", e)
+            self._redis_down_until = time.monotonic() + 5
+            return None
+        return RateLimitResult(bool(allowed), limit, max(int(remaining), 0), math.ceil(int(retry_ms) / 1000))
+
+
+rate_limiter = RateLimiter()
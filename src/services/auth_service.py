@@ -1,17 +1,56 @@
 import hashlib
+import hmac
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any, Dict, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from src.models.user import User
 from src.api.schemas.auth import UserCreate
-from src.core.security import create_token
+from src.core.cache import redis_client
+from src.core.config import settings
+from src.core.security import create_token, hash_password_async, needs_rehash, verify_password_async
+
+@dataclass
+class UserSnapshot:
+    """Detached copy of the fields request handlers read from the current user."""
+    id: int
+    email: str
+    full_name: str
+    is_active: bool
+    is_admin: bool
+    created_at: Optional[datetime] = None
+
+    @classmethod
+    def from_model(cls, user: User) -> "UserSnapshot":
+        return cls(user.id, user.email, user.full_name or "", bool(user.is_active), bool(user.is_admin), user.created_at)
+
+    def to_cache(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["created_at"] = self.created_at.isoformat() if self.created_at else None
+        return data
+
+    @classmethod
+    def from_cache(cls, data: Dict[str, Any]) -> "UserSnapshot":
+        created = data.get("created_at")
+        return cls(**{**data, "created_at": datetime.fromisoformat(created) if created else None})
+
+def _user_key(user_id: int) -> str:
+    return f"user:{user_id}"
 
 class AuthService:
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    def _hash(self, password: str) -> str:
+    def _legacy_hash(self, password: str) -> str:
+        # Unsalted sha256 from before bcrypt; only ever compared, never written
         return hashlib.sha256(password.encode("utf-8")).hexdigest()
 
+    async def _check_password(self, user: User, password: str) -> bool:
+        if user.hashed_password.startswith("$2"):
+            return await verify_password_async(password, user.hashed_password)
+        return hmac.compare_digest(user.hashed_password, self._legacy_hash(password))
+
     async def get_user_by_email(self, email: str):
         q = await self.db.execute(select(User).where(User.email == email))
         return q.scalar_one_or_none()
@@ -20,17 +59,48 @@ class AuthService:
         q = await self.db.execute(select(User).where(User.id == user_id))
         return q.scalar_one_or_none()
 
+    async def get_cached_user(self, user_id: int) -> Optional[UserSnapshot]:
+        """User for an authenticated request: Redis (and the near-cache) first, Postgres on a miss."""
+        ttl = settings.AUTH_USER_CACHE_TTL
+        if ttl > 0:
+            data = await redis_client.get(_user_key(user_id))
+            if data:
+                return UserSnapshot.from_cache(data)
+        user = await self.get_user_by_id(user_id)
+        if user is None:
+            return None
+        snapshot = UserSnapshot.from_model(user)
+        if ttl > 0:
+            await redis_client.set(_user_key(user_id), snapshot.to_cache(), ttl=ttl)
+        return snapshot
+
+    async def invalidate_user(self, user_id: int):
+        """Drop the cached record; call after any change to a user row."""
+        await redis_client.delete(_user_key(user_id))
+
+    async def update_user(self, user: User, **changes) -> User:
+        for field, value in changes.items():
+            setattr(user, field, value)
+        await self.db.commit()
+        # Only now: a request reading the row before the commit would re-cache the old values
+        await self.invalidate_user(user.id)
+        return user
+
     async def create_user(self, data: UserCreate) -> User:
-        user = User(email=data.email, hashed_password=self._hash(data.password), full_name=data.full_name)
+        hashed = await hash_password_async(data.password)
+        user = User(email=data.email, hashed_password=hashed, full_name=data.full_name)
         self.db.add(user)
         await self.db.flush()
         return user
 
     async def authenticate_user(self, email: str, password: str):
         user = await self.get_user_by_email(email)
-        if user and user.hashed_password == self._hash(password):
-            return user
-        return None
+        if user is None or not await self._check_password(user, password):
+            return None
+        if needs_rehash(user.hashed_password):
+            # Upgrade legacy sha256 / low-cost hashes while we hold the plaintext
+            await self.update_user(user, hashed_password=await hash_password_async(password))
+        return user
 
     async def create_access_token(self, user: User) -> str:
         return create_token({"sub": str(user.id), "email": user.email})
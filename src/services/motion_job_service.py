@@ -0,0 +1,471 @@
+"""
+Motion Generation Service
+The API side records a motion job and queues it; the motion workers
+(src.workers.motion_worker) run the diffusion model on batches of
+compatible jobs and update the rows.
+
+Results are content-addressed: sha256 of the audio bytes, the canonical
+parameters and MOTION_MODEL_VERSION names one file under
+OUTPUT_DIR/motions. A job whose key already has a result completes at
+once pointing at it; motion_artifacts.ref_count counts the motions
+sharing each file and collect_garbage() deletes the unreferenced ones.
+
+Audio is only ever read from under LOCAL_STORAGE_PATH, where uploads
+land: a regular file of at most UPLOAD_MAX_SIZE.
+
+Every status change is also published as a job event (src.core.job_events)
+for the API's WebSocket subscribers.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import stat
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Optional
+
+from sqlalchemy import case, delete, exists, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.cache import redis_client
+from src.core.config import settings
+from src.core.exceptions import MLModelError, ValidationError
+from src.core.job_events import JobEventBus, job_events
+from src.core.metrics import metrics
+from src.core.queue import Job, JobQueue
+from src.models.motion import Motion, MotionArtifact, MotionStatus
+
+logger = logging.getLogger(__name__)
+
+motion_queue = JobQueue("motion")
+
+DEFAULT_PARAMETERS: Dict[str, Any] = {
+    "style": "natural",
+    "energy": 1.0,
+    "smoothness": 0.8,
+    "fps": 30,
+    "format": "bvh",
+    "include_fingers": True,
+    "include_face": False,
+}
+
+
+# Jobs agreeing on these share a diffusion call; the rest of the
+# parameters are passed per item
+BATCH_PARAMETERS = ("style", "fps", "format")
+
+
+def batch_key(parameters: Dict[str, Any]) -> str:
+    return "|".join(str(parameters.get(k)) for k in BATCH_PARAMETERS)
+
+
+# Progress reported while a batch runs; the diffusion call itself is opaque
+PROGRESS_STARTED, PROGRESS_AUDIO_LOADED, PROGRESS_GENERATED, PROGRESS_DONE = 0, 10, 90, 100
+
+
+def motion_event(motion: Motion) -> Dict[str, Any]:
+    """Current status of a motion in job-event form (what a subscriber is sent first)."""
+    return {
+        "type": "job", "kind": "motion", "job_id": motion.id, "user_id": motion.user_id,
+        "status": motion.status,
+        "progress": PROGRESS_DONE if motion.status == MotionStatus.COMPLETED.value else None,
+        "motion_path": motion.motion_path, "error": motion.error, "ts": time.time(),
+    }
+
+
+def _canonical(value: Any) -> Any:
+    # 30 and 30.0 ask for the same motion
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, dict):
+        return {k: _canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    return value
+
+
+def audio_location(audio_path: str) -> Optional[Path]:
+    """Resolved path of a job's audio (relative paths start at LOCAL_STORAGE_PATH); None if it leads outside."""
+    root = Path(settings.LOCAL_STORAGE_PATH).resolve()
+    path = (root / audio_path).resolve()
+    return path if path.is_relative_to(root) else None
+
+
+def _open_audio(audio_path: str) -> BinaryIO:
+    """Open a job's audio; OSError unless it is a regular file of at most UPLOAD_MAX_SIZE under the storage root."""
+    path = audio_location(audio_path)
+    if path is None:
+        raise PermissionError(f"{audio_path} is outside the upload storage")
+    # Non-blocking so a FIFO cannot hold the open; no effect on regular files
+    fd = os.open(path, os.O_RDONLY | getattr(os, "O_NONBLOCK", 0))
+    try:
+        st = os.fstat(fd)
+        if not stat.S_ISREG(st.st_mode):
+            raise OSError(f"{audio_path} is not a regular file")
+        if st.st_size > settings.UPLOAD_MAX_SIZE:
+            raise OSError(f"{audio_path} is larger than UPLOAD_MAX_SIZE")
+        return os.fdopen(fd, "rb")
+    except BaseException:
+        os.close(fd)
+        raise
+
+
+def _read_audio(audio_path: str) -> bytes:
+    with _open_audio(audio_path) as f:
+        # Capped again in case the file grew after the size check
+        data = f.read(settings.UPLOAD_MAX_SIZE + 1)
+    if len(data) > settings.UPLOAD_MAX_SIZE:
+        raise OSError(f"{audio_path} is larger than UPLOAD_MAX_SIZE")
+    return data
+
+
+def content_key(audio_path: str, parameters: Dict[str, Any], model_version: Optional[str] = None) -> str:
+    """sha256 over the audio bytes, the parameters and the model version; OSError if the audio is unreadable."""
+    audio, size = hashlib.sha256(), 0
+    with _open_audio(audio_path) as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            size += len(chunk)
+            if size > settings.UPLOAD_MAX_SIZE:
+                raise OSError(f"{audio_path} is larger than UPLOAD_MAX_SIZE")
+            audio.update(chunk)
+    params = json.dumps(_canonical(parameters), sort_keys=True, separators=(",", ":"), default=str)
+    version = model_version or settings.MOTION_MODEL_VERSION
+    return hashlib.sha256(f"{audio.hexdigest()}\n{params}\n{version}".encode()).hexdigest()
+
+
+def _try_content_key(audio_path: str, parameters: Dict[str, Any]) -> Optional[str]:
+    try:
+        return content_key(audio_path, parameters)
+    except OSError:
+        # The worker reports it if the audio is still missing then
+        return None
+
+
+def artifact_path(key: str, fmt: str) -> Path:
+    return Path(settings.OUTPUT_DIR) / "motions" / key[:2] / f"{key}.{fmt or 'bvh'}"
+
+
+def _read_inputs(paths: List[str]) -> List[Any]:
+    out: List[Any] = []
+    for path in paths:
+        try:
+            out.append(_read_audio(path))
+        except OSError as e:
+            out.append(e)
+    return out
+
+
+def _write_outputs(paths: List[str], outputs: List[Any]):
+    for path, data in zip(paths, outputs):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Other motions may be reading a shared result: swap it in whole
+        tmp = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+        if isinstance(data, bytes):
+            tmp.write_bytes(data)
+        else:
+            tmp.write_text(str(data))
+        os.replace(tmp, path)
+
+
+def _unlink(paths: List[str]):
+    for path in paths:
+        try:
+            Path(path).unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning("Could not delete %s: %s", path, e)
+
+
+def _stray_files(root: Path, cutoff: float) -> List[Path]:
+    # Results written by a worker that died before recording them
+    if not root.is_dir():
+        return []
+    return [p for p in root.glob("*/*") if p.is_file() and p.stat().st_mtime < cutoff]
+
+
+class MotionService:
+    def __init__(self, db: AsyncSession, queue: JobQueue = motion_queue, models: Any = None, events: JobEventBus = job_events):
+        self.db = db
+        self.queue = queue
+        self._models = models
+        self.events = events
+
+    @property
+    def models(self):
+        # Imported on first use: only workers run the model (and need torch)
+        if self._models is None:
+            from src.ml_serving.model_manager import model_manager
+            self._models = model_manager
+        return self._models
+
+    async def generate_motion(
+        self,
+        audio_path: str,
+        user_id: int,
+        project_id: Optional[int] = None,
+        parameters: Optional[Dict[str, Any]] = None,
+    ) -> Motion:
+        """
+        Record a motion job and queue it; ValidationError (422) if the audio
+        is outside the upload storage, QueueUnavailableError (503) if it
+        cannot be queued. When the same audio and parameters were generated
+        before with this model version, the motion is completed on the spot.
+        """
+        if audio_location(audio_path) is None:
+            raise ValidationError("audio_path must point into the upload storage")
+        parameters = {**DEFAULT_PARAMETERS, **(parameters or {})}
+        motion = Motion(
+            id=str(uuid.uuid4()),
+            user_id=user_id,
+            project_id=project_id,
+            audio_path=audio_path,
+            parameters=parameters,
+            content_key=await asyncio.to_thread(_try_content_key, audio_path, parameters),
+            status=MotionStatus.PENDING.value,
+            attempts=0,
+            created_at=datetime.now(timezone.utc),
+        )
+        if motion.content_key:
+            path = await self._reuse(motion.content_key)
+            if path:
+                motion.status = MotionStatus.COMPLETED.value
+                motion.motion_path = path
+                motion.completed_at = motion.created_at
+                self.db.add(motion)
+                # Same transaction as the ref_count increment
+                await self.db.commit()
+                metrics.record_motion_reuse("api")
+                logger.info("Motion %s reused result %s", motion.id, motion.content_key)
+                await self._publish([motion], MotionStatus.COMPLETED, PROGRESS_DONE, motion_path=path)
+                return motion
+        self.db.add(motion)
+        # Committed before queueing so a worker never picks up a job it cannot see
+        await self.db.commit()
+        try:
+            await self.queue.enqueue({"motion_id": motion.id, "batch_key": batch_key(motion.parameters)})
+        except Exception as e:
+            await self._set_error(motion.id, str(e))
+            raise
+        logger.info("Motion job %s queued", motion.id)
+        await self._publish([motion], MotionStatus.PENDING)
+        return motion
+
+    async def get_motion(self, motion_id: str, user_id: Optional[int] = None) -> Optional[Motion]:
+        query = select(Motion).where(Motion.id == motion_id)
+        if user_id is not None:
+            query = query.where(Motion.user_id == user_id)
+        return (await self.db.execute(query)).scalar_one_or_none()
+
+    async def _publish(self, motions: List[Any], status: MotionStatus, progress: Optional[int] = None, **extra: Any):
+        for m in motions:
+            await self.events.publish("motion", m.id, m.user_id, status.value, progress, **extra)
+
+    async def _reuse(self, key: str, refs: int = 1) -> Optional[str]:
+        """Take `refs` references on a stored result and return its path; None if there is none (or its file is gone)."""
+        path = (await self.db.execute(
+            update(MotionArtifact).where(MotionArtifact.content_key == key)
+            .values(ref_count=MotionArtifact.ref_count + refs).returning(MotionArtifact.path)
+        )).scalar_one_or_none()
+        if path is not None and not await asyncio.to_thread(os.path.exists, path):
+            # Deleted out of band: give the references back and regenerate
+            await self.db.execute(
+                update(MotionArtifact).where(MotionArtifact.content_key == key)
+                .values(ref_count=MotionArtifact.ref_count - refs)
+            )
+            return None
+        return path
+
+    async def _store_artifacts(self, paths: Dict[str, str], groups: Dict[str, list]):
+        if not paths:
+            return
+        existing = set((await self.db.execute(
+            select(MotionArtifact.content_key).where(MotionArtifact.content_key.in_(paths))
+        )).scalars())
+        for key in existing:
+            # Its file had gone missing and was just regenerated in place
+            await self.db.execute(
+                update(MotionArtifact).where(MotionArtifact.content_key == key)
+                .values(path=paths[key], ref_count=MotionArtifact.ref_count + len(groups[key]), released_at=None)
+            )
+        # Two workers producing the same key race on this insert; the loser's
+        # batch retries and then reuses the winner's result
+        fresh = [
+            {"content_key": key, "path": path, "model_version": settings.MOTION_MODEL_VERSION, "ref_count": len(groups[key])}
+            for key, path in paths.items() if key not in existing
+        ]
+        if fresh:
+            await self.db.execute(insert(MotionArtifact), fresh)
+
+    async def delete_motion(self, motion_id: str, user_id: int) -> bool:
+        """Delete a motion and drop its reference on the stored result; False if the user has no such motion."""
+        row = (await self.db.execute(
+            delete(Motion).where(Motion.id == motion_id, Motion.user_id == user_id)
+            .returning(Motion.content_key, Motion.motion_path)
+        )).one_or_none()
+        if row is None:
+            return False
+        if row.content_key:
+            # At zero the result is kept MOTION_ARTIFACT_GC_GRACE longer for repeat requests
+            await self.db.execute(
+                update(MotionArtifact).where(MotionArtifact.content_key == row.content_key)
+                .values(ref_count=MotionArtifact.ref_count - 1, released_at=datetime.now(timezone.utc))
+            )
+        await self.db.commit()
+        if not row.content_key and row.motion_path:
+            await asyncio.to_thread(_unlink, [row.motion_path])
+        await redis_client.delete(f"motion:{motion_id}")
+        return True
+
+    async def process_motion_batch(self, jobs: List[Job]) -> Dict[str, str]:
+        """
+        Worker side: run queued jobs that share style/fps/format through one
+        diffusion call and record the results in bulk. Returns {job.id: error}
+        for jobs that should retry on their own; raising retries all of them.
+        """
+        by_motion = {job.payload["motion_id"]: job for job in jobs}
+        rows = (await self.db.execute(
+            select(Motion.id, Motion.user_id, Motion.audio_path, Motion.parameters, Motion.status, Motion.content_key)
+            .where(Motion.id.in_(by_motion))
+        )).all()
+        # Deleted rows and completed ones (redelivered after a worker died
+        # between commit and ack) need no work
+        todo = [r for r in rows if r.status != MotionStatus.COMPLETED.value]
+        if not todo:
+            return {}
+        started_at = datetime.now(timezone.utc)
+        await self.db.execute(update(Motion), [
+            {"id": r.id, "status": MotionStatus.PROCESSING.value, "attempts": by_motion[r.id].attempt, "started_at": started_at}
+            for r in todo
+        ])
+        await self.db.commit()
+        await self._publish(todo, MotionStatus.PROCESSING, PROGRESS_STARTED, attempt=max(j.attempt for j in jobs))
+
+        # Keyed jobs with the same key need one result: the first is generated,
+        # the rest follow it; a result stored since they were queued serves them all
+        groups: Dict[str, list] = {}
+        for r in todo:
+            groups.setdefault(r.content_key or r.id, []).append(r)
+        paths: Dict[str, str] = {}
+        for key, members in groups.items():
+            if members[0].content_key:
+                path = await self._reuse(key, len(members))
+                if path:
+                    paths[key] = path
+        if paths:
+            metrics.record_motion_reuse("worker", sum(len(groups[k]) for k in paths))
+
+        errors: Dict[str, str] = {}
+        ready = []
+        leaders = [members[0] for key, members in groups.items() if key not in paths]
+        for r, audio in zip(leaders, await asyncio.to_thread(_read_inputs, [r.audio_path for r in leaders])):
+            if isinstance(audio, Exception):
+                for member in groups[r.content_key or r.id]:
+                    errors[by_motion[member.id].id] = f"Cannot read audio: {audio}"
+            else:
+                ready.append((r, audio))
+
+        if ready:
+            await self._publish([m for r, _ in ready for m in groups[r.content_key or r.id]], MotionStatus.PROCESSING, PROGRESS_AUDIO_LOADED)
+            shared = {k: ready[0][0].parameters.get(k) for k in BATCH_PARAMETERS}
+            item_parameters = [{k: v for k, v in r.parameters.items() if k not in BATCH_PARAMETERS} for r, _ in ready]
+            t0 = time.perf_counter()
+            outputs = await self.models.predict(
+                "motion_diffusion", [audio for _, audio in ready], item_parameters=item_parameters, **shared,
+            )
+            gpu_seconds = time.perf_counter() - t0
+            if not isinstance(outputs, (list, tuple)) or len(outputs) != len(ready):
+                raise MLModelError(f"motion_diffusion returned {type(outputs).__name__} for a batch of {len(ready)}", "motion_diffusion")
+            metrics.record_motion_batch(len(ready), settings.MOTION_BATCH_SIZE, gpu_seconds)
+            await self._publish([m for r, _ in ready for m in groups[r.content_key or r.id]], MotionStatus.PROCESSING, PROGRESS_GENERATED)
+
+            fmt = shared["format"] or "bvh"
+            new = {
+                (r.content_key or r.id): str(artifact_path(r.content_key, fmt) if r.content_key else Path(settings.OUTPUT_DIR) / f"{r.id}.{fmt}")
+                for r, _ in ready
+            }
+            await asyncio.to_thread(_write_outputs, list(new.values()), outputs)
+            paths.update(new)
+            await self._store_artifacts({r.content_key: new[r.content_key] for r, _ in ready if r.content_key}, groups)
+
+        done = [(m, paths[key]) for key, members in groups.items() if key in paths for m in members]
+        if not done:
+            await self.db.commit()
+            return errors
+        completed_at = datetime.now(timezone.utc)
+        await self.db.execute(update(Motion), [
+            {"id": m.id, "status": MotionStatus.COMPLETED.value, "motion_path": path, "error": None, "completed_at": completed_at}
+            for m, path in done
+        ])
+        await self.db.commit()
+        for m, path in done:
+            await redis_client.set(f"motion:{m.id}", path, ttl=settings.MOTION_CACHE_TTL)
+            await self.events.publish("motion", m.id, m.user_id, MotionStatus.COMPLETED.value, PROGRESS_DONE, motion_path=path)
+        return errors
+
+    async def mark_failed(self, motion_id: str, error: str):
+        """Retries exhausted: the job is dead-lettered and the row reports the last error."""
+        await self._set_error(motion_id, error)
+
+    async def _set_error(self, motion_id: str, error: str):
+        user_id = (await self.db.execute(
+            update(Motion).where(Motion.id == motion_id).values(
+                status=MotionStatus.ERROR.value, error=error[:2000], completed_at=datetime.now(timezone.utc),
+            ).returning(Motion.user_id)
+        )).scalar_one_or_none()
+        await self.db.commit()
+        if user_id is not None:
+            await self.events.publish("motion", motion_id, user_id, MotionStatus.ERROR.value, error=error[:2000])
+
+
+async def collect_garbage(db: AsyncSession, grace_seconds: Optional[int] = None) -> Dict[str, int]:
+    """
+    Delete stored motion results nothing points at any more. ref_count is
+    first corrected from the motions table (rows removed without
+    delete_motion, e.g. by a project delete), then results unreferenced
+    for longer than the grace period are deleted, re-checking motions in
+    the same statement so a concurrent reuse always wins. Files under
+    OUTPUT_DIR/motions with no row (a worker died between writing and
+    committing) go after the same grace period.
+    """
+    grace = settings.MOTION_ARTIFACT_GC_GRACE if grace_seconds is None else grace_seconds
+    now = datetime.now(timezone.utc)
+    cutoff = now - timedelta(seconds=grace)
+    referenced = exists().where(Motion.content_key == MotionArtifact.content_key)
+
+    refs = select(func.count()).where(Motion.content_key == MotionArtifact.content_key).scalar_subquery()
+    reconciled = (await db.execute(
+        update(MotionArtifact).where(MotionArtifact.ref_count != refs).values(
+            ref_count=refs,
+            released_at=case((refs == 0, now), else_=MotionArtifact.released_at),
+        ).execution_options(synchronize_session=False)
+    )).rowcount
+    deleted = (await db.execute(
+        delete(MotionArtifact).where(
+            MotionArtifact.ref_count <= 0,
+            func.coalesce(MotionArtifact.released_at, MotionArtifact.created_at) < cutoff,
+            ~referenced,
+        ).returning(MotionArtifact.path)
+    )).scalars().all()
+    await db.commit()
+    await asyncio.to_thread(_unlink, list(deleted))
+
+    stray = await asyncio.to_thread(_stray_files, Path(settings.OUTPUT_DIR) / "motions", cutoff.timestamp())
+    orphans: List[str] = []
+    for i in range(0, len(stray), 500):
+        chunk = stray[i:i + 500]
+        # Tmp files carry the key before the first dot as well
+        keys = {p: p.name.split(".", 1)[0] for p in chunk}
+        known = set((await db.execute(
+            select(MotionArtifact.content_key).where(MotionArtifact.content_key.in_(set(keys.values())))
+        )).scalars())
+        orphans += [str(p) for p, key in keys.items() if key not in known or p.name.endswith(".tmp")]
+    await asyncio.to_thread(_unlink, orphans)
+
+    result = {"reconciled": reconciled, "artifacts": len(deleted), "files": len(orphans)}
+    logger.info("Motion result GC: %s", result)
+    return result
@@ -1,11 +1,17 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from starlette.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import time
+from typing import Optional
+
+from src.security.auth_handler import JWKSVerifier, bearer_auth
 
 app = FastAPI(title="Rebellis Motion Service")
 app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_credentials=True, allow_methods=["*"], allow_headers=["*"])
 
+# Tokens are verified locally against the API's JWKS (set JWKS_URL); unset = no auth
+require_token = bearer_auth(JWKSVerifier.from_env())
+
 @app.get("/health")
 async def health():
     return {"status": "ok", "service": "motion"}
@@ -18,7 +24,7 @@ class MotionResponse(BaseModel):
     latency_ms: float
 
 @app.post("/infer", response_model=MotionResponse)
-async def infer(req: MotionRequest):
+async def infer(req: MotionRequest, claims: Optional[dict] = Depends(require_token)):
     t0 = time.perf_counter()
     time.sleep(0.1)
     dt = (time.perf_counter() - t0) * 1000
@@ -0,0 +1,120 @@
+from typing import Dict, Iterable, List, Set, Tuple
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.api.schemas.project import BulkItemError, ProjectBulkRequest, ProjectBulkResult, ProjectRead
+from src.api.schemas.task import TaskBulkRequest, TaskBulkResult, TaskRead
+from src.models.project import Project
+from src.models.task import Task
+
+def _dedupe(op: str, ids: Iterable[int], owned: Set[int], errors: List[BulkItemError]) -> List[Tuple[int, int]]:
+    """(index, id) pairs that may be applied; everything else becomes a per-item error."""
+    seen, ok = set(), []
+    for i, item_id in enumerate(ids):
+        if item_id in seen:
+            errors.append(BulkItemError(op=op, index=i, id=item_id, detail="Duplicate id in request"))
+        elif item_id not in owned:
+            errors.append(BulkItemError(op=op, index=i, id=item_id, detail="Not found"))
+        else:
+            seen.add(item_id)
+            ok.append((i, item_id))
+    return ok
+
+class ProjectService:
+    """
+    Bulk writes for projects and their tasks: one statement per operation
+    (multi-row INSERT .. RETURNING, executemany UPDATE by primary key,
+    DELETE .. WHERE id IN) instead of a round trip per item. Items that
+    cannot apply (unknown or foreign ids, duplicates) are reported, not
+    raised; the caller owns the transaction and decides whether to commit.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _owned_projects(self, owner_id: int, ids: Iterable[int]) -> Set[int]:
+        ids = set(ids)
+        if not ids:
+            return set()
+        # Lock the rows so a concurrent bulk call cannot delete them between check and write
+        q = select(Project.id).where(Project.id.in_(ids), Project.owner_id == owner_id).with_for_update()
+        return set((await self.db.execute(q)).scalars())
+
+    async def _owned_tasks(self, owner_id: int, ids: Iterable[int]) -> Set[int]:
+        ids = set(ids)
+        if not ids:
+            return set()
+        q = (select(Task.id).join(Project, Task.project_id == Project.id)
+             .where(Task.id.in_(ids), Project.owner_id == owner_id).with_for_update(of=Task))
+        return set((await self.db.execute(q)).scalars())
+
+    async def bulk_projects(self, owner_id: int, req: ProjectBulkRequest) -> ProjectBulkResult:
+        result = ProjectBulkResult()
+        owned = await self._owned_projects(owner_id, [u.id for u in req.update] + req.delete)
+
+        updates = _dedupe("update", [u.id for u in req.update], owned, result.errors)
+        deletes = _dedupe("delete", req.delete, owned, result.errors)
+        deleting = {item_id for _, item_id in deletes}
+        for i, item_id in list(updates):
+            if item_id in deleting:
+                detail = "Also deleted in this request"
+            elif "name" in req.update[i].model_fields_set and req.update[i].name is None:
+                detail = "name cannot be null"
+            else:
+                continue
+            result.errors.append(BulkItemError(op="update", index=i, id=item_id, detail=detail))
+            updates.remove((i, item_id))
+
+        if req.create:
+            rows = [{**p.model_dump(), "owner_id": owner_id} for p in req.create]
+            created = await self.db.scalars(insert(Project).returning(Project, sort_by_parameter_order=True), rows)
+            result.created = [ProjectRead.model_validate(p) for p in created]
+        if updates:
+            rows = [{"id": item_id, **req.update[i].model_dump(exclude_unset=True, exclude={"id"})} for i, item_id in updates]
+            await self.db.execute(update(Project), rows)
+            result.updated = [item_id for _, item_id in updates]
+        if deleting:
+            # Same effect as deleting one by one through the ORM: tasks are detached, not removed
+            await self.db.execute(update(Task).where(Task.project_id.in_(deleting)).values(project_id=None))
+            q = delete(Project).where(Project.id.in_(deleting)).returning(Project.id)
+            result.deleted = sorted((await self.db.execute(q)).scalars())
+        return result
+
+    async def bulk_tasks(self, owner_id: int, req: TaskBulkRequest) -> TaskBulkResult:
+        result = TaskBulkResult()
+        target_projects = [t.project_id for t in req.create] + [u.project_id for u in req.update if u.project_id is not None]
+        projects = await self._owned_projects(owner_id, target_projects)
+        owned = await self._owned_tasks(owner_id, [u.id for u in req.update] + req.delete)
+
+        creates: List[Dict] = []
+        for i, t in enumerate(req.create):
+            if t.project_id not in projects:
+                result.errors.append(BulkItemError(op="create", index=i, detail=f"Project {t.project_id} not found"))
+            else:
+                creates.append(t.model_dump())
+        updates = _dedupe("update", [u.id for u in req.update], owned, result.errors)
+        deletes = _dedupe("delete", req.delete, owned, result.errors)
+        deleting = {item_id for _, item_id in deletes}
+        for i, item_id in list(updates):
+            move_to = req.update[i].project_id
+            if item_id in deleting:
+                detail = "Also deleted in this request"
+            elif move_to is not None and move_to not in projects:
+                detail = f"Project {move_to} not found"
+            elif "title" in req.update[i].model_fields_set and req.update[i].title is None:
+                detail = "title cannot be null"
+            else:
+                continue
+            result.errors.append(BulkItemError(op="update", index=i, id=item_id, detail=detail))
+            updates.remove((i, item_id))
+
+        if creates:
+            created = await self.db.scalars(insert(Task).returning(Task, sort_by_parameter_order=True), creates)
+            result.created = [TaskRead.model_validate(t) for t in created]
+        if updates:
+            rows = [{"id": item_id, **req.update[i].model_dump(exclude_unset=True, exclude={"id"})} for i, item_id in updates]
+            await self.db.execute(update(Task), rows)
+            result.updated = [item_id for _, item_id in updates]
+        if deleting:
+            q = delete(Task).where(Task.id.in_(deleting)).returning(Task.id)
+            result.deleted = sorted((await self.db.execute(q)).scalars())
+        return result
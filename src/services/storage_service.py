@@ -5,7 +5,8 @@ from src.core.config import settings
 
 class StorageService:
     def __init__(self):
-        self.base = Path("uploads")
+        # Motion jobs only read audio from under here
+        self.base = Path(settings.LOCAL_STORAGE_PATH)
         self.base.mkdir(parents=True, exist_ok=True)
 
     async def upload_uploadfile(self, upload: UploadFile, dest_rel: str) -> str:
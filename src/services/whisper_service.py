@@ -1,11 +1,17 @@
-from fastapi import FastAPI, UploadFile, File
+from fastapi import Depends, FastAPI, UploadFile, File
 from starlette.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import time
+from typing import Optional
+
+from src.security.auth_handler import JWKSVerifier, bearer_auth
 
 app = FastAPI(title="Rebellis Whisper Service")
 app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_credentials=True, allow_methods=["*"], allow_headers=["*"])
 
+# Tokens are verified locally against the API's JWKS (set JWKS_URL); unset = no auth
+require_token = bearer_auth(JWKSVerifier.from_env())
+
 @app.get("/health")
 async def health():
     return {"status": "ok", "service": "whisper"}
@@ -15,7 +21,7 @@ class InferResponse(BaseModel):
     latency_ms: float
 
 @app.post("/infer", response_model=InferResponse)
-async def infer(audio: UploadFile = File(...)):
+async def infer(audio: UploadFile = File(...), claims: Optional[dict] = Depends(require_token)):
     t0 = time.perf_counter()
     await audio.read()
     time.sleep(0.05)
@@ -1,15 +1,295 @@
-from typing import Set
+"""
+WebSocket Hub
+Open connections indexed by topic (room): `user:<id>`, `job:<id>`, or any
+name a caller broadcasts to. Sending never waits on a client: a message
+is JSON-encoded once and put on each recipient's bounded queue, and one
+writer task per connection drains it. A full queue (slow client) applies
+WS_SLOW_CONSUMER_POLICY: drop_oldest, drop_newest or disconnect.
+
+broadcast() reaches this process's connections. Job events arrive on
+their own channel (src.core.job_events) on every pod and are routed by
+dispatch_job_event. publish() additionally sends a broadcast to the other
+API pods over the WS_BACKPLANE_CHANNEL Redis channel; nothing publishes
+there yet, so the app does not start() the listener.
+"""
+
+import asyncio
+import json
+import logging
+import uuid
+from typing import Any, Dict, Iterable, Optional, Set, Tuple, Union
 from fastapi import WebSocket
+from src.core.cache import redis_client
+from src.core.config import settings
+from src.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT = json.dumps({"type": "heartbeat"})
+
+def user_topic(user_id: int) -> str:
+    return f"user:{user_id}"
+
+def job_topic(job_id: str) -> str:
+    return f"job:{job_id}"
+
+def _encode(message: Union[str, Dict[str, Any]]) -> str:
+    return message if isinstance(message, str) else json.dumps(message, default=str)
+
+class Connection:
+    __slots__ = ("ws", "user_id", "topics", "queue", "dropped", "writer")
+
+    def __init__(self, ws: WebSocket, user_id: Optional[int], queue_size: int):
+        self.ws = ws
+        self.user_id = user_id
+        self.topics: Set[str] = set()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self.writer: Optional[asyncio.Task] = None
 
 class WebSocketManager:
-    def __init__(self):
-        self.active: Set[WebSocket] = set()
+    def __init__(
+        self,
+        queue_size: Optional[int] = None,
+        policy: Optional[str] = None,
+        heartbeat: Optional[float] = None,
+        channel: Optional[str] = None,
+        redis: Any = None,
+    ):
+        self.queue_size = queue_size or settings.WS_SEND_QUEUE_SIZE
+        self.policy = policy or settings.WS_SLOW_CONSUMER_POLICY
+        self.heartbeat = settings.WS_HEARTBEAT_INTERVAL if heartbeat is None else heartbeat
+        self.channel = channel or settings.WS_BACKPLANE_CHANNEL
+        self._redis = redis
+        self.connections: Dict[WebSocket, Connection] = {}
+        self.topics: Dict[str, Set[Connection]] = {}
+        # Lets the backplane listener skip what this process already delivered
+        self._origin = uuid.uuid4().hex
+        self._listener: Optional[asyncio.Task] = None
+        self._closing: Set[asyncio.Task] = set()
+        # Bound once: the writers count every send
+        self._sent = metrics.ws_messages.labels(result="sent")
+
+    def __len__(self) -> int:
+        return len(self.connections)
+
+    @property
+    def redis(self):
+        return self._redis or redis_client.redis_client
+
+    # --- connections and topics ---
 
-    async def connect(self, ws: WebSocket):
+    async def connect(self, ws: WebSocket, user_id: Optional[int] = None) -> Connection:
         await ws.accept()
-        self.active.add(ws)
+        conn = Connection(ws, user_id, self.queue_size)
+        self.connections[ws] = conn
+        conn.writer = asyncio.create_task(self._write(conn))
+        if user_id is not None:
+            self.subscribe(ws, user_topic(user_id))
+        metrics.ws_connections.set(len(self.connections))
+        return conn
 
     def disconnect(self, ws: WebSocket):
-        self.active.discard(ws)
+        conn = self.connections.pop(ws, None)
+        if conn is None:
+            return
+        if conn.writer is not None and conn.writer is not asyncio.current_task():
+            conn.writer.cancel()
+        for topic in conn.topics:
+            self._leave(conn, topic)
+        conn.topics.clear()
+        metrics.ws_connections.set(len(self.connections))
+
+    def subscribe(self, ws: WebSocket, topic: str):
+        conn = self.connections.get(ws)
+        if conn is not None:
+            self.topics.setdefault(topic, set()).add(conn)
+            conn.topics.add(topic)
+
+    def unsubscribe(self, ws: WebSocket, topic: str):
+        conn = self.connections.get(ws)
+        if conn is not None and topic in conn.topics:
+            conn.topics.discard(topic)
+            self._leave(conn, topic)
+
+    def _leave(self, conn: Connection, topic: str):
+        members = self.topics.get(topic)
+        if members is not None:
+            members.discard(conn)
+            if not members:
+                del self.topics[topic]
+
+    # --- sending ---
+
+    def send(self, ws: WebSocket, message: Union[str, Dict[str, Any]]) -> bool:
+        """Queue a message for one connection (replies go through the writer too)."""
+        conn = self.connections.get(ws)
+        if conn is None:
+            return False
+        queued, dropped = self._offer(conn, _encode(message))
+        metrics.record_ws_messages("queued", queued)
+        metrics.record_ws_messages("dropped", dropped)
+        return bool(queued)
+
+    def broadcast(self, topics: Union[str, Iterable[str]], message: Union[str, Dict[str, Any]], user_id: Optional[int] = None) -> int:
+        """
+        Queue a message for this process's connections in any of `topics`
+        (each connection once), optionally only those authenticated as
+        `user_id`. Encoded once whatever the number of recipients.
+        """
+        if isinstance(topics, str):
+            topics = (topics,)
+        recipients: Set[Connection] = set()
+        for topic in topics:
+            recipients |= self.topics.get(topic, set())
+        if user_id is not None:
+            recipients = {c for c in recipients if c.user_id == user_id}
+        if not recipients:
+            return 0
+        text = _encode(message)
+        queued = dropped = 0
+        for conn in recipients:
+            q, d = self._offer(conn, text)
+            queued += q
+            dropped += d
+        metrics.record_ws_messages("queued", queued)
+        metrics.record_ws_messages("dropped", dropped)
+        return queued
+
+    async def publish(self, topics: Union[str, Iterable[str]], message: Union[str, Dict[str, Any]], user_id: Optional[int] = None) -> int:
+        """broadcast() here and, through the backplane, on every other API pod."""
+        topics = [topics] if isinstance(topics, str) else list(topics)
+        text = _encode(message)
+        queued = self.broadcast(topics, text, user_id)
+        client = self.redis
+        if client is not None:
+            # Header line, then the payload as encoded here: receivers forward it untouched
+            header = json.dumps({"origin": self._origin, "topics": topics, "user_id": user_id})
+            try:
+                await client.publish(self.channel, f"{header}\n{text}")
+            except Exception as e:
+                logger.debug("WebSocket backplane publish failed: %s", e)
+        return queued
+
+    def _offer(self, conn: Connection, text: str) -> Tuple[int, int]:
+        """(queued, dropped) for one message to one connection."""
+        try:
+            conn.queue.put_nowait(text)
+            return 1, 0
+        except asyncio.QueueFull:
+            pass
+        if self.policy == "disconnect":
+            self._close_slow(conn)
+            return 0, 1
+        conn.dropped += 1
+        if self.policy == "drop_newest":
+            return 0, 1
+        conn.queue.get_nowait()
+        conn.queue.put_nowait(text)
+        return 1, 1
+
+    def _close_slow(self, conn: Connection):
+        logger.info("Closing slow WebSocket consumer (user %s, %d queued)", conn.user_id, conn.queue.qsize())
+        metrics.ws_slow_disconnects.inc()
+        self.disconnect(conn.ws)
+        task = asyncio.create_task(self._close(conn.ws, 1013))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    @staticmethod
+    async def _close(ws: WebSocket, code: int):
+        try:
+            await ws.close(code=code)
+        except Exception:
+            pass
+
+    async def _write(self, conn: Connection):
+        try:
+            while True:
+                if self.heartbeat:
+                    try:
+                        text = await asyncio.wait_for(conn.queue.get(), self.heartbeat)
+                    except asyncio.TimeoutError:
+                        # Idle: proves the socket is still there
+                        text = HEARTBEAT
+                else:
+                    text = await conn.queue.get()
+                # Drain what is already queued before waiting again
+                sent = 0
+                while True:
+                    await conn.ws.send_text(text)
+                    sent += 1
+                    if conn.queue.empty():
+                        break
+                    text = conn.queue.get_nowait()
+                self._sent.inc(sent)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.debug("Dropping WebSocket after failed send: %s", e)
+            self.disconnect(conn.ws)
+
+    # --- routing ---
+
+    async def dispatch_job_event(self, event: Dict[str, Any]):
+        """JobEventBus handler: deliver one event to this process's sockets watching the job or its owner."""
+        owner = event.get("user_id")
+        queued = self.broadcast((job_topic(event.get("job_id")), user_topic(owner)), event, user_id=owner)
+        if queued:
+            metrics.record_job_event("delivered", queued)
+
+    # --- backplane ---
+
+    def start(self):
+        if self.redis is not None and self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    def _apply(self, data: Union[str, bytes]):
+        if isinstance(data, bytes):
+            data = data.decode()
+        header, sep, text = data.partition("\n")
+        if not sep:
+            return
+        try:
+            meta = json.loads(header)
+        except ValueError:
+            return
+        if meta.get("origin") != self._origin:
+            self.broadcast(meta.get("topics") or (), text, meta.get("user_id"))
+
+    async def _listen(self):
+        backoff = 1
+        while True:
+            pubsub = None
+            try:
+                pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+                await pubsub.subscribe(self.channel)
+                backoff = 1
+                async for message in pubsub.listen():
+                    if message and message.get("type") == "message":
+                        self._apply(message.get("data"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("WebSocket backplane listener disconnected: %s", e)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+            finally:
+                if pubsub is not None:
+                    try:
+                        await pubsub.aclose()
+                    except Exception:
+                        pass
+
+    async def close(self):
+        if self._listener:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._listener = None
+        for ws in list(self.connections):
+            self.disconnect(ws)
 
 websocket_manager = WebSocketManager()
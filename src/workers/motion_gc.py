@@ -0,0 +1,32 @@
+"""
+Motion Result GC
+Deletes stored motion results that no motion points at any more (after
+MOTION_ARTIFACT_GC_GRACE) and stray files left by crashed workers. Safe
+to run while the API and workers are serving; run it periodically (Helm
+CronJob `motion-gc`):
+
+    python -m src.workers.motion_gc [--grace SECONDS]
+"""
+
+import argparse
+import asyncio
+import json
+
+from src.core.database import AsyncSessionLocal, engine
+from src.core.logging import setup_logging
+from src.services.motion_job_service import collect_garbage
+
+
+async def main(grace=None):
+    setup_logging()
+    try:
+        async with AsyncSessionLocal() as db:
+            print(json.dumps(await collect_garbage(db, grace)))
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--grace", type=int, default=None, help="seconds; default MOTION_ARTIFACT_GC_GRACE")
+    asyncio.run(main(parser.parse_args().grace))
@@ -0,0 +1,70 @@
+"""
+Motion Worker
+Runs motion generation jobs from the `jobs:motion` stream in its own
+process (and its own GPU pod), so jobs survive API restarts and scale on
+queue length instead of competing with HTTP handling. Up to
+MOTION_BATCH_SIZE compatible jobs share one diffusion call:
+
+    python -m src.workers.motion_worker
+"""
+
+import asyncio
+import logging
+import signal
+from typing import Dict, List
+
+from prometheus_client import start_http_server
+
+from src.core.cache import redis_client
+from src.core.config import settings
+from src.core.database import AsyncSessionLocal, engine
+from src.core.logging import setup_logging
+from src.core.queue import BatchJobWorker, Job
+from src.ml_serving.model_manager import model_manager
+from src.services.motion_job_service import MotionService, motion_queue
+
+logger = logging.getLogger(__name__)
+
+
+async def handle_batch(jobs: List[Job]) -> Dict[str, str]:
+    # One session per batch: nothing is shared with other batches or with requests
+    async with AsyncSessionLocal() as db:
+        return await MotionService(db).process_motion_batch(jobs)
+
+
+async def on_dead(job: Job, error: str):
+    async with AsyncSessionLocal() as db:
+        await MotionService(db).mark_failed(job.payload["motion_id"], error)
+
+
+async def main():
+    setup_logging()
+    await redis_client.initialize()
+    if redis_client.redis_client is None:
+        raise SystemExit("Motion worker needs Redis (REDIS_URL) for its job queue")
+    start_http_server(settings.WORKER_METRICS_PORT)
+    if settings.ENABLE_ML_MODELS:
+        await model_manager.initialize()
+
+    worker = BatchJobWorker(
+        motion_queue, handle_batch, on_dead,
+        batch_size=settings.MOTION_BATCH_SIZE,
+        # Jobs queued before batching carry no key and run alone
+        batch_key=lambda job: job.payload.get("batch_key") or job.id,
+        linger_ms=settings.MOTION_BATCH_WAIT_MS,
+    )
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, worker.stop)
+    try:
+        await worker.run()
+    finally:
+        if settings.ENABLE_ML_MODELS:
+            await model_manager.cleanup()
+        await redis_client.close()
+        await engine.dispose()
+        logger.info("Motion worker %s stopped", worker.name)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
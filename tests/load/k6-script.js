@@ -1,25 +1,195 @@
-// k6 load script - API smoke & stress
+// k6 mixed workload - authenticated API, uploads, transcription, motion jobs, WebSockets
+//
+// Local run against stub ML backends:
+//   python -m benchmarks.stub_server --port 8000 &
+//   k6 run -e PROFILE=load tests/load/k6-script.js
+//
+// Knobs (all via -e):
+//   BASE_URL, WS_URL        target (default http://localhost:8000, ws derived from it)
+//   PROFILE                 smoke | load | stress
+//   MIX                     flow weights, e.g. "browse=40,upload=10,transcribe=20,motion=20,ws=10"
+//   THINK_MIN, THINK_MAX    seconds between iterations (uniform)
+//   USERS, PASSWORD         number of load-test accounts (loadtest-<n>@example.com) and their password
+//   POLL_INTERVAL, POLL_MAX motion status polling
+//
+// Thresholds mirror infrastructure/monitoring/prometheus-rules/rebellis-slo.rules.yml:
+// API p95 < 300ms, Whisper and motion error rates < 5%.
 import http from 'k6/http';
-import { sleep, check } from 'k6';
+import ws from 'k6/ws';
+import { check, group, sleep } from 'k6';
+import { Counter, Trend } from 'k6/metrics';
 
-export let options = {
+const BASE = __ENV.BASE_URL || 'http://localhost:8000';
+const WS_BASE = __ENV.WS_URL || BASE.replace(/^http/, 'ws');
+const THINK_MIN = parseFloat(__ENV.THINK_MIN || '1');
+const THINK_MAX = parseFloat(__ENV.THINK_MAX || '3');
+const USERS = parseInt(__ENV.USERS || '20');
+const PASSWORD = __ENV.PASSWORD || 'LoadTest!2024';
+const POLL_INTERVAL = parseFloat(__ENV.POLL_INTERVAL || '1');
+const POLL_MAX = parseInt(__ENV.POLL_MAX || '30');
+
+function parseMix(spec) {
+  const mix = {};
+  spec.split(',').forEach((kv) => {
+    const [name, weight] = kv.split('=');
+    mix[name.trim()] = parseFloat(weight);
+  });
+  return mix;
+}
+const MIX = parseMix(__ENV.MIX || 'browse=40,upload=10,transcribe=20,motion=20,ws=10');
+
+const PROFILES = {
+  smoke: { executor: 'constant-vus', vus: 5, duration: '1m' },
+  load: { executor: 'ramping-vus', startVUs: 0, stages: [
+    { duration: '2m', target: 50 },
+    { duration: '5m', target: 50 },
+    { duration: '1m', target: 0 },
+  ]},
+  stress: { executor: 'ramping-vus', startVUs: 0, stages: [
+    { duration: '2m', target: 100 },
+    { duration: '3m', target: 200 },
+    { duration: '3m', target: 300 },
+    { duration: '2m', target: 0 },
+  ]},
+};
+
+export const options = {
+  scenarios: { mixed: PROFILES[__ENV.PROFILE || 'smoke'] },
   thresholds: {
-    http_req_duration: ['p(95)<300'],
-    http_req_failed: ['rate<0.01'],
+    'http_req_duration{service:api}': ['p(95)<300'],
+    'http_req_failed{service:whisper}': ['rate<0.05'],
+    'http_req_failed{service:motion}': ['rate<0.05'],
+    'http_req_failed{service:api}': ['rate<0.01'],
+    checks: ['rate>0.95'],
   },
-  scenarios: {
-    smoke: { executor: 'constant-vus', vus: 5, duration: '1m' },
-    stress: { executor: 'ramping-vus', startVUs: 10, stages: [
-      { duration: '2m', target: 50 },
-      { duration: '3m', target: 0 },
-    ]}
-  }
 };
 
-const BASE = __ENV.BASE_URL || 'http://localhost:8000';
+const motionTurnaround = new Trend('motion_job_turnaround', true);
+const motionTimeouts = new Counter('motion_job_timeouts');
+const wsMessages = new Counter('ws_messages_received');
+
+// Mono 16-bit 16 kHz WAVs: ~0.5 s, ~8 s and ~60 s of audio
+function wav(bytes) {
+  const buf = new ArrayBuffer(44 + bytes);
+  const v = new DataView(buf);
+  const str = (o, s) => { for (let i = 0; i < s.length; i++) v.setUint8(o + i, s.charCodeAt(i)); };
+  str(0, 'RIFF'); v.setUint32(4, 36 + bytes, true); str(8, 'WAVE');
+  str(12, 'fmt '); v.setUint32(16, 16, true); v.setUint16(20, 1, true); v.setUint16(22, 1, true);
+  v.setUint32(24, 16000, true); v.setUint32(28, 32000, true); v.setUint16(32, 2, true); v.setUint16(34, 16, true);
+  str(36, 'data'); v.setUint32(40, bytes, true);
+  return buf;
+}
+const CLIPS = [
+  { name: 'short.wav', data: wav(16 * 1024) },
+  { name: 'medium.wav', data: wav(256 * 1024) },
+  { name: 'long.wav', data: wav(2 * 1024 * 1024) },
+];
+const CLIP_WEIGHTS = [0.6, 0.3, 0.1];
+
+function pick(weights) {
+  const total = weights.reduce((a, b) => a + b, 0);
+  let r = Math.random() * total;
+  for (let i = 0; i < weights.length; i++) {
+    r -= weights[i];
+    if (r <= 0) return i;
+  }
+  return weights.length - 1;
+}
+
+function clip() {
+  return CLIPS[pick(CLIP_WEIGHTS)];
+}
+
+function think() {
+  sleep(THINK_MIN + Math.random() * (THINK_MAX - THINK_MIN));
+}
+
+export function setup() {
+  const tokens = [];
+  for (let i = 0; i < USERS; i++) {
+    const email = `loadtest-${i}@example.com`;
+    http.post(`${BASE}/api/v1/auth/register`, JSON.stringify({ email, password: PASSWORD, full_name: `Load ${i}` }),
+      { headers: { 'Content-Type': 'application/json' }, tags: { service: 'setup' } });
+    const res = http.post(`${BASE}/api/v1/auth/login`, JSON.stringify({ email, password: PASSWORD }),
+      { headers: { 'Content-Type': 'application/json' }, tags: { service: 'setup' } });
+    if (res.status === 200) tokens.push(res.json('access_token'));
+  }
+  if (tokens.length === 0) throw new Error('no load-test user could log in');
+  return { tokens };
+}
+
+function authHeaders(data) {
+  return { Authorization: `Bearer ${data.tokens[(__VU - 1) % data.tokens.length]}` };
+}
+
+function browse(headers) {
+  group('browse', () => {
+    const me = http.get(`${BASE}/api/v1/auth/me`, { headers, tags: { service: 'api', name: 'auth:me' } });
+    check(me, { 'me 200': (r) => r.status === 200 });
+    const list = http.get(`${BASE}/api/v1/projects/`, { headers, tags: { service: 'api', name: 'projects:list' } });
+    check(list, { 'projects 200': (r) => r.status === 200 });
+  });
+}
+
+function upload(headers) {
+  group('upload', () => {
+    const c = clip();
+    const res = http.post(`${BASE}/api/v1/upload/audio`, { file: http.file(c.data, c.name, 'audio/wav') },
+      { headers, tags: { service: 'api', name: `upload:${c.name}` } });
+    check(res, { 'upload 200': (r) => r.status === 200 });
+  });
+}
+
+function transcribe(headers) {
+  group('transcribe', () => {
+    const c = clip();
+    const res = http.post(`${BASE}/api/v1/transcribe/transcribe`, { file: http.file(c.data, c.name, 'audio/wav') },
+      { headers, tags: { service: 'whisper', name: `transcribe:${c.name}` }, timeout: '120s' });
+    check(res, { 'transcribe 200': (r) => r.status === 200 });
+  });
+}
+
+function motion(headers) {
+  group('motion', () => {
+    const created = http.post(`${BASE}/api/v1/motion/generate`,
+      JSON.stringify({ audio_path: 'samples/short.wav', parameters: { seed: Math.floor(Math.random() * 1000) } }),
+      { headers: Object.assign({ 'Content-Type': 'application/json' }, headers), tags: { service: 'motion', name: 'motion:create' } });
+    if (!check(created, { 'motion created': (r) => r.status === 200 || r.status === 202 })) return;
+    const id = created.json('id');
+    const start = Date.now();
+    for (let i = 0; i < POLL_MAX; i++) {
+      sleep(POLL_INTERVAL);
+      const res = http.get(`${BASE}/api/v1/motion/${id}`, { headers, tags: { service: 'api', name: 'motion:status' } });
+      const status = res.status === 200 ? res.json('status') : null;
+      if (status === 'completed' || status === 'failed') {
+        check(res, { 'motion completed': () => status === 'completed' });
+        motionTurnaround.add(Date.now() - start);
+        return;
+      }
+    }
+    motionTimeouts.add(1);
+  });
+}
+
+function websocket(headers) {
+  group('websocket', () => {
+    const res = ws.connect(`${WS_BASE}/ws/stream`, { headers, tags: { service: 'ws' } }, (socket) => {
+      socket.on('open', () => {
+        socket.setInterval(() => socket.send(JSON.stringify({ type: 'echo', data: 'ping' })), 1000);
+        socket.setTimeout(() => socket.close(), 10000);
+      });
+      socket.on('message', () => wsMessages.add(1));
+    });
+    check(res, { 'ws upgraded': (r) => r && r.status === 101 });
+  });
+}
+
+const FLOWS = { browse, upload, transcribe, motion, ws: websocket };
+const FLOW_NAMES = Object.keys(MIX).filter((k) => FLOWS[k]);
+const FLOW_WEIGHTS = FLOW_NAMES.map((k) => MIX[k]);
 
-export default function () {
-  let res = http.get(`${BASE}/health`);
-  check(res, { 'status 200': (r) => r.status === 200 });
-  sleep(0.2);
+export default function (data) {
+  const headers = authHeaders(data);
+  FLOWS[FLOW_NAMES[pick(FLOW_WEIGHTS)]](headers);
+  think();
 }
@@ -0,0 +1,178 @@
+"""
+Locust mixed workload, the Python twin of tests/load/k6-script.js.
+
+Flows: browse (auth/me + project list), multipart audio upload in three
+sizes, transcription, motion job creation with status polling, and
+WebSocket echo sessions. Every simulated user logs in once with a JWT.
+
+    python -m benchmarks.stub_server --port 8000 &
+    MIX="browse=40,upload=10,transcribe=20,motion=20,ws=10" THINK_MIN=1 THINK_MAX=3 \\
+        locust -f tests/load/locustfile.py --headless -u 50 -r 10 -t 5m -H http://localhost:8000 \\
+        --csv results/locust
+
+Environment knobs: MIX, THINK_MIN, THINK_MAX, USERS, PASSWORD, POLL_INTERVAL,
+POLL_MAX (same meaning as in the k6 script). WebSocket sessions need the
+websocket-client package and are skipped without it.
+
+At the end of a run, the process exits with code 1 when the SLOs from
+rebellis-slo.rules.yml are breached: API p95 >= 300 ms, or a Whisper or
+motion error rate >= 5%.
+"""
+
+import io
+import itertools
+import os
+import random
+import time
+import wave
+
+from locust import HttpUser, events, task
+from locust.stats import StatsEntry
+
+try:
+    import websocket
+except ImportError:
+    websocket = None
+
+THINK_MIN = float(os.getenv("THINK_MIN", "1"))
+THINK_MAX = float(os.getenv("THINK_MAX", "3"))
+USERS = int(os.getenv("USERS", "20"))
+PASSWORD = os.getenv("PASSWORD", "LoadTest!2024")
+POLL_INTERVAL = float(os.getenv("POLL_INTERVAL", "1"))
+POLL_MAX = int(os.getenv("POLL_MAX", "30"))
+
+
+def _parse_mix(spec: str) -> dict:
+    mix = {}
+    for part in spec.split(","):
+        name, weight = part.split("=")
+        mix[name.strip()] = float(weight)
+    return mix
+
+
+MIX = _parse_mix(os.getenv("MIX", "browse=40,upload=10,transcribe=20,motion=20,ws=10"))
+
+
+def _wav(seconds: float, rate: int = 16000) -> bytes:
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(b"\x00\x00" * int(seconds * rate))
+    return buf.getvalue()
+
+
+# ~0.5 s, ~8 s and ~60 s of 16 kHz mono, weighted towards short clips
+CLIPS = [("short.wav", _wav(0.5)), ("medium.wav", _wav(8)), ("long.wav", _wav(60))]
+CLIP_WEIGHTS = [0.6, 0.3, 0.1]
+
+_account = itertools.count()
+
+# Services whose error rate gates the run, keyed by request-name prefix
+SERVICE_PREFIX = {"transcribe": "whisper", "motion:create": "motion"}
+
+
+class ApiUser(HttpUser):
+    def wait_time(self):
+        return random.uniform(THINK_MIN, THINK_MAX)
+
+    def on_start(self):
+        email = f"loadtest-{next(_account) % USERS}@example.com"
+        self.client.post("/api/v1/auth/register", json={"email": email, "password": PASSWORD, "full_name": email},
+                         name="setup:register")
+        r = self.client.post("/api/v1/auth/login", json={"email": email, "password": PASSWORD}, name="auth:login")
+        if r.status_code == 200:
+            self.token = r.json()["access_token"]
+            self.client.headers["Authorization"] = f"Bearer {self.token}"
+        else:
+            self.token = None
+
+    def _clip(self):
+        return random.choices(CLIPS, CLIP_WEIGHTS)[0]
+
+    @task(int(MIX.get("browse", 0)))
+    def browse(self):
+        self.client.get("/api/v1/auth/me", name="auth:me")
+        self.client.get("/api/v1/projects/", name="projects:list")
+
+    @task(int(MIX.get("upload", 0)))
+    def upload(self):
+        name, data = self._clip()
+        self.client.post("/api/v1/upload/audio", files={"file": (name, data, "audio/wav")}, name=f"upload:{name}")
+
+    @task(int(MIX.get("transcribe", 0)))
+    def transcribe(self):
+        name, data = self._clip()
+        self.client.post("/api/v1/transcribe/transcribe", files={"file": (name, data, "audio/wav")},
+                         name=f"transcribe:{name}", timeout=120)
+
+    @task(int(MIX.get("motion", 0)))
+    def motion(self):
+        r = self.client.post("/api/v1/motion/generate", name="motion:create",
+                             json={"audio_path": "samples/short.wav", "parameters": {"seed": random.randrange(1000)}})
+        if r.status_code not in (200, 202):
+            return
+        job_id = r.json()["id"]
+        start = time.perf_counter()
+        for _ in range(POLL_MAX):
+            time.sleep(POLL_INTERVAL)
+            s = self.client.get(f"/api/v1/motion/{job_id}", name="motion:status")
+            status = s.json().get("status") if s.status_code == 200 else None
+            if status in ("completed", "failed"):
+                events.request.fire(request_type="JOB", name="motion:turnaround",
+                                    response_time=(time.perf_counter() - start) * 1000, response_length=0,
+                                    exception=None if status == "completed" else RuntimeError("motion job failed"),
+                                    context={})
+                return
+        events.request.fire(request_type="JOB", name="motion:turnaround", response_time=(time.perf_counter() - start) * 1000,
+                            response_length=0, exception=TimeoutError("motion job did not finish"), context={})
+
+    @task(int(MIX.get("ws", 0)))
+    def ws_session(self):
+        if websocket is None:
+            return
+        url = self.host.replace("http", "ws", 1) + "/ws/stream"
+        start = time.perf_counter()
+        try:
+            conn = websocket.create_connection(url, header=[f"Authorization: Bearer {self.token}"], timeout=10)
+        except Exception as e:
+            events.request.fire(request_type="WS", name="ws:connect", response_time=(time.perf_counter() - start) * 1000,
+                                response_length=0, exception=e, context={})
+            return
+        events.request.fire(request_type="WS", name="ws:connect", response_time=(time.perf_counter() - start) * 1000,
+                            response_length=0, exception=None, context={})
+        try:
+            for _ in range(10):
+                t0 = time.perf_counter()
+                conn.send('{"type": "echo", "data": "ping"}')
+                reply = conn.recv()
+                events.request.fire(request_type="WS", name="ws:echo", response_time=(time.perf_counter() - t0) * 1000,
+                                    response_length=len(reply), exception=None, context={})
+                time.sleep(1)
+        except Exception as e:
+            events.request.fire(request_type="WS", name="ws:echo", response_time=0, response_length=0, exception=e, context={})
+        finally:
+            conn.close()
+
+
+@events.quitting.add_listener
+def enforce_slo(environment, **kwargs):
+    stats = environment.stats
+    failures = []
+    api = StatsEntry(stats, "api", "")
+    for e in stats.entries.values():
+        if e.method in ("GET", "POST") and not e.name.startswith(("setup:", *SERVICE_PREFIX)):
+            api.extend(e)
+    if api.num_requests and api.get_response_time_percentile(0.95) >= 300:
+        failures.append(f"API p95 {api.get_response_time_percentile(0.95):.0f}ms >= 300ms")
+    for prefix, service in SERVICE_PREFIX.items():
+        entries = [e for e in stats.entries.values() if e.name.startswith(prefix)]
+        total = sum(e.num_requests for e in entries)
+        failed = sum(e.num_failures for e in entries)
+        if total and failed / total >= 0.05:
+            failures.append(f"{service} error rate {100 * failed / total:.1f}% >= 5%")
+    for msg in failures:
+        print(f"SLO breach: {msg}")
+    if failures:
+        environment.process_exit_code = 1
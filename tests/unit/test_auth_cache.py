@@ -0,0 +1,133 @@
+import time
+import fakeredis, pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from src.core import security
+from src.core.cache import RedisCache
+from src.core.security import TokenCache, create_token, verify_token
+from src.models.user import User
+from src.services import auth_service
+from src.services.auth_service import AuthService
+
+def test_verified_token_skips_signature_check(monkeypatch):
+    security.token_cache.clear()
+    tok = create_token({"sub": "7"})
+    calls = []
+    real = security.decode_token
+    monkeypatch.setattr(security, "decode_token", lambda t: calls.append(t) or real(t))
+    assert verify_token(tok)["sub"] == "7"
+    assert verify_token(tok)["sub"] == "7"
+    assert len(calls) == 1
+
+def test_cached_claims_expire_at_exp():
+    cache = TokenCache(10)
+    cache.put(b"k", {"sub": "1", "exp": 1000})
+    assert cache.get(b"k", now=999.0) == {"sub": "1", "exp": 1000}
+    assert cache.get(b"k", now=1000.0) is None
+    assert len(cache) == 0
+
+def test_cache_is_bounded_and_skips_tokens_without_exp():
+    cache = TokenCache(2)
+    for i in range(5):
+        cache.put(bytes([i]), {"exp": time.time() + 60})
+    cache.put(b"noexp", {"sub": "x"})
+    assert len(cache) == 2 and cache.get(b"noexp") is None
+
+def test_invalid_token_still_rejected():
+    with pytest.raises(ValueError):
+        verify_token("not-a-jwt")
+
+@pytest.mark.asyncio
+async def test_user_record_cached_until_invalidated(monkeypatch):
+    cache = RedisCache()
+    cache.redis_client = fakeredis.FakeAsyncRedis()
+    monkeypatch.setattr(auth_service, "redis_client", cache)
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(User.__table__.create)
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        svc = AuthService(db)
+        user = User(email="a@example.com", hashed_password="x", full_name="A", is_active=True, is_admin=False)
+        db.add(user)
+        await db.flush()
+        first = await svc.get_cached_user(user.id)
+        queries = []
+        monkeypatch.setattr(svc, "get_user_by_id", lambda uid: queries.append(uid))
+        assert (await svc.get_cached_user(user.id)).email == "a@example.com"
+        assert queries == []
+        monkeypatch.undo()
+        monkeypatch.setattr(auth_service, "redis_client", cache)
+        await svc.update_user(user, is_active=False)
+        assert first.is_active and not (await svc.get_cached_user(user.id)).is_active
+    await engine.dispose()
+
+@pytest.mark.asyncio
+async def test_legacy_sha256_password_upgraded_on_login(monkeypatch):
+    import hashlib
+    from src.core.config import settings
+    monkeypatch.setattr(settings, "PASSWORD_HASH_ROUNDS", 4)
+    cache = RedisCache()
+    cache.redis_client = fakeredis.FakeAsyncRedis()
+    monkeypatch.setattr(auth_service, "redis_client", cache)
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(User.__table__.create)
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        svc = AuthService(db)
+        db.add(User(email="old@example.com", hashed_password=hashlib.sha256(b"secret").hexdigest(), full_name="Old"))
+        await db.flush()
+        assert await svc.authenticate_user("old@example.com", "wrong") is None
+        user = await svc.authenticate_user("old@example.com", "secret")
+        assert user.hashed_password.startswith("$2")
+        assert await svc.authenticate_user("old@example.com", "secret") is not None
+    await engine.dispose()
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("legacy", [False, True])
+async def test_password_longer_than_72_bytes_registers_and_logs_in(monkeypatch, legacy):
+    import hashlib
+    from src.api.schemas.auth import UserCreate
+    from src.core.config import settings
+    monkeypatch.setattr(settings, "PASSWORD_HASH_ROUNDS", 4)
+    cache = RedisCache()
+    cache.redis_client = fakeredis.FakeAsyncRedis()
+    monkeypatch.setattr(auth_service, "redis_client", cache)
+    password = "correct horse battery staple " * 4
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(User.__table__.create)
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        svc = AuthService(db)
+        if legacy:
+            db.add(User(email="long@example.com", hashed_password=hashlib.sha256(password.encode()).hexdigest(), full_name="Long"))
+            await db.flush()
+        else:
+            await svc.create_user(UserCreate(email="long@example.com", password=password, full_name="Long"))
+        assert await svc.authenticate_user("long@example.com", password[:72]) is None
+        user = await svc.authenticate_user("long@example.com", password)
+        assert user is not None and user.hashed_password.startswith("$2")
+        assert await svc.authenticate_user("long@example.com", password) is not None
+    await engine.dispose()
+
+@pytest.mark.asyncio
+async def test_read_racing_an_update_does_not_recache_the_old_row(monkeypatch, tmp_path):
+    cache = RedisCache()
+    cache.redis_client = fakeredis.FakeAsyncRedis()
+    monkeypatch.setattr(auth_service, "redis_client", cache)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/users.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(User.__table__.create)
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        user = User(email="a@example.com", hashed_password="x", full_name="A", is_active=True, is_admin=False)
+        db.add(user)
+        await db.commit()
+        real_commit = db.commit
+        async def commit():
+            # Another request authenticates this user while the change is uncommitted
+            async with AsyncSession(engine) as other:
+                assert (await AuthService(other).get_cached_user(user.id)).is_active
+            await real_commit()
+        monkeypatch.setattr(db, "commit", commit)
+        await AuthService(db).update_user(user, is_active=False)
+    async with AsyncSession(engine) as db:
+        assert not (await AuthService(db).get_cached_user(user.id)).is_active
+    await engine.dispose()
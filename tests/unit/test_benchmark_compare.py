@@ -0,0 +1,22 @@
+from benchmarks.performance_suite import compare
+
+def _result(p99: float, rps: float, error_rate: float = 0.0):
+    stats = {"p50_ms": 10.0, "p95_ms": 20.0, "p99_ms": p99, "rps": rps, "error_rate": error_rate}
+    return {"latency": {"health@c1": dict(stats)}, "throughput": {"levels": {"mixed@c8": dict(stats)}}}
+
+def test_within_thresholds_passes():
+    assert compare(_result(31.0, 95.0), _result(30.0, 100.0)) == []
+
+def test_latency_and_throughput_regressions_reported():
+    metrics = {r["metric"] for r in compare(_result(60.0, 50.0), _result(30.0, 100.0))}
+    assert "latency/health@c1:p99_ms" in metrics
+    assert "throughput/mixed@c8:p99_ms" in metrics
+    assert "throughput/mixed@c8:rps" in metrics
+
+def test_small_absolute_latency_changes_ignored():
+    base = _result(0.5, 100.0)
+    assert compare(_result(1.0, 100.0), base, min_delta_ms=2.0) == []
+
+def test_new_errors_are_regressions():
+    regressions = compare(_result(30.0, 100.0, error_rate=0.01), _result(30.0, 100.0))
+    assert any(r["metric"].endswith(":error_rate") for r in regressions)
@@ -0,0 +1,79 @@
+import pytest, pytest_asyncio
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from src.api.dependencies import get_current_active_user, get_db
+from src.api.routers import projects
+from src.models.project import Project
+from src.models.task import Task
+from src.models.user import User
+from src.services.auth_service import UserSnapshot
+
+@pytest_asyncio.fixture
+async def client():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        for model in (User, Project, Task):
+            await conn.run_sync(model.__table__.create)
+        await conn.execute(insert(Project), [{"id": 1, "name": "mine", "owner_id": 1}, {"id": 2, "name": "theirs", "owner_id": 2}])
+        await conn.execute(insert(Task), [{"id": 1, "title": "t", "project_id": 1}, {"id": 2, "title": "u", "project_id": 2}])
+    app = FastAPI()
+    app.include_router(projects.router, prefix="/api/v1/projects")
+
+    async def db():
+        async with AsyncSession(engine) as s:
+            yield s
+
+    app.dependency_overrides[get_db] = db
+    app.dependency_overrides[get_current_active_user] = lambda: UserSnapshot(1, "a@example.com", "A", True, False)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
+        c.engine = engine
+        yield c
+    await engine.dispose()
+
+async def _count(engine, model, *where):
+    async with AsyncSession(engine) as s:
+        return await s.scalar(select(func.count()).select_from(model).where(*where))
+
+@pytest.mark.asyncio
+async def test_bulk_projects_apply_and_report_per_item(client):
+    r = await client.post("/api/v1/projects/bulk", json={
+        "create": [{"name": f"n{i}"} for i in range(3)],
+        "update": [{"id": 1, "description": "d"}, {"id": 2, "name": "hijack"}, {"id": 1, "name": "again"}],
+        "delete": [99],
+    })
+    body = r.json()
+    assert r.status_code == 200
+    assert [p["name"] for p in body["created"]] == ["n0", "n1", "n2"] and all(p["owner_id"] == 1 for p in body["created"])
+    assert body["updated"] == [1] and body["deleted"] == []
+    assert {(e["op"], e["index"], e["detail"]) for e in body["errors"]} == {
+        ("update", 1, "Not found"), ("update", 2, "Duplicate id in request"), ("delete", 0, "Not found"),
+    }
+    assert await _count(client.engine, Project, Project.owner_id == 1) == 4
+    assert await _count(client.engine, Project, Project.name == "hijack") == 0
+
+@pytest.mark.asyncio
+async def test_atomic_bulk_rolls_back_on_any_error(client):
+    r = await client.post("/api/v1/projects/bulk", json={"create": [{"name": "x"}], "delete": [2], "atomic": True})
+    assert r.status_code == 409 and r.json()["detail"][0]["id"] == 2
+    assert await _count(client.engine, Project) == 2
+
+@pytest.mark.asyncio
+async def test_bulk_tasks_respect_project_ownership(client):
+    r = await client.post("/api/v1/projects/tasks/bulk", json={
+        "create": [{"project_id": 1, "title": "a"}, {"project_id": 2, "title": "b"}],
+        "update": [{"id": 1, "status": "done"}, {"id": 2, "status": "done"}],
+    })
+    body = r.json()
+    assert [t["title"] for t in body["created"]] == ["a"] and body["updated"] == [1]
+    assert {(e["op"], e["index"]) for e in body["errors"]} == {("create", 1), ("update", 1)}
+    r = await client.post("/api/v1/projects/bulk", json={"delete": [1]})
+    assert r.json()["deleted"] == [1]
+    assert await _count(client.engine, Task, Task.project_id.is_(None)) == 2
+
+@pytest.mark.asyncio
+async def test_oversized_bulk_is_rejected(client, monkeypatch):
+    monkeypatch.setattr(projects.settings, "API_BULK_MAX_ITEMS", 2)
+    r = await client.post("/api/v1/projects/bulk", json={"create": [{"name": "x"}] * 3})
+    assert r.status_code == 413
@@ -0,0 +1,20 @@
+import json
+from src.core.cache import CODEC_HEADERS, decode_payload, encode_value
+
+PAYLOAD = {"segments": [{"id": i, "start": i, "end": i + 1, "text": "hello world"} for i in range(200)]}
+
+def test_large_values_are_compressed_with_header():
+    raw, stored, codec = encode_value(PAYLOAD, "zlib", min_bytes=1024)
+    assert codec == "zlib"
+    assert stored[:1] == CODEC_HEADERS["zlib"]
+    assert len(stored) < len(raw)
+    assert json.loads(decode_payload(stored)) == PAYLOAD
+
+def test_small_values_stay_plain_json():
+    raw, stored, codec = encode_value({"status": "done"}, "zlib", min_bytes=1024)
+    assert codec == "none"
+    assert stored == raw
+    assert json.loads(decode_payload(stored)) == {"status": "done"}
+
+def test_legacy_uncompressed_entries_still_decode():
+    assert json.loads(decode_payload(b'{"x": 1}')) == {"x": 1}
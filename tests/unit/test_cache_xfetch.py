@@ -0,0 +1,80 @@
+import asyncio, time
+import fakeredis, pytest
+from src.core.cache import RedisCache, should_refresh
+from src.core.config import settings
+
+def test_fresh_entry_not_refreshed_far_from_expiry():
+    assert not should_refresh(expires_at=1000.0, delta=0.5, beta=1.0, now=900.0, rand=0.5)
+
+def test_expired_entry_always_refreshed():
+    assert should_refresh(expires_at=1000.0, delta=0.5, beta=1.0, now=1000.0, rand=0.99)
+
+def test_expensive_entries_refresh_earlier():
+    # same clock and draw: only the slow-to-compute value triggers early refresh
+    assert not should_refresh(expires_at=1000.0, delta=0.1, beta=1.0, now=995.0, rand=0.1)
+    assert should_refresh(expires_at=1000.0, delta=10.0, beta=1.0, now=995.0, rand=0.1)
+
+def test_beta_zero_disables_early_refresh():
+    assert not should_refresh(expires_at=1000.0, delta=10.0, beta=0.0, now=999.0, rand=0.001)
+
+def _cache(redis):
+    cache = RedisCache()
+    cache.redis_client = redis
+    return cache
+
+@pytest.mark.asyncio
+async def test_stale_value_served_while_one_caller_recomputes():
+    cache = _cache(fakeredis.FakeAsyncRedis())
+    await cache.set("report:1", {"v": "old", "d": 0.0, "e": time.time() - 1}, ttl=60)
+    release, calls = asyncio.Event(), []
+    async def compute():
+        calls.append(1)
+        await release.wait()
+        return "new"
+    assert await asyncio.gather(*(cache.get_or_compute("report:1", compute, ttl=60) for _ in range(5))) == ["old"] * 5
+    await asyncio.sleep(0)
+    assert len(calls) == 1
+    release.set()
+    await cache._inflight["report:1"]
+    assert await cache.get_or_compute("report:1", compute, ttl=60) == "new" and len(calls) == 1
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_compute_once_across_pods():
+    redis = fakeredis.FakeAsyncRedis()
+    pods, calls = (_cache(redis), _cache(redis)), []
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"rows": 3}
+    results = await asyncio.gather(*(pods[i % 2].get_or_compute("report:2", compute, ttl=60) for i in range(20)))
+    assert results == [{"rows": 3}] * 20 and len(calls) == 1
+
+@pytest.mark.asyncio
+async def test_lock_released_only_by_its_owner():
+    redis = fakeredis.FakeAsyncRedis()
+    cache = _cache(redis)
+    async def compute():
+        assert await redis.get("lock:report:3") is not None
+        return 1
+    assert await cache.get_or_compute("report:3", compute, ttl=60) == 1
+    assert await redis.get("lock:report:3") is None
+    # A pod whose lock expired must not delete the one a peer took since
+    await redis.set("lock:report:3", "peer")
+    await cache._release_lock("report:3", "mine")
+    assert await redis.get("lock:report:3") == b"peer"
+
+@pytest.mark.asyncio
+async def test_waiting_for_a_silent_peer_times_out(monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_LOCK_TIMEOUT", 0.3)
+    redis = fakeredis.FakeAsyncRedis()
+    cache = _cache(redis)
+    # A peer holds the lock but never writes the value
+    await redis.set("lock:report:4", "peer")
+    start = time.monotonic()
+    assert await cache._wait_for_peer("report:4") is None
+    assert 0.3 <= time.monotonic() - start < 1.0
+    async def compute():
+        return "mine"
+    # The waiter falls back to computing it itself, leaving the peer's lock alone
+    assert await cache.get_or_compute("report:4", compute, ttl=60) == "mine"
+    assert await redis.get("lock:report:4") == b"peer"
@@ -0,0 +1,60 @@
+import logging
+import pytest
+from sqlalchemy import exc, text
+from src.core import database
+from src.core.config import settings
+from src.core.database import InstrumentedPool, create_engine
+from src.core.metrics import metrics
+
+def _sample(name, **labels):
+    return metrics.registry.get_sample_value(name, labels) or 0.0
+
+def test_postgres_engine_uses_pool_settings(monkeypatch):
+    seen = {}
+    real = database.create_async_engine
+    monkeypatch.setattr(database, "create_async_engine", lambda url, **kw: seen.update(kw) or real(url, **kw))
+    engine = create_engine("postgresql+asyncpg://u:p@db.invalid/app", name="cfg")
+    pool = engine.pool
+    assert isinstance(pool, InstrumentedPool) and pool.engine_name == "cfg"
+    assert pool.size() == settings.DATABASE_POOL_SIZE
+    assert pool._max_overflow == settings.DATABASE_MAX_OVERFLOW
+    assert pool._timeout == settings.DATABASE_POOL_TIMEOUT and pool._recycle == settings.DATABASE_POOL_RECYCLE
+    assert seen["connect_args"] == {"prepared_statement_cache_size": settings.DATABASE_STATEMENT_CACHE_SIZE}
+
+def test_statement_cache_off_for_pgbouncer(monkeypatch):
+    monkeypatch.setattr(settings, "DATABASE_STATEMENT_CACHE_SIZE", 0)
+    seen = {}
+    monkeypatch.setattr(database, "create_async_engine", lambda url, **kw: seen.update(kw))
+    monkeypatch.setattr(database, "_instrument_queries", lambda *a: None)
+    create_engine("postgresql+asyncpg://u:p@db.invalid/app")
+    assert seen["connect_args"] == {"prepared_statement_cache_size": 0, "statement_cache_size": 0}
+
+@pytest.mark.asyncio
+async def test_pool_checkout_metrics_and_timeout(tmp_path):
+    engine = create_engine(f"sqlite+aiosqlite:///{tmp_path}/db.sqlite", name="t1", poolclass=InstrumentedPool,
+                           pool_size=1, max_overflow=0, pool_timeout=0.1, pool_logging_name="t1")
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+        assert _sample("db_pool_checked_out", engine="t1") == 1
+        with pytest.raises(exc.TimeoutError):
+            async with engine.connect():
+                pass
+    assert _sample("db_pool_checked_out", engine="t1") == 0
+    assert _sample("db_pool_timeouts_total", engine="t1") == 1
+    assert _sample("db_pool_checkout_seconds_count", engine="t1") >= 1
+    await engine.dispose()
+
+@pytest.mark.asyncio
+async def test_slow_queries_logged_without_parameters(tmp_path, monkeypatch, caplog):
+    monkeypatch.setattr(settings, "DATABASE_SLOW_QUERY_MS", 1)
+    engine = create_engine(f"sqlite+aiosqlite:///{tmp_path}/db.sqlite", name="t2")
+    with caplog.at_level(logging.WARNING, logger="src.core.database"):
+        async with engine.connect() as conn:
+            await conn.execute(text("CREATE TABLE t (x TEXT)"))
+            await conn.execute(text("INSERT INTO t VALUES (:x)"), {"x": "secret@example.com"})
+            await conn.execute(text("WITH RECURSIVE c(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM c WHERE n < 200000) SELECT count(*) FROM c"))
+    assert _sample("db_query_duration_seconds_count", engine="t2", operation="INSERT") == 1
+    assert _sample("db_slow_queries_total", engine="t2", operation="WITH") == 1
+    assert any("WITH RECURSIVE" in r.getMessage() for r in caplog.records)
+    assert not any("secret@example.com" in r.getMessage() for r in caplog.records)
+    await engine.dispose()
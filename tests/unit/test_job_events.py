@@ -0,0 +1,103 @@
+import asyncio, json
+import fakeredis, pytest, pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from src.core.job_events import JobEventBus
+from src.core.queue import JobQueue
+from src.models.motion import Motion, MotionArtifact
+from src.models.project import Project
+from src.models.user import User
+from src.services import motion_job_service
+from src.services.motion_job_service import MotionService
+from src.utils.websocket_manager import WebSocketManager, job_topic
+
+class FakeSocket:
+    def __init__(self):
+        self.sent = []
+    async def accept(self):
+        pass
+    async def send_text(self, text):
+        self.sent.append(json.loads(text))
+
+class RecordingBus:
+    def __init__(self):
+        self.events = []
+    async def publish(self, kind, job_id, user_id, status, progress=None, **extra):
+        self.events.append((job_id, status, progress))
+
+@pytest.mark.asyncio
+async def test_events_reach_sockets_of_the_job_owner_only():
+    bus = JobEventBus("test:events", redis=fakeredis.FakeAsyncRedis())
+    manager = WebSocketManager()
+    owner, watcher, stranger = FakeSocket(), FakeSocket(), FakeSocket()
+    await manager.connect(owner, user_id=1)
+    await manager.connect(watcher, user_id=1)
+    await manager.connect(stranger, user_id=2)
+    # Following someone else's job id does not leak its events
+    manager.subscribe(stranger, job_topic("m1"))
+    manager.subscribe(watcher, job_topic("m1"))
+    bus.start(manager.dispatch_job_event)
+    await asyncio.sleep(0.05)
+    await bus.publish("motion", "m1", 1, "processing", 10)
+    for _ in range(100):
+        if owner.sent and watcher.sent:
+            break
+        await asyncio.sleep(0.01)
+    await bus.close()
+    assert [(e["job_id"], e["status"], e["progress"]) for e in owner.sent] == [("m1", "processing", 10)]
+    assert len(watcher.sent) == 1 and stranger.sent == []
+    manager.disconnect(watcher)
+    manager.disconnect(stranger)
+    assert {t: {c.ws for c in conns} for t, conns in manager.topics.items()} == {"user:1": {owner}}
+    await manager.close()
+
+@pytest_asyncio.fixture
+async def db_engine(tmp_path, monkeypatch):
+    monkeypatch.setattr(motion_job_service.settings, "OUTPUT_DIR", tmp_path / "out")
+    monkeypatch.setattr(motion_job_service.settings, "LOCAL_STORAGE_PATH", tmp_path)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/app.db")
+    async with engine.begin() as conn:
+        for model in (User, Project, Motion, MotionArtifact):
+            await conn.run_sync(model.__table__.create)
+    yield engine
+    await engine.dispose()
+
+@pytest.mark.asyncio
+async def test_motion_lifecycle_is_published(db_engine, tmp_path):
+    class Models:
+        async def predict(self, name, data, item_parameters, **shared):
+            return ["HIERARCHY"] * len(data)
+    audio = tmp_path / "a.wav"
+    audio.write_bytes(b"RIFF")
+    queue, bus = JobQueue("test", redis=fakeredis.FakeAsyncRedis()), RecordingBus()
+    await queue.ensure_group()
+    async with AsyncSession(db_engine, expire_on_commit=False) as db:
+        m = await MotionService(db, queue, events=bus).generate_motion(str(audio), user_id=1)
+        lost = await MotionService(db, queue, events=bus).generate_motion(str(tmp_path / "missing.wav"), user_id=1)
+    jobs = await queue.consume("w1", count=2, block_ms=10)
+    async with AsyncSession(db_engine) as db:
+        svc = MotionService(db, queue, Models(), events=bus)
+        await svc.process_motion_batch(jobs)
+        await svc.mark_failed(lost.id, "Cannot read audio")
+    assert [(s, p) for job_id, s, p in bus.events if job_id == m.id] == [
+        ("pending", None), ("processing", 0), ("processing", 10), ("processing", 90), ("completed", 100),
+    ]
+    assert [(s, p) for job_id, s, p in bus.events if job_id == lost.id] == [("pending", None), ("processing", 0), ("error", None)]
+
+def test_non_object_messages_get_an_error_reply():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from src.api.routers import websocket
+    from src.core.security import create_access_token
+    app = FastAPI()
+    app.include_router(websocket.router)
+    client = TestClient(app)
+    with client.websocket_connect(f"/jobs?token={create_access_token({'sub': '1'})}") as ws:
+        for raw in ("5", "[]", '"x"', "null"):
+            ws.send_text(raw)
+            assert ws.receive_json() == {"type": "error", "detail": "Unknown message type"}
+        # Still open: the next command is answered
+        ws.send_text('{"type": "ping"}')
+        assert ws.receive_json() == {"type": "pong"}
+    with client.websocket_connect("/stream") as ws:
+        ws.send_text("[]")
+        assert ws.receive_json() == {"error": "Unknown message type"}
@@ -0,0 +1,149 @@
+import asyncio
+import fakeredis, pytest, pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from src.core.queue import BatchJobWorker, JobQueue, JobWorker
+from src.models.motion import Motion, MotionArtifact, MotionStatus
+from src.models.project import Project
+from src.models.user import User
+from src.services import motion_job_service
+from src.services.motion_job_service import MotionService
+
+@pytest.fixture
+def queue():
+    return JobQueue("test", visibility_timeout=60, max_retries=2, redis=fakeredis.FakeAsyncRedis())
+
+async def _drain(worker):
+    # Run until the queue has nothing waiting or in flight
+    task = asyncio.create_task(worker.run())
+    while (await worker.queue.depth())["waiting"] or (await worker.queue.depth())["pending"] or worker._running:
+        await asyncio.sleep(0.01)
+    worker.stop()
+    await task
+
+@pytest.mark.asyncio
+async def test_jobs_are_acked_and_removed(queue):
+    seen = []
+    async def handler(job):
+        seen.append((job.payload["n"], job.attempt))
+    for n in range(3):
+        await queue.enqueue({"n": n})
+    assert (await queue.depth())["waiting"] == 3
+    await _drain(JobWorker(queue, handler, concurrency=2, name="w1"))
+    assert sorted(seen) == [(0, 1), (1, 1), (2, 1)]
+    assert await queue.depth() == {"waiting": 0, "pending": 0, "dead": 0}
+
+@pytest.mark.asyncio
+async def test_failing_job_retries_then_dead_letters(queue):
+    attempts, dead = [], []
+    async def handler(job):
+        attempts.append(job.attempt)
+        raise RuntimeError("model exploded")
+    async def on_dead(job, error):
+        dead.append((job.payload, error))
+    await queue.enqueue({"motion_id": "m1"})
+    await _drain(JobWorker(queue, handler, on_dead, name="w1"))
+    assert attempts == [1, 2, 3]
+    assert dead == [({"motion_id": "m1"}, "model exploded")]
+    assert await queue.depth() == {"waiting": 0, "pending": 0, "dead": 1}
+
+@pytest.mark.asyncio
+async def test_job_of_a_dead_worker_is_reclaimed(queue):
+    await queue.ensure_group()
+    await queue.enqueue({"n": 1})
+    lost = await queue.consume("crashed", block_ms=10)
+    assert [j.attempt for j in lost] == [1] and (await queue.depth())["pending"] == 1
+    # Still within the visibility timeout: nobody else gets it
+    assert await queue.consume("w2", block_ms=10) == []
+    queue.visibility_timeout = 0
+    (job,) = await queue.consume("w2", block_ms=10)
+    assert job.id == lost[0].id and job.attempt == 2
+    await queue.ack(job)
+    assert await queue.depth() == {"waiting": 0, "pending": 0, "dead": 0}
+
+@pytest.mark.asyncio
+async def test_job_that_keeps_losing_its_worker_reaches_on_dead(queue):
+    ran, dead = [], []
+    async def handler(job):
+        ran.append(job)
+    async def on_dead(job, error):
+        dead.append((job.payload, error))
+    await queue.ensure_group()
+    await queue.enqueue({"motion_id": "m1"})
+    queue.visibility_timeout = 0
+    # Three deliveries, each to a worker that died without acking
+    for consumer in ("c1", "c2", "c3"):
+        assert len(await queue.consume(consumer, block_ms=10)) == 1
+    await _drain(JobWorker(queue, handler, on_dead, name="w1"))
+    assert ran == []
+    assert dead == [({"motion_id": "m1"}, "Worker lost the job on every attempt")]
+    assert await queue.depth() == {"waiting": 0, "pending": 0, "dead": 1}
+
+@pytest.mark.asyncio
+async def test_batch_worker_runs_no_more_batches_than_its_concurrency(queue):
+    running, peak, batches, attempts = 0, 0, [], set()
+    async def handler(jobs):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.02)
+        batches.append(sorted(j.payload["key"] for j in jobs))
+        attempts.update(j.attempt for j in jobs)
+        running -= 1
+    for key in ("a", "b", "c", "d", "a"):
+        await queue.enqueue({"key": key})
+    worker = BatchJobWorker(queue, handler, batch_size=8, batch_key=lambda j: j.payload["key"], concurrency=1, name="w1")
+    await _drain(worker)
+    assert peak == 1
+    assert batches[0] == ["a", "a"] and sorted(map(tuple, batches[1:])) == [("b",), ("c",), ("d",)]
+    # Released jobs were not charged an attempt
+    assert attempts == {1}
+    assert await queue.depth() == {"waiting": 0, "pending": 0, "dead": 0}
+
+@pytest_asyncio.fixture
+async def db_engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/app.db")
+    async with engine.begin() as conn:
+        for model in (User, Project, Motion, MotionArtifact):
+            await conn.run_sync(model.__table__.create)
+    yield engine
+    await engine.dispose()
+
+@pytest.mark.asyncio
+async def test_compatible_motion_jobs_share_one_diffusion_call(queue, db_engine, tmp_path, monkeypatch):
+    audio = tmp_path / "a.wav"
+    audio.write_bytes(b"RIFF")
+    calls = []
+    class Models:
+        async def predict(self, name, data, item_parameters, **shared):
+            calls.append((len(data), shared["fps"], sorted(p["energy"] for p in item_parameters)))
+            return ["HIERARCHY"] * len(data)
+    monkeypatch.setattr(motion_job_service.settings, "OUTPUT_DIR", tmp_path / "out")
+    monkeypatch.setattr(motion_job_service.settings, "LOCAL_STORAGE_PATH", tmp_path)
+    monkeypatch.setattr(motion_job_service.settings, "MOTION_BATCH_SIZE", 4)
+
+    async with AsyncSession(db_engine, expire_on_commit=False) as db:
+        svc = MotionService(db, queue)
+        motions = [await svc.generate_motion(str(audio), user_id=1, parameters={"energy": e}) for e in (1.0, 0.5, 2.0)]
+        motions.append(await svc.generate_motion(str(audio), user_id=1, parameters={"fps": 60}))
+        broken = await svc.generate_motion(str(tmp_path / "missing.wav"), user_id=1)
+
+    async def handle(jobs):
+        async with AsyncSession(db_engine) as db:
+            return await MotionService(db, queue, Models()).process_motion_batch(jobs)
+    async def on_dead(job, error):
+        async with AsyncSession(db_engine) as db:
+            await MotionService(db, queue).mark_failed(job.payload["motion_id"], error)
+    await _drain(BatchJobWorker(queue, handle, on_dead, batch_size=8, batch_key=lambda j: j.payload["batch_key"], name="w1"))
+
+    assert sorted(calls) == [(1, 60, [1.0]), (3, 30, [0.5, 1.0, 2.0])]
+    async with AsyncSession(db_engine) as db:
+        svc = MotionService(db, queue)
+        for m in motions:
+            done = await svc.get_motion(m.id, user_id=1)
+            assert done.status == MotionStatus.COMPLETED.value and done.attempts == 1
+            assert open(done.motion_path).read() == "HIERARCHY"
+        # Its batch-mates completed; it alone went through the retries
+        failed = await svc.get_motion(broken.id, user_id=1)
+        assert failed.status == MotionStatus.ERROR.value and failed.attempts == 3 and "Cannot read audio" in failed.error
+        assert await svc.get_motion(motions[0].id, user_id=2) is None
+    assert (await queue.depth())["dead"] == 1
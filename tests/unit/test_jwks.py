@@ -0,0 +1,75 @@
+import json
+import jwt, pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from src.core import security
+from src.core.config import settings
+from src.core.security import create_access_token, create_refresh_token, decode_token, jwks_document
+from src.security.auth_handler import JWKSVerifier
+
+def _write_key(keys_dir, kid, algorithm):
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048) if algorithm == "RS256" else ed25519.Ed25519PrivateKey.generate()
+    pem = key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption())
+    (keys_dir / f"{kid}.pem").write_bytes(pem)
+
+@pytest.fixture
+def signing(tmp_path, monkeypatch):
+    def use(algorithm, kid, *extra_kids):
+        for k in (kid, *extra_kids):
+            if not (tmp_path / f"{k}.pem").exists():
+                _write_key(tmp_path, k, algorithm)
+        monkeypatch.setattr(settings, "JWT_ALGORITHM", algorithm)
+        monkeypatch.setattr(settings, "JWT_KEYS_DIR", str(tmp_path))
+        monkeypatch.setattr(settings, "JWT_ACTIVE_KID", kid)
+    return use
+
+def _publish(path):
+    path.write_text(json.dumps(jwks_document()))
+    return path.as_uri()
+
+@pytest.mark.parametrize("algorithm", ["RS256", "EdDSA"])
+@pytest.mark.asyncio
+async def test_service_verifies_api_token_from_jwks(signing, tmp_path, algorithm):
+    signing(algorithm, "k1")
+    token = create_access_token({"sub": "42"})
+    assert jwt.get_unverified_header(token)["kid"] == "k1"
+    assert decode_token(token)["sub"] == "42"
+    verifier = JWKSVerifier(_publish(tmp_path / "jwks.json"))
+    assert (await verifier.verify(token))["sub"] == "42"
+    with pytest.raises(ValueError):
+        await verifier.verify(token[:-4] + ("AAAA" if not token.endswith("AAAA") else "BBBB"))
+    with pytest.raises(ValueError):
+        await verifier.verify(create_refresh_token({"sub": "42"}))
+
+@pytest.mark.asyncio
+async def test_rotation_refreshes_on_unknown_kid(signing, tmp_path):
+    signing("EdDSA", "old")
+    old_token = create_access_token({"sub": "1"})
+    jwks_path = tmp_path / "jwks.json"
+    verifier = JWKSVerifier(_publish(jwks_path), min_refresh_interval=0)
+    assert (await verifier.verify(old_token))["sub"] == "1"
+    signing("EdDSA", "new", "old")
+    _publish(jwks_path)
+    new_token = create_access_token({"sub": "2"})
+    assert (await verifier.verify(new_token))["sub"] == "2"
+    # Tokens signed before the switch stay valid on both sides
+    assert decode_token(old_token)["sub"] == "1"
+    assert (await verifier.verify(old_token))["sub"] == "1"
+
+@pytest.mark.asyncio
+async def test_unknown_kid_refresh_is_throttled(signing, tmp_path, monkeypatch):
+    signing("EdDSA", "k1")
+    verifier = JWKSVerifier(_publish(tmp_path / "jwks.json"), min_refresh_interval=60)
+    fetches = []
+    real = verifier._fetch
+    monkeypatch.setattr(verifier, "_fetch", lambda: fetches.append(1) or real())
+    forged = jwt.encode({"sub": "x", "exp": 9999999999}, ed25519.Ed25519PrivateKey.generate(), algorithm="EdDSA", headers={"kid": "nope"})
+    for _ in range(5):
+        with pytest.raises(ValueError):
+            await verifier.verify(forged)
+    assert len(fetches) == 1
+
+def test_hs256_tokens_publish_no_keys():
+    assert settings.JWT_ALGORITHM == "HS256"
+    assert jwks_document() == {"keys": []}
+    assert security.decode_token(create_access_token({"sub": "3"}))["sub"] == "3"
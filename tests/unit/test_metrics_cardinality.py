@@ -0,0 +1,54 @@
+import time, tracemalloc, uuid
+import httpx, pytest
+from fastapi import FastAPI
+from prometheus_client import CollectorRegistry
+from src.core.metrics import OVERFLOW_ENDPOINT, MetricsCollector
+
+def _series(collector: MetricsCollector) -> int:
+    return sum(len(m.samples) for m in collector.registry.collect() if m.name == "http_requests")
+
+def test_unique_paths_do_not_grow_series_or_scrape_time():
+    collector = MetricsCollector(registry=CollectorRegistry(), max_endpoints=50)
+    for i in range(1000):
+        collector.record_request("GET", f"/api/v1/motion/{uuid.uuid4()}", 200, 0.01)
+    t0 = time.perf_counter(); collector.get_metrics(); scrape_1k = time.perf_counter() - t0
+    series_1k = _series(collector)
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    for i in range(100_000):
+        collector.record_request("GET", f"/api/v1/projects/{i}", 200, 0.01)
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    t0 = time.perf_counter(); body = collector.get_metrics(); scrape_100k = time.perf_counter() - t0
+    assert _series(collector) == series_1k
+    assert after - before < 256 * 1024
+    assert scrape_100k < scrape_1k * 3 + 0.01
+    assert OVERFLOW_ENDPOINT.encode() in body
+
+def test_unknown_methods_are_folded():
+    collector = MetricsCollector(registry=CollectorRegistry(), max_endpoints=10)
+    collector.record_request("PROPFIND", "/x", 405, 0.0)
+    assert b'method="OTHER"' in collector.get_metrics()
+
+@pytest.mark.asyncio
+async def test_observability_middleware_labels_by_route_template(monkeypatch):
+    from src.api import middleware
+    collector = MetricsCollector(registry=CollectorRegistry(), max_endpoints=10)
+    monkeypatch.setattr(middleware, "metrics", collector)
+    app = FastAPI()
+    app.add_middleware(middleware.ObservabilityMiddleware)
+
+    @app.get("/api/v1/projects/{project_id}")
+    async def get_project(project_id: int):
+        return {"id": project_id}
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as ac:
+        for i in range(100):
+            await ac.get(f"/api/v1/projects/{i}")
+        await ac.get("/nope")
+    body = collector.get_metrics()
+    assert b'endpoint="/api/v1/projects/{project_id}"' in body
+    assert b'endpoint="__unmatched__"' in body
+    assert b"/api/v1/projects/42" not in body
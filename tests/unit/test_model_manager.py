@@ -0,0 +1,44 @@
+import asyncio, time
+import fakeredis, pytest
+pytest.importorskip("torch")
+from src.core.cache import RedisCache
+from src.ml_serving import model_manager as mm_module
+from src.ml_serving.model_manager import ModelConfig, ModelManager, ModelType
+
+class SlowModel:
+    def __init__(self):
+        self.calls = 0
+    def predict(self, data, **kwargs):
+        self.calls += 1
+        time.sleep(0.05)
+        return [f"motion:{d}" for d in data]
+
+@pytest.fixture
+def manager(monkeypatch):
+    cache = RedisCache()
+    cache.redis_client = fakeredis.FakeAsyncRedis()
+    monkeypatch.setattr(mm_module, "redis_client", cache)
+    manager = ModelManager()
+    manager.model_configs["motion"] = ModelConfig(name="motion", type=ModelType.MOTION_DIFFUSION, version="v1", path="unused")
+    manager.models["motion"] = SlowModel()
+    async def get_model(name):
+        return manager.models[name]
+    monkeypatch.setattr(manager, "get_model", get_model)
+    return manager
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_predictions_run_the_model_once(manager):
+    results = await asyncio.gather(*(manager.predict("motion", ["a", "b"], seed=1) for _ in range(10)))
+    assert results == [["motion:a", "motion:b"]] * 10
+    assert manager.models["motion"].calls == 1
+    # Cached: a later call does not reach the model, other inputs do
+    assert await manager.predict("motion", ["a", "b"], seed=1) == ["motion:a", "motion:b"]
+    await manager.predict("motion", ["a", "b"], seed=2)
+    assert manager.models["motion"].calls == 2
+
+@pytest.mark.asyncio
+async def test_uncached_models_always_run(manager):
+    manager.model_configs["motion"].cache_predictions = False
+    for _ in range(2):
+        await manager.predict("motion", ["a"])
+    assert manager.models["motion"].calls == 2
@@ -0,0 +1,140 @@
+import os
+from pathlib import Path
+import fakeredis, pytest, pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from src.core.queue import JobQueue
+from src.models.motion import Motion, MotionArtifact, MotionStatus
+from src.models.project import Project
+from src.models.user import User
+from src.services import motion_job_service
+from src.services.motion_job_service import MotionService, collect_garbage, content_key
+
+class Models:
+    def __init__(self):
+        self.items = 0
+    async def predict(self, name, data, item_parameters, **shared):
+        self.items += len(data)
+        return ["HIERARCHY"] * len(data)
+
+@pytest_asyncio.fixture
+async def db_engine(tmp_path, monkeypatch):
+    monkeypatch.setattr(motion_job_service.settings, "OUTPUT_DIR", tmp_path / "out")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/app.db")
+    async with engine.begin() as conn:
+        for model in (User, Project, Motion, MotionArtifact):
+            await conn.run_sync(model.__table__.create)
+    yield engine
+    await engine.dispose()
+
+@pytest.fixture
+def audio(tmp_path, monkeypatch):
+    monkeypatch.setattr(motion_job_service.settings, "LOCAL_STORAGE_PATH", tmp_path)
+    path = tmp_path / "a.wav"
+    path.write_bytes(b"RIFF....WAVE")
+    return str(path)
+
+async def _run_queued(engine, queue, models):
+    jobs = await queue.consume("w1", count=10, block_ms=10)
+    async with AsyncSession(engine) as db:
+        errors = await MotionService(db, queue, models).process_motion_batch(jobs)
+    await queue.ack(*jobs)
+    return errors
+
+async def _artifact(engine, key):
+    async with AsyncSession(engine) as db:
+        return (await db.execute(select(MotionArtifact).where(MotionArtifact.content_key == key))).scalar_one_or_none()
+
+def test_content_key_covers_audio_parameters_and_model_version(audio, tmp_path):
+    key = content_key(audio, {"fps": 30, "energy": 1.0})
+    assert key == content_key(audio, {"energy": 1, "fps": 30.0})
+    assert key != content_key(audio, {"fps": 60, "energy": 1.0})
+    assert key != content_key(audio, {"fps": 30, "energy": 1.0}, model_version="v2")
+    other = tmp_path / "b.wav"
+    other.write_bytes(b"RIFF....WAVF")
+    assert key != content_key(str(other), {"fps": 30, "energy": 1.0})
+    # Relative paths start at the storage root
+    assert key == content_key("a.wav", {"fps": 30, "energy": 1.0})
+
+@pytest.mark.asyncio
+async def test_audio_outside_storage_is_rejected(db_engine, audio, tmp_path):
+    from src.core.exceptions import ValidationError
+    outside = tmp_path.parent / f"{tmp_path.name}-outside.wav"
+    outside.write_bytes(b"RIFF")
+    (tmp_path / "link.wav").symlink_to(outside)
+    async with AsyncSession(db_engine) as db:
+        for path in (str(outside), "../" + outside.name, "link.wav", "/dev/zero"):
+            with pytest.raises(ValidationError):
+                await MotionService(db, JobQueue("test", redis=fakeredis.FakeAsyncRedis())).generate_motion(path, user_id=1)
+    # The worker refuses them too, should one already be queued
+    assert all(isinstance(r, OSError) for r in motion_job_service._read_inputs([str(outside), "link.wav"]))
+    outside.unlink()
+
+def test_only_regular_files_within_the_size_cap_are_read(audio, tmp_path, monkeypatch):
+    os.mkfifo(tmp_path / "fifo.wav")
+    (tmp_path / "big.wav").write_bytes(b"x" * 64)
+    monkeypatch.setattr(motion_job_service.settings, "UPLOAD_MAX_SIZE", 32)
+    # A FIFO without a writer would block a plain open() forever
+    fifo, big, missing = (str(tmp_path / name) for name in ("fifo.wav", "big.wav", "missing.wav"))
+    for path in (fifo, big, missing):
+        with pytest.raises(OSError):
+            content_key(path, {})
+        assert motion_job_service._try_content_key(path, {}) is None
+    fifo, big, ok = motion_job_service._read_inputs([fifo, big, audio])
+    assert isinstance(fifo, OSError) and isinstance(big, OSError) and ok == b"RIFF....WAVE"
+
+@pytest.mark.asyncio
+async def test_repeat_request_reuses_result_and_gc_collects_it(db_engine, audio):
+    queue = JobQueue("test", redis=fakeredis.FakeAsyncRedis())
+    await queue.ensure_group()
+    models = Models()
+    async with AsyncSession(db_engine, expire_on_commit=False) as db:
+        # Identical jobs queued together are generated once
+        first = [await MotionService(db, queue).generate_motion(audio, user_id=1) for _ in range(2)]
+    assert await _run_queued(db_engine, queue, models) == {} and models.items == 1
+    key = first[0].content_key
+    assert (await _artifact(db_engine, key)).ref_count == 2
+
+    async with AsyncSession(db_engine, expire_on_commit=False) as db:
+        again = await MotionService(db, queue).generate_motion(audio, user_id=2)
+    assert again.status == MotionStatus.COMPLETED.value and (await queue.depth())["waiting"] == 0
+    artifact = await _artifact(db_engine, key)
+    assert artifact.ref_count == 3 and again.motion_path == artifact.path
+
+    async with AsyncSession(db_engine) as db:
+        svc = MotionService(db, queue)
+        assert not await svc.delete_motion(again.id, user_id=1)
+        for m in (*first, again):
+            assert await svc.delete_motion(m.id, user_id=m.user_id)
+    async with AsyncSession(db_engine) as db:
+        # Unreferenced but still within the grace period
+        assert (await collect_garbage(db))["artifacts"] == 0
+        stray = Path(artifact.path).with_name("f" * 64 + ".bvh")
+        stray.write_text("HIERARCHY")
+        assert await collect_garbage(db, grace_seconds=-1) == {"reconciled": 0, "artifacts": 1, "files": 1}
+    assert not os.path.exists(artifact.path) and not stray.exists()
+    assert await _artifact(db_engine, key) is None
+
+@pytest.mark.asyncio
+async def test_gc_recounts_references_and_missing_files_regenerate(db_engine, audio):
+    queue = JobQueue("test", redis=fakeredis.FakeAsyncRedis())
+    await queue.ensure_group()
+    models = Models()
+    async with AsyncSession(db_engine, expire_on_commit=False) as db:
+        m = await MotionService(db, queue).generate_motion(audio, user_id=1)
+    await _run_queued(db_engine, queue, models)
+    path = (await _artifact(db_engine, m.content_key)).path
+    async with AsyncSession(db_engine) as db:
+        # Count drifted upward: a motion was still pointing at it, so nothing is deleted
+        await db.execute(MotionArtifact.__table__.update().values(ref_count=5))
+        await db.commit()
+        assert await collect_garbage(db, grace_seconds=-1) == {"reconciled": 1, "artifacts": 0, "files": 0}
+    assert (await _artifact(db_engine, m.content_key)).ref_count == 1
+
+    os.remove(path)
+    async with AsyncSession(db_engine, expire_on_commit=False) as db:
+        again = await MotionService(db, queue).generate_motion(audio, user_id=1)
+    assert again.status == MotionStatus.PENDING.value
+    await _run_queued(db_engine, queue, models)
+    assert models.items == 2 and open(path).read() == "HIERARCHY"
+    assert (await _artifact(db_engine, m.content_key)).ref_count == 2
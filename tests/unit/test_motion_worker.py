@@ -0,0 +1,27 @@
+import fakeredis, pytest
+pytest.importorskip("torch")
+from src.workers import motion_worker
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("models", [True, False])
+async def test_worker_starts_and_shuts_down(monkeypatch, models):
+    calls = []
+    async def initialize():
+        motion_worker.redis_client.redis_client = fakeredis.FakeAsyncRedis()
+    async def model_call(name):
+        calls.append(name)
+    async def run(self):
+        # Stopped before the first consume: exercises startup and shutdown only
+        self.stop()
+        await original_run(self)
+        calls.append("run")
+    original_run = motion_worker.BatchJobWorker.run
+    monkeypatch.setattr(motion_worker.BatchJobWorker, "run", run)
+    monkeypatch.setattr(motion_worker.settings, "ENABLE_ML_MODELS", models)
+    monkeypatch.setattr(motion_worker.redis_client, "initialize", initialize)
+    monkeypatch.setattr(motion_worker, "start_http_server", lambda port: calls.append(port))
+    monkeypatch.setattr(motion_worker.model_manager, "initialize", lambda: model_call("models up"))
+    monkeypatch.setattr(motion_worker.model_manager, "cleanup", lambda: model_call("models down"))
+    await motion_worker.main()
+    expected = ["models up", "run", "models down"] if models else ["run"]
+    assert calls == [motion_worker.settings.WORKER_METRICS_PORT] + expected
@@ -0,0 +1,21 @@
+import time
+from src.core.cache import NearCache, _MISS
+
+def test_near_cache_evicts_lru_and_expires(monkeypatch):
+    nc = NearCache(max_entries=2, ttl=5)
+    nc.set("motion:a", "1")
+    nc.set("motion:b", "2")
+    assert nc.get("motion:a") == "1"
+    nc.set("motion:c", "3")
+    assert nc.get("motion:b") is _MISS
+    assert len(nc) == 2
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 6)
+    assert nc.get("motion:a") is _MISS
+
+def test_near_cache_ttl_capped_by_entry_ttl():
+    nc = NearCache(max_entries=10, ttl=60)
+    nc.set("whisper:x", "v", ttl=1)
+    expires_at, _ = nc._data["whisper:x"]
+    assert expires_at - time.monotonic() <= 1
@@ -0,0 +1,58 @@
+import asyncio, threading, time
+import pytest
+from src.core.exceptions import ServiceOverloadedError
+from src.core.security import PasswordHashPool, hash_password, needs_rehash, verify_password
+
+@pytest.mark.asyncio
+async def test_pool_runs_off_the_event_loop():
+    pool = PasswordHashPool(workers=2, max_queue=4)
+    loop_thread = threading.get_ident()
+    ran_on = await pool.run("verify", threading.get_ident)
+    assert ran_on != loop_thread
+    pool.shutdown()
+
+@pytest.mark.asyncio
+async def test_event_loop_keeps_ticking_during_a_burst():
+    pool = PasswordHashPool(workers=2, max_queue=16)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.005)
+
+    t = asyncio.create_task(ticker())
+    await asyncio.gather(*(pool.run("verify", time.sleep, 0.05) for _ in range(8)))
+    t.cancel()
+    # 8 x 50 ms on 2 workers ~ 200 ms of wall time; an inline loop would tick ~once
+    assert ticks > 10
+    pool.shutdown()
+
+@pytest.mark.asyncio
+async def test_admission_queue_rejects_overflow():
+    pool = PasswordHashPool(workers=1, max_queue=1)
+    results = await asyncio.gather(*(pool.run("hash", time.sleep, 0.05) for _ in range(4)), return_exceptions=True)
+    rejected = [r for r in results if isinstance(r, ServiceOverloadedError)]
+    assert len(rejected) == 2 and rejected[0].status_code == 503
+    assert pool.pending == 0
+    pool.shutdown()
+
+def test_needs_rehash(monkeypatch):
+    from src.core.config import settings
+    monkeypatch.setattr(settings, "PASSWORD_HASH_ROUNDS", 5)
+    assert needs_rehash("5e884898da28047151d0e56f8dc6292773603d0d6aabbdd62a11ef721d1542d8")
+    hashed = hash_password("pw")
+    assert not needs_rehash(hashed) and verify_password("pw", hashed)
+    monkeypatch.setattr(settings, "PASSWORD_HASH_ROUNDS", 6)
+    assert needs_rehash(hashed)
+
+def test_long_passwords_hash_past_bcrypt_limit(monkeypatch):
+    from src.core.config import settings
+    monkeypatch.setattr(settings, "PASSWORD_HASH_ROUNDS", 4)
+    long = "p" * 100
+    hashed = hash_password(long)
+    assert verify_password(long, hashed)
+    # The bytes past 72 still count
+    assert not verify_password("p" * 99 + "q", hashed)
+    assert not verify_password("pw", "$2b$04$not-a-bcrypt-hash")
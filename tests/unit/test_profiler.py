@@ -0,0 +1,53 @@
+import threading, time
+import pytest
+from src.monitoring import profiler
+from src.monitoring.profiler import ProfilerBusy, SamplingProfiler
+
+def _spin_in_worker(stop: threading.Event):
+    while not stop.is_set():
+        sum(i * i for i in range(1000))
+
+def test_samples_executor_threads_as_collapsed_stacks():
+    stop = threading.Event()
+    worker = threading.Thread(target=_spin_in_worker, args=(stop,), name="inference-0")
+    worker.start()
+    p = SamplingProfiler(hz=200)
+    p.start(); time.sleep(0.3); p.stop()
+    stop.set(); worker.join()
+    out = p.collapsed()
+    lines = [l for l in out.splitlines() if l.startswith("inference-0;")]
+    assert lines and any("_spin_in_worker" in l for l in lines)
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0 and "sampling-profiler" not in out
+
+def test_distinct_stacks_are_bounded():
+    p = SamplingProfiler(max_stacks=1)
+    p.sample()  # the sampling thread itself is skipped
+    assert "MainThread" not in p.collapsed()
+    stop = threading.Event()
+    workers = [threading.Thread(target=stop.wait, name=f"w{i}") for i in range(3)]
+    for w in workers: w.start()
+    p.sample()
+    stop.set()
+    for w in workers: w.join()
+    assert len(p.collapsed().splitlines()) <= 2
+
+def test_reset_clears_counts():
+    stop = threading.Event()
+    worker = threading.Thread(target=stop.wait)
+    worker.start()
+    p = SamplingProfiler()
+    p.sample()
+    stop.set(); worker.join()
+    assert p.collapsed(reset=True)
+    assert p.collapsed() == "" and p.samples == 0
+
+def test_concurrent_on_demand_profile_is_rejected():
+    t = threading.Thread(target=profiler.profile, args=(0.3, 50))
+    t.start(); time.sleep(0.05)
+    try:
+        with pytest.raises(ProfilerBusy):
+            profiler.profile(0.01)
+    finally:
+        t.join()
+    assert profiler.profile(0.01) is not None
@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta
+import pytest, pytest_asyncio
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from src.api.dependencies import get_current_active_user, get_read_db
+from src.api.routers import projects
+from src.models.project import Project
+from src.models.user import User
+from src.services.auth_service import UserSnapshot
+
+@pytest_asyncio.fixture
+async def client():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(User.__table__.create)
+        await conn.run_sync(Project.__table__.create)
+        t0 = datetime(2026, 1, 1)
+        # Pairs share a timestamp so the id tiebreak matters; owner 2 is noise
+        await conn.execute(insert(Project), [
+            {"name": f"p{i}", "owner_id": 1 if i % 3 else 2, "created_at": t0 + timedelta(minutes=i // 2)} for i in range(60)
+        ])
+    app = FastAPI()
+    app.include_router(projects.router, prefix="/api/v1/projects")
+
+    async def read_db():
+        async with AsyncSession(engine) as s:
+            yield s
+
+    app.dependency_overrides[get_read_db] = read_db
+    app.dependency_overrides[get_current_active_user] = lambda: UserSnapshot(1, "a@example.com", "A", True, False)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
+        c.engine = engine
+        yield c
+    await engine.dispose()
+
+@pytest.mark.asyncio
+async def test_pages_cover_owner_projects_newest_first(client):
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 7, **({"cursor": cursor} if cursor else {})}
+        page = (await client.get("/api/v1/projects/", params=params)).json()
+        seen += [p["id"] for p in page["items"]]
+        assert all(p["owner_id"] == 1 for p in page["items"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    async with AsyncSession(client.engine) as s:
+        expected = (await s.execute(select(Project.id).where(Project.owner_id == 1)
+                                    .order_by(Project.created_at.desc(), Project.id.desc()))).scalars().all()
+    assert seen == expected and len(seen) == 40
+
+@pytest.mark.asyncio
+async def test_summary_view_and_bad_cursor(client):
+    page = (await client.get("/api/v1/projects/", params={"limit": 2, "view": "summary"})).json()
+    assert set(page["items"][0]) == {"id", "name", "created_at"} and page["next_cursor"]
+    assert (await client.get("/api/v1/projects/", params={"cursor": "garbage"})).status_code == 400
+
+@pytest.mark.asyncio
+async def test_listing_query_uses_composite_index(client):
+    async with client.engine.connect() as conn:
+        plan = (await conn.execute(text(
+            "EXPLAIN QUERY PLAN SELECT id FROM projects WHERE owner_id = 1 AND (created_at, id) < ('2026-01-01 00:10:00', 10) "
+            "ORDER BY created_at DESC, id DESC LIMIT 51"))).all()
+    detail = " ".join(r[-1] for r in plan)
+    assert "ix_projects_owner_created_id" in detail and "TEMP B-TREE" not in detail
@@ -0,0 +1,30 @@
+import pytest
+from src.core.cache import RedisCache
+from src.security.rate_limiter import RateLimiter, TokenBucket
+
+def test_token_bucket_limits_and_refills():
+    bucket = TokenBucket(window_seconds=60)
+    assert all(bucket.hit("ip:1", 3, now=0.0).allowed for _ in range(3))
+    blocked = bucket.hit("ip:1", 3, now=0.0)
+    assert not blocked.allowed and blocked.retry_after == pytest.approx(20.0)
+    assert bucket.hit("ip:1", 3, now=20.0).allowed
+
+def test_route_limit_takes_precedence_over_client_limit():
+    rl = RateLimiter(RedisCache(), default_limit=100, route_limits={"/api/v1/auth": 5, "/api/v1/auth/login": 2},
+                     client_limits={"user:1": 1000})
+    assert rl.resolve("/api/v1/auth/login", "user:1") == ("/api/v1/auth/login", 2)
+    assert rl.resolve("/api/v1/auth/me", "user:1") == ("/api/v1/auth", 5)
+    assert rl.resolve("/api/v1/projects", "user:1") == ("global", 1000)
+    assert rl.resolve("/api/v1/projects", "ip:10.0.0.1") == ("global", 100)
+
+@pytest.mark.asyncio
+async def test_falls_back_to_local_bucket_without_redis():
+    rl = RateLimiter(RedisCache(), default_limit=1, window_seconds=60, route_limits={})
+    first, second = await rl.hit("ip:1", "/x"), await rl.hit("ip:1", "/x")
+    assert first.allowed and first.backend == "local"
+    assert not second.allowed
+
+def test_identity_is_the_ip_without_a_valid_token():
+    rl = RateLimiter(RedisCache(), default_limit=1, route_limits={})
+    assert rl.identify(None, "10.0.0.1") == "ip:10.0.0.1"
+    assert rl.identify("Bearer not-a-jwt", "10.0.0.1") == "ip:10.0.0.1"
@@ -0,0 +1,69 @@
+import fakeredis, pytest, pytest_asyncio
+from sqlalchemy import text
+from src.core import database
+from src.core.cache import RedisCache
+from src.core.database import SessionRouter, create_engine, get_read_session
+
+@pytest_asyncio.fixture
+async def router(tmp_path, monkeypatch):
+    cache = RedisCache()
+    cache.redis_client = fakeredis.FakeAsyncRedis()
+    monkeypatch.setattr(database, "redis_client", cache)
+    primary = create_engine(f"sqlite+aiosqlite:///{tmp_path}/primary.db", name="primary")
+    replicas = [create_engine(f"sqlite+aiosqlite:///{tmp_path}/r{i}.db", name=f"replica-{i}") for i in range(2)]
+    r = SessionRouter(primary, replicas, max_lag=5.0, sticky_seconds=5)
+    monkeypatch.setattr(database, "session_router", r)
+    yield r
+    await r.close()
+    await primary.dispose()
+
+async def _served_by(sticky=False):
+    async for s in get_read_session(sticky):
+        return (await s.execute(text("PRAGMA database_list"))).all()[0][2].rsplit("/", 1)[-1]
+
+@pytest.mark.asyncio
+async def test_reads_spread_over_replicas(router):
+    assert sorted([await _served_by() for _ in range(4)]) == ["r0.db", "r0.db", "r1.db", "r1.db"]
+
+@pytest.mark.asyncio
+async def test_unreachable_replica_leaves_rotation(router, tmp_path):
+    router.replicas[1] = create_engine(f"sqlite+aiosqlite:///{tmp_path}/missing/r1.db", name="replica-1")
+    await router.check_replicas()
+    assert router.healthy == {"replica-0": True, "replica-1": False}
+    assert {await _served_by() for _ in range(4)} == {"r0.db"}
+    router.healthy["replica-0"] = False
+    assert await _served_by() == "primary.db"
+
+@pytest.mark.asyncio
+async def test_writer_reads_own_writes_from_primary(router):
+    assert not await router.is_sticky(7)
+    await router.mark_write(7)
+    assert await router.is_sticky(7) and not await router.is_sticky(8)
+    # Another worker only has Redis to go on
+    router._writers.clear()
+    assert await router.is_sticky(7)
+    assert await _served_by(sticky=True) == "primary.db"
+
+@pytest.mark.asyncio
+async def test_no_replicas_means_primary_without_redis(tmp_path, monkeypatch):
+    primary = create_engine(f"sqlite+aiosqlite:///{tmp_path}/primary.db", name="primary")
+    r = SessionRouter(primary, [], max_lag=5.0, sticky_seconds=5)
+    monkeypatch.setattr(database, "redis_client", None)
+    await r.mark_write(1)
+    assert not await r.is_sticky(1)
+    assert r.read_engine() is primary
+    await primary.dispose()
+
+@pytest.mark.asyncio
+async def test_anonymous_writes_are_not_tracked_and_expired_writers_pruned(router, monkeypatch):
+    await router.mark_write(None)
+    assert router._writers == {} and not await database.redis_client.redis_client.keys("dbrw:*")
+    clock = [100.0]
+    monkeypatch.setattr(database.time, "monotonic", lambda: clock[0])
+    await router.mark_write(1)
+    await router.mark_write(2)
+    clock[0] += 3
+    await router.mark_write(1)
+    clock[0] += 3
+    await router.mark_write(3)
+    assert list(router._writers) == [1, 3]
@@ -0,0 +1,46 @@
+import pytest, pytest_asyncio
+from sqlalchemy import event, inspect
+from sqlalchemy.ext.asyncio import create_async_engine
+from src.core.exceptions import SchemaVersionError
+from src.core.schema import current_revisions, ensure_schema, head_revisions, upgrade
+
+@pytest_asyncio.fixture
+async def engine(tmp_path):
+    e = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/app.db")
+    yield e
+    await e.dispose()
+
+async def _migrate(engine, revision="head"):
+    async with engine.connect() as conn:
+        await conn.run_sync(lambda c: upgrade(revision, c))
+        await conn.commit()
+
+@pytest.mark.asyncio
+async def test_verify_requires_migrate_job(engine):
+    with pytest.raises(SchemaVersionError):
+        await ensure_schema(engine, "verify")
+    await _migrate(engine, "001")
+    with pytest.raises(SchemaVersionError) as e:
+        await ensure_schema(engine, "verify")
+    assert e.value.details == {"current": ["001"], "expected": sorted(head_revisions())}
+    await _migrate(engine)
+    await ensure_schema(engine, "verify")
+    assert await current_revisions(engine) == head_revisions()
+
+@pytest.mark.asyncio
+async def test_verify_and_skip_run_no_ddl(engine):
+    statements = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *a: statements.append(a[2]))
+    await ensure_schema(engine, "skip")
+    with pytest.raises(SchemaVersionError):
+        await ensure_schema(engine, "verify")
+    assert statements == ["SELECT version_num FROM alembic_version"]
+
+@pytest.mark.asyncio
+async def test_create_mode_builds_tables_for_throwaway_dbs(engine):
+    await ensure_schema(engine, "create")
+    async with engine.connect() as conn:
+        tables = await conn.run_sync(lambda c: inspect(c).get_table_names())
+    assert {"users", "projects", "tasks"} <= set(tables)
+    with pytest.raises(ValueError):
+        await ensure_schema(engine, "auto")
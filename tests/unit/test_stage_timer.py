@@ -0,0 +1,32 @@
+import pytest
+from prometheus_client import REGISTRY
+from src.monitoring.tracing import StageTimer, stage_timer
+
+def _count(operation: str, stage: str) -> float:
+    return REGISTRY.get_sample_value(
+        "inference_stage_duration_seconds_count", {"operation": operation, "stage": stage}) or 0
+
+def test_stages_are_recorded_per_operation():
+    timer = stage_timer("test.op", enabled=True)
+    assert isinstance(timer, StageTimer)
+    with timer.stage("cache_lookup"):
+        pass
+    with timer.stage("model_compute"):
+        pass
+    assert _count("test.op", "cache_lookup") == 1
+    assert _count("test.op", "model_compute") == 1
+
+def test_stage_records_on_error():
+    timer = stage_timer("test.err", enabled=True)
+    with pytest.raises(RuntimeError):
+        with timer.stage("model_compute"):
+            raise RuntimeError("boom")
+    assert _count("test.err", "model_compute") == 1
+
+def test_disabled_timer_is_shared_noop():
+    timer = stage_timer("test.off", enabled=False)
+    assert timer is stage_timer("other", enabled=False)
+    assert timer.stage("a") is timer.stage("b")
+    with timer.stage("a"):
+        pass
+    assert _count("test.off", "a") == 0
@@ -0,0 +1,93 @@
+import asyncio, json
+import fakeredis, pytest
+from src.utils import websocket_manager as hub_module
+from src.utils.websocket_manager import WebSocketManager
+
+class FakeSocket:
+    def __init__(self, stalled=False):
+        self.sent, self.closed = [], None
+        self.release = asyncio.Event()
+        if not stalled:
+            self.release.set()
+    async def accept(self):
+        pass
+    async def send_text(self, text):
+        await self.release.wait()
+        self.sent.append(json.loads(text))
+    async def close(self, code=1000):
+        self.closed = code
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+@pytest.mark.asyncio
+async def test_room_broadcast_encodes_once_and_skips_nobody(monkeypatch):
+    encoded = []
+    real = hub_module._encode
+    monkeypatch.setattr(hub_module, "_encode", lambda m: encoded.append(m) or real(m))
+    hub = WebSocketManager(queue_size=8, heartbeat=0)
+    sockets = [FakeSocket() for _ in range(50)]
+    for i, ws in enumerate(sockets):
+        await hub.connect(ws, user_id=i)
+        hub.subscribe(ws, "room:a" if i % 2 else "room:b")
+    assert hub.broadcast(("room:a", "room:b"), {"n": 1}) == 50
+    assert hub.broadcast("room:a", {"n": 2}, user_id=3) == 1
+    await _settle()
+    assert len(encoded) == 2
+    assert all(ws.sent[0] == {"n": 1} for ws in sockets) and sockets[3].sent[1:] == [{"n": 2}]
+    await hub.close()
+    assert len(hub) == 0 and hub.topics == {}
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("policy, expected", [("drop_oldest", [2, 3, 4]), ("drop_newest", [1, 2, 3])])
+async def test_slow_consumer_drop_policies(policy, expected):
+    hub = WebSocketManager(queue_size=3, policy=policy, heartbeat=0)
+    slow, fast = FakeSocket(stalled=True), FakeSocket()
+    for ws in (slow, fast):
+        await hub.connect(ws)
+        hub.subscribe(ws, "room")
+    await _settle()
+    for n in range(5):
+        hub.broadcast("room", {"n": n})
+        await _settle()
+    # The fast client never waited on the slow one
+    assert [m["n"] for m in fast.sent] == [0, 1, 2, 3, 4]
+    slow.release.set()
+    await _settle()
+    # One message was already in the stalled send when the queue filled
+    assert [m["n"] for m in slow.sent][1:] == expected
+    assert hub.connections[slow].dropped == 1
+    await hub.close()
+
+@pytest.mark.asyncio
+async def test_slow_consumer_disconnect_policy():
+    hub = WebSocketManager(queue_size=2, policy="disconnect", heartbeat=0)
+    slow = FakeSocket(stalled=True)
+    await hub.connect(slow, user_id=1)
+    for n in range(4):
+        hub.broadcast("user:1", {"n": n})
+        await _settle()
+    await _settle()
+    assert slow.closed == 1013 and len(hub) == 0 and hub.topics == {}
+
+@pytest.mark.asyncio
+async def test_backplane_reaches_other_pods_once():
+    redis = fakeredis.FakeAsyncRedis()
+    pod_a = WebSocketManager(heartbeat=0, channel="test:ws", redis=redis)
+    pod_b = WebSocketManager(heartbeat=0, channel="test:ws", redis=redis)
+    a, b = FakeSocket(), FakeSocket()
+    await pod_a.connect(a, user_id=1)
+    await pod_b.connect(b, user_id=1)
+    for pod in (pod_a, pod_b):
+        pod.start()
+    await asyncio.sleep(0.05)
+    assert await pod_a.publish("user:1", {"hello": "pods"}) == 1
+    for _ in range(100):
+        if b.sent:
+            break
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.05)
+    assert a.sent == [{"hello": "pods"}] and b.sent == [{"hello": "pods"}]
+    await pod_a.close()
+    await pod_b.close()